@@ -4,17 +4,38 @@ Build precomputed cache for RAG index.
 This script generates papers and embeddings cache for fast startup.
 """
 
-import json
-import pickle
+import argparse
 import asyncio
+import gzip
+import hashlib
 import os
 import numpy as np
+import orjson
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Optional
 
+from src.models import Paper
 from src.retrieval.arxiv_searcher import search_arxiv_papers
 from src.retrieval.inmemory import InMemoryIndex
 
 
+@contextmanager
+def _atomic_write(path: Path):
+    """Yield a temporary sibling of ``path`` and move it into place on success.
+
+    A running server never sees a half-written cache file, and an interrupted
+    build leaves the previous file intact. The temporary name keeps the
+    suffix so that np.save/np.savez do not append another one.
+    """
+    tmp = path.with_name(f".{path.stem}.tmp{path.suffix}")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 def _use_local_embeddings() -> bool:
     """Check if we should use local embeddings instead of calling OpenAI."""
     key = os.environ.get("OPENAI_API_KEY", "")
@@ -22,20 +43,42 @@ def _use_local_embeddings() -> bool:
     return (ci.lower() in ("1", "true")) or (not key) or (key == "test_key")
 
 
-def _make_local_embedding(text: str, dim: int = 64) -> np.ndarray:
-    """Generate deterministic pseudo-embedding based on text hash."""
-    seed = abs(hash(text)) % (2**32)
-    rng = np.random.default_rng(seed)
-    vec = rng.normal(loc=0.0, scale=1.0, size=dim).astype(np.float32)
-    norm = np.linalg.norm(vec) + 1e-8
-    return (vec / norm).astype(np.float32)
+def _text_seed(paper) -> bytes:
+    """Seed bytes for a paper: blake2b of title + "\\n\\n" + summary, hashed in parts."""
+    h = hashlib.blake2b(digest_size=4)
+    h.update(paper.title.encode("utf-8"))
+    h.update(b"\n\n")
+    h.update(paper.summary.encode("utf-8"))
+    return h.digest()
+
+
+def _make_local_embeddings(papers: list, dim: int = 64) -> np.ndarray:
+    """Generate deterministic pseudo-embeddings for all papers in one pass.
+
+    A single generator is seeded from the per-paper hashes, so the whole
+    (N, dim) matrix is drawn with one RNG call and normalized row-wise.
+    Seeds use blake2b rather than hash(), which is salted per process
+    (PYTHONHASHSEED) and would change the embeddings on every run.
+    """
+    seeds = np.frombuffer(b"".join(_text_seed(p) for p in papers), dtype="<u4")
+    rng = np.random.default_rng(np.random.SeedSequence(seeds))
+    # Drawn directly as float32 and normalized in place: no float64 temporary
+    mat = rng.standard_normal((len(papers), dim), dtype=np.float32)
+    mat /= np.linalg.norm(mat, axis=1, keepdims=True) + 1e-8
+    return mat
 
 
 async def build_papers_cache():
     """Build cache of papers from arXiv searches."""
     print("🔍 Building papers cache...")
 
-    all_papers = []
+    # Deduplicate by paper ID as batches arrive (shared with the fallback phase).
+    # A dict keyed by ID keeps first-seen order and replaces a set + list pair.
+    unique: dict[str, Paper] = {}
+
+    def _add_unique(batch_papers) -> None:
+        for p in batch_papers:
+            unique.setdefault(p.id, p)
 
     # Search queries targeting different aspects of NLP/Transformer research
     search_queries = [
@@ -49,47 +92,44 @@ async def build_papers_cache():
         "self-attention multi-head transformer",
     ]
 
-    for i, query in enumerate(search_queries):
-        try:
-            print(f"  Query {i + 1}/{len(search_queries)}: '{query}'")
-            batch_papers = search_arxiv_papers(query, max_results=8)
-            all_papers.extend(batch_papers)
-            print(f"    → {len(batch_papers)} papers")
-        except Exception as e:
-            print(f"    ❌ Failed: {e}")
+    # Bound concurrency to stay under the arXiv API rate limit
+    sem = asyncio.BoundedSemaphore(4)
+
+    async def _one(query: str, max_results: int):
+        async with sem:
+            return await asyncio.to_thread(
+                search_arxiv_papers, query, max_results=max_results
+            )
+
+    results = await asyncio.gather(
+        *[_one(q, 8) for q in search_queries], return_exceptions=True
+    )
+    for i, (query, batch_papers) in enumerate(zip(search_queries, results)):
+        print(f"  Query {i + 1}/{len(search_queries)}: '{query}'")
+        if isinstance(batch_papers, Exception):
+            print(f"    ❌ Failed: {batch_papers}")
             continue
-
-    # Remove duplicates based on paper ID
-    seen_ids = set()
-    papers = []
-    for paper in all_papers:
-        if paper.id not in seen_ids:
-            papers.append(paper)
-            seen_ids.add(paper.id)
+        _add_unique(batch_papers)
+        print(f"    → {len(batch_papers)} papers")
 
     # If no papers found, try fallback searches
-    if not papers:
+    if not unique:
         print("⚠️  No papers from specialized queries, trying fallback...")
         fallback_queries = ["transformer", "attention mechanism", "BERT", "GPT"]
-        for query in fallback_queries:
-            try:
-                batch_papers = search_arxiv_papers(query, max_results=10)
-                all_papers.extend(batch_papers)
-                print(f"  Fallback '{query}' → {len(batch_papers)} papers")
-                if len(batch_papers) > 0:
-                    break
-            except Exception as e:
-                print(f"  Fallback '{query}' failed: {e}")
+        results = await asyncio.gather(
+            *[_one(q, 10) for q in fallback_queries], return_exceptions=True
+        )
+        # Keep the original query priority: stop at the first non-empty batch
+        for query, batch_papers in zip(fallback_queries, results):
+            if isinstance(batch_papers, Exception):
+                print(f"  Fallback '{query}' failed: {batch_papers}")
                 continue
+            _add_unique(batch_papers)
+            print(f"  Fallback '{query}' → {len(batch_papers)} papers")
+            if len(batch_papers) > 0:
+                break
 
-        # Remove duplicates again
-        seen_ids = set()
-        papers = []
-        for paper in all_papers:
-            if paper.id not in seen_ids:
-                papers.append(paper)
-                seen_ids.add(paper.id)
-
+    papers = list(unique.values())
     print(f"✅ Collected {len(papers)} unique papers")
     return papers
 
@@ -106,11 +146,8 @@ def build_embeddings_cache(papers):
 
     if _use_local_embeddings():
         print("⚙️  CI/test mode detected — generating local deterministic embeddings")
-        index.papers_with_embeddings = []
-        for p in papers:
-            text = f"{p.title}\n\n{p.summary}"
-            emb = _make_local_embedding(text)
-            index.papers_with_embeddings.append((p, emb))
+        mat = _make_local_embeddings(papers)
+        index.papers_with_embeddings = list(zip(papers, mat))
         print(
             f"✅ Built embeddings for {len(index.papers_with_embeddings)} papers (local)"
         )
@@ -121,33 +158,121 @@ def build_embeddings_cache(papers):
     return index
 
 
-def save_cache(papers, index):
-    """Save papers and embeddings to cache files."""
+def save_cache(
+    papers,
+    index,
+    compress: bool = False,
+    ann: bool = False,
+    half: bool = False,
+    quantize: Optional[str] = None,
+):
+    """Save papers and embeddings to cache files.
+
+    Papers are written as compact JSON. With ``compress=True`` the papers
+    JSON is gzipped and the embeddings are written as a Blosc2 array
+    (bitshuffle + LZ4) instead of a plain ``.npy`` file. Requires ``blosc2``.
+    With ``ann=True`` an HNSW graph over the embeddings is saved as well.
+    Requires ``hnswlib``. With ``half=True`` embeddings are stored as float16,
+    halving the file and the pages the memory-mapped matrix touches.
+    With ``quantize="int8"`` or ``"binary"`` the quantized search copy is
+    saved too, so the server does not re-quantize the matrix on startup.
+    """
     print("💾 Saving cache files...")
 
     # Create data directory
     data_dir = Path(__file__).parent.parent / "src" / "data"
     data_dir.mkdir(exist_ok=True)
 
-    # Save papers as JSON
-    papers_file = data_dir / "precomputed_papers.json"
-    papers_data = [paper.model_dump() for paper in papers]
-    with open(papers_file, "w", encoding="utf-8") as f:
-        json.dump(papers_data, f, ensure_ascii=False, indent=2)
+    # Save papers as JSON. Only papers that were actually embedded are kept so
+    # that the JSON entries and the embedding rows stay aligned by position.
+    json_file = data_dir / "precomputed_papers.json"
+    gz_file = data_dir / "precomputed_papers.json.gz"
+    # mode="json" yields plain JSON types, which orjson encodes straight to UTF-8
+    papers_data = [
+        paper.model_dump(mode="json") for paper, _ in index.papers_with_embeddings
+    ]
+    papers_bytes = orjson.dumps(papers_data)
+    if compress:
+        with _atomic_write(gz_file) as tmp:
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(papers_bytes)
+        # The loader prefers .json, so drop any stale uncompressed copy
+        json_file.unlink(missing_ok=True)
+        papers_file = gz_file
+    else:
+        with _atomic_write(json_file) as tmp:
+            tmp.write_bytes(papers_bytes)
+        gz_file.unlink(missing_ok=True)
+        papers_file = json_file
     print(f"  📄 Papers saved to {papers_file}")
 
-    # Save embeddings as pickle
-    embeddings_file = data_dir / "precomputed_embeddings.pkl"
-    with open(embeddings_file, "wb") as f:
-        pickle.dump(index.papers_with_embeddings, f)
-    print(f"  🧮 Embeddings saved to {embeddings_file}")
+    # Save embeddings as a single contiguous (N, dim) float32/float16 matrix.
+    # Rows are in the same order as the papers JSON above.
+    npy_file = data_dir / "precomputed_embeddings.npy"
+    b2nd_file = data_dir / "precomputed_embeddings.b2nd"
+    emb = np.stack([e for _, e in index.papers_with_embeddings]).astype(
+        np.float16 if half else np.float32, copy=False
+    )
+    if compress:
+        import blosc2
+
+        # Unit vectors share most exponent bits, so bitshuffle + LZ4 compresses
+        # well and decompresses faster than reading the raw bytes.
+        with _atomic_write(b2nd_file) as tmp:
+            blosc2.asarray(
+                emb,
+                urlpath=str(tmp),
+                mode="w",
+                cparams={
+                    "codec": blosc2.Codec.LZ4,
+                    "filters": [blosc2.Filter.BITSHUFFLE],
+                    "clevel": 5,
+                },
+            )
+        # The loader prefers .npy, so drop any stale uncompressed copy
+        npy_file.unlink(missing_ok=True)
+        embeddings_file = b2nd_file
+    else:
+        with _atomic_write(npy_file) as tmp:
+            np.save(tmp, emb, allow_pickle=False)
+        b2nd_file.unlink(missing_ok=True)
+        embeddings_file = npy_file
+    print(
+        f"  🧮 Embeddings saved to {embeddings_file} "
+        f"(shape={emb.shape}, dtype={emb.dtype})"
+    )
+
+    quantized_file = data_dir / "precomputed_quantized.npz"
+    if quantize:
+        index.quantize(quantize)
+        with _atomic_write(quantized_file) as tmp:
+            index.save_quantized(tmp)
+        print(f"  🗜️  {quantize} embeddings saved to {quantized_file}")
+    else:
+        # A copy from a previous build would not match the new embeddings
+        quantized_file.unlink(missing_ok=True)
+
+    ann_file = data_dir / "precomputed_hnsw.bin"
+    if ann:
+        index.build_ann_index()
+        with _atomic_write(ann_file) as tmp:
+            index.save_ann_index(tmp)
+        print(f"  🕸️  HNSW index saved to {ann_file}")
+    else:
+        # A graph from a previous build would not match the new embeddings
+        ann_file.unlink(missing_ok=True)
 
     print("✅ Cache built successfully!")
-    print(f"   Papers: {len(papers)}")
+    print(f"   Papers: {len(papers_data)} (collected: {len(papers)})")
     print(f"   Embeddings: {len(index.papers_with_embeddings)}")
 
 
-async def main():
+async def main(
+    compress: bool = False,
+    ann: bool = False,
+    half: bool = False,
+    quantize: Optional[str] = None,
+):
     """Main cache building function."""
     print("🏗️  Building precomputed cache for Papers RAG Agent")
     print("=" * 50)
@@ -168,7 +293,9 @@ async def main():
             return
 
         # Save caches
-        save_cache(papers, index)
+        save_cache(
+            papers, index, compress=compress, ann=ann, half=half, quantize=quantize
+        )
 
         print("=" * 50)
         print("🎉 Cache building completed successfully!")
@@ -181,4 +308,36 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help=(
+            "gzip the papers JSON and write embeddings as a Blosc2-compressed "
+            ".b2nd array (needs blosc2)"
+        ),
+    )
+    parser.add_argument(
+        "--ann",
+        action="store_true",
+        help="also save an HNSW graph for approximate search (needs hnswlib)",
+    )
+    parser.add_argument(
+        "--fp16",
+        action="store_true",
+        help="store embeddings as float16 (half the size, memory-mapped on load)",
+    )
+    parser.add_argument(
+        "--quantize",
+        choices=("int8", "binary"),
+        help="also save a quantized copy used to shortlist search candidates",
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            compress=args.compress,
+            ann=args.ann,
+            half=args.fp16,
+            quantize=args.quantize,
+        )
+    )
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """Generate Mermaid diagrams for LangGraph workflows."""
 
+import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from graphs.message_routing import create_message_routing_graph
@@ -9,8 +11,23 @@ from graphs.corrective_rag import create_corrective_rag_graph
 from graphs.content_enhancement import create_content_enhancement_graph
 
 
-def generate_all_mermaid_graphs():
-    """Generate Mermaid diagrams for all LangGraph workflows."""
+def _write_if_changed(path: Path, content: str, force: bool = False) -> bool:
+    """Write content to path unless the file already holds identical content.
+
+    Returns True if the file was written.
+    """
+    new = content.encode("utf-8")
+    if not force and path.exists() and path.read_bytes() == new:
+        return False
+    path.write_bytes(new)
+    return True
+
+
+def generate_all_mermaid_graphs(force: bool = False):
+    """Generate Mermaid diagrams for all LangGraph workflows.
+
+    Files whose content is unchanged are left untouched unless force is True.
+    """
 
     # Create output directory
     output_dir = Path(__file__).parent.parent / "docs" / "graphs"
@@ -18,22 +35,30 @@ def generate_all_mermaid_graphs():
 
     graphs = {
         "message_routing": {
-            "graph": create_message_routing_graph(),
+            "builder": create_message_routing_graph,
             "title": "Message Routing Workflow",
             "description": "Main workflow for routing user messages to appropriate processors",
         },
         "corrective_rag": {
-            "graph": create_corrective_rag_graph(),
+            "builder": create_corrective_rag_graph,
             "title": "Corrective RAG Workflow",
             "description": "RAG workflow with HyDE-based query correction for improved retrieval",
         },
         "content_enhancement": {
-            "graph": create_content_enhancement_graph(),
+            "builder": create_content_enhancement_graph,
             "title": "Content Enhancement Workflow",
             "description": "Post-processing workflow to generate Cornell notes and quiz questions",
         },
     }
 
+    # Graph builds are independent, so compile them concurrently
+    with ThreadPoolExecutor(max_workers=len(graphs)) as executor:
+        futures = {
+            name: executor.submit(config["builder"]) for name, config in graphs.items()
+        }
+        for name, config in graphs.items():
+            config["graph"] = futures[name].result()
+
     print("🎨 Generating Mermaid diagrams for LangGraph workflows...")
 
     for name, config in graphs.items():
@@ -45,49 +70,62 @@ def generate_all_mermaid_graphs():
 
             # Save to file
             mermaid_file = output_dir / f"{name}.mmd"
-            with open(mermaid_file, "w", encoding="utf-8") as f:
-                f.write(f"---\ntitle: {config['title']}\n---\n")
-                f.write(mermaid_code)
-
-            print(f"    ✅ Saved: {mermaid_file}")
+            mermaid_content = f"---\ntitle: {config['title']}\n---\n" + mermaid_code
+            if _write_if_changed(mermaid_file, mermaid_content, force):
+                print(f"    ✅ Saved: {mermaid_file}")
+            else:
+                print(f"    ⏭️  Unchanged: {mermaid_file}")
 
             # Also create a markdown file with the diagram
             md_file = output_dir / f"{name}.md"
-            with open(md_file, "w", encoding="utf-8") as f:
-                f.write(f"# {config['title']}\n\n")
-                f.write(f"{config['description']}\n\n")
-                f.write("```mermaid\n")
-                f.write(mermaid_code)
-                f.write("\n```\n")
-
-            print(f"    ✅ Saved: {md_file}")
+            md_content = (
+                f"# {config['title']}\n\n"
+                f"{config['description']}\n\n"
+                "```mermaid\n"
+                f"{mermaid_code}"
+                "\n```\n"
+            )
+            if _write_if_changed(md_file, md_content, force):
+                print(f"    ✅ Saved: {md_file}")
+            else:
+                print(f"    ⏭️  Unchanged: {md_file}")
 
         except Exception as e:
             print(f"    ❌ Failed to generate {name}: {e}")
 
     # Create an index file
     index_file = output_dir / "README.md"
-    with open(index_file, "w", encoding="utf-8") as f:
-        f.write("# LangGraph Workflow Diagrams\n\n")
-        f.write(
-            "This directory contains Mermaid diagrams for all LangGraph workflows in the Papers RAG Agent.\n\n"
+    parts = [
+        "# LangGraph Workflow Diagrams\n\n",
+        "This directory contains Mermaid diagrams for all LangGraph workflows in the Papers RAG Agent.\n\n",
+    ]
+    for name, config in graphs.items():
+        parts.append(
+            f"## {config['title']}\n\n"
+            f"{config['description']}\n\n"
+            f"- [Mermaid file]({name}.mmd)\n"
+            f"- [Markdown with diagram]({name}.md)\n\n"
         )
-
-        for name, config in graphs.items():
-            f.write(f"## {config['title']}\n\n")
-            f.write(f"{config['description']}\n\n")
-            f.write(f"- [Mermaid file]({name}.mmd)\n")
-            f.write(f"- [Markdown with diagram]({name}.md)\n\n")
-
-    print(f"📚 Created index: {index_file}")
+    if _write_if_changed(index_file, "".join(parts), force):
+        print(f"📚 Created index: {index_file}")
+    else:
+        print(f"⏭️  Index unchanged: {index_file}")
     print("✅ All Mermaid diagrams generated successfully!")
 
     return output_dir
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rewrite diagram files even if their content is unchanged",
+    )
+    args = parser.parse_args()
+
     try:
-        output_dir = generate_all_mermaid_graphs()
+        output_dir = generate_all_mermaid_graphs(force=args.force)
         print(f"\n🎯 Output directory: {output_dir}")
         print(
             "💡 You can now use these Mermaid diagrams in your README or documentation."
@@ -3,16 +3,8 @@
 from src.models import AnswerPayload, Citation, CornellNote, QuizItem, QuizOption
 
 
-def run_agent(user_query: str) -> AnswerPayload:
-    """
-    Mock implementation that returns fixed test data.
-
-    Args:
-        user_query: User's question (currently ignored in mock)
-
-    Returns:
-        Fixed AnswerPayload with sample data
-    """
+def _build_payload() -> AnswerPayload:
+    """Build the fixed sample AnswerPayload."""
     # TODO: （RAG）選択/上位の論文PDFをダウンロード→テキスト化→分割→埋め込み→ベクトルDBへ upsert。doc_id=f"{arxiv_id}_v{version}" で重複回避。
     # Mock citations
     citations = [
@@ -88,3 +80,23 @@ def run_agent(user_query: str) -> AnswerPayload:
         quiz_items=quiz_items,
         citations=citations,
     )
+
+
+# The mock data never changes, so validate it once at import time
+_CACHED_PAYLOAD = _build_payload()
+
+
+def run_agent(user_query: str) -> AnswerPayload:
+    """
+    Mock implementation that returns fixed test data.
+
+    The same payload instance is returned on every call, so callers must
+    treat it as read-only.
+
+    Args:
+        user_query: User's question (currently ignored in mock)
+
+    Returns:
+        Fixed AnswerPayload with sample data
+    """
+    return _CACHED_PAYLOAD
@@ -1,10 +1,97 @@
 """ArXiv service for searching papers."""
 
-from typing import List, Dict, Any
-from src.retrieval.arxiv_searcher import run_arxiv_search
+import asyncio
+from typing import List, Optional
 
+from pydantic import TypeAdapter
 
-async def search(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+from src.api.schema import Paper as PaperItem
+from src.config import get_arxiv_cache_ttl
+from src.models import Paper
+from src.utils.ttl_cache import TTLCache
+from src.retrieval.arxiv_searcher import (
+    fetch_arxiv_paper,
+    run_arxiv_search,
+    search_arxiv_papers,
+)
+
+
+# Validates a whole result page in one pass instead of one model at a time
+_paper_items = TypeAdapter(List[PaperItem])
+
+# Identical arXiv queries are common (digest refreshes, repeated searches),
+# so results are reused for ARXIV_CACHE_TTL seconds.
+_search_cache = TTLCache(maxsize=512, ttl=get_arxiv_cache_ttl())
+
+# Metadata of a given arXiv ID practically never changes, so keep it for a day
+PAPER_CACHE_TTL = 24 * 3600
+_paper_cache = TTLCache(maxsize=1024, ttl=PAPER_CACHE_TTL)
+
+# IDs arXiv had no entry for are remembered briefly, so repeated views of
+# an unavailable paper short-circuit without another round-trip
+MISSING_PAPER_TTL = 600
+_missing_paper_cache = TTLCache(maxsize=4096, ttl=MISSING_PAPER_TTL)
+
+
+async def search_papers(
+    query: str, max_results: int = 10, date_range: Optional[str] = None
+) -> List[Paper]:
+    """
+    Search ArXiv for Paper objects, reusing recent results for identical queries.
+
+    Args:
+        query: Search query
+        max_results: Maximum number of results
+        date_range: Optional date range like "20250101* TO 20250102*"
+
+    Returns:
+        List of Paper objects
+    """
+    key = ("papers", query, max_results, date_range)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    papers = await asyncio.to_thread(
+        search_arxiv_papers, query, max_results=max_results, date_range=date_range
+    )
+    # feedparser reports an unreachable or throttling arXiv as an empty feed
+    # rather than an exception, so empty pages are never cached
+    if papers:
+        _search_cache.set(key, papers)
+    return papers
+
+
+async def fetch_paper(paper_id: str) -> Optional[Paper]:
+    """
+    Look up a single paper by arXiv ID, reusing recent lookups.
+
+    Args:
+        paper_id: arXiv ID
+
+    Returns:
+        Paper, or None if arXiv has no entry for the ID
+
+    Raises:
+        RuntimeError: If the arXiv request failed; failures are not cached
+    """
+    cached = _paper_cache.get(paper_id)
+    if cached is not None:
+        return cached
+    if _missing_paper_cache.get(paper_id) is not None:
+        return None
+
+    # Raises on a failed request, so only a clean empty response is
+    # remembered as missing
+    paper = await asyncio.to_thread(fetch_arxiv_paper, paper_id)
+    if paper is None:
+        _missing_paper_cache.set(paper_id, True)
+    else:
+        _paper_cache.set(paper_id, paper)
+    return paper
+
+
+async def search(query: str, max_results: int = 10) -> List[PaperItem]:
     """
     Search ArXiv for papers.
 
@@ -13,29 +100,36 @@ async def search(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         max_results: Maximum number of results
 
     Returns:
-        List of paper dictionaries
+        List of API paper models, ready to be returned by the router
     """
+    key = ("search", query, max_results)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
-        # Use existing ArXiv searcher
-        results = run_arxiv_search(query, max_results=max_results)
+        # Use existing ArXiv searcher (blocking HTTP, so run it off the event loop)
+        results = await asyncio.to_thread(
+            run_arxiv_search, query, max_results=max_results
+        )
 
-        # Convert to expected format
-        formatted_results: List[Dict[str, Any]] = []
-        for paper in results:
-            formatted_results.append(
+        items = _paper_items.validate_python(
+            [
                 {
                     "id": paper.get("id", ""),
                     "title": paper.get("title", ""),
                     "url": paper.get("link", ""),
                     "summary": paper.get("summary", ""),
                     "authors": paper.get("authors", []),
-                    "pdf": paper.get("pdf", ""),
-                    "categories": paper.get("categories", []),
-                    "updated": paper.get("updated", ""),
                 }
-            )
+                for paper in results
+            ]
+        )
 
-        return formatted_results
+        # Empty results may be a failed request, so they are not cached
+        if items:
+            _search_cache.set(key, items)
+        return items
 
     except Exception:
         # Return empty results on error
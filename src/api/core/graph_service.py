@@ -1,9 +1,15 @@
 """Graph service for streaming responses using LangGraph workflows."""
 
-import asyncio
-from typing import AsyncGenerator, Dict, Any
+import time
+from typing import AsyncGenerator, Dict, Any, List
+from src.graphs.message_routing import astream_message_with_routing
 from src.retrieval.inmemory import InMemoryIndex
 
+# Coalesce small upstream chunks into larger SSE events to cut per-event
+# framing/encoding overhead. The first chunk is always sent immediately.
+FLUSH_CHARS = 2048
+FLUSH_INTERVAL_SEC = 0.03
+
 
 async def stream_message(
     question: str, index: InMemoryIndex
@@ -11,6 +17,10 @@ async def stream_message(
     """
     Stream a response using LangGraph workflows.
 
+    Content from the workflow is buffered and flushed once it reaches
+    ``FLUSH_CHARS`` characters or ``FLUSH_INTERVAL_SEC`` has passed since the
+    last flush. The final flush carries ``done=True``.
+
     Args:
         question: User question
         index: RAG index to search
@@ -19,30 +29,37 @@ async def stream_message(
         Dict chunks for streaming response
     """
     try:
-        # Import here to avoid circular imports
-        from src.graphs.message_routing import process_message_with_routing
-
         # Show processing status
         yield {"type": "status", "text": "🔍 質問を処理中です...", "done": False}
 
-        # Use LangGraph workflow for streaming in a thread to avoid blocking
-        response = await asyncio.to_thread(
-            process_message_with_routing, question, rag_index=index
-        )
-
-        # Show completion status
-        yield {"type": "status", "text": "✅ 回答を生成中です...", "done": False}
-
-        # Stream the response in chunks
-        chunk_size = 50  # Characters per chunk
-        for i in range(0, len(response), chunk_size):
-            chunk = response[i : i + chunk_size]
-            yield {
-                "type": "content",
-                "text": chunk,
-                "done": i + chunk_size >= len(response),
-            }
-            await asyncio.sleep(0.01)  # Small delay for streaming effect
+        buf: List[str] = []
+        buf_len = 0
+        first = True
+        last_flush = time.monotonic()
+
+        async for text in astream_message_with_routing(question, rag_index=index):
+            if first:
+                # Show completion status, then send the first chunk right away
+                yield {
+                    "type": "status",
+                    "text": "✅ 回答を生成中です...",
+                    "done": False,
+                }
+                yield {"type": "content", "text": text, "done": False}
+                first = False
+                last_flush = time.monotonic()
+                continue
+
+            buf.append(text)
+            buf_len += len(text)
+            now = time.monotonic()
+            if buf_len >= FLUSH_CHARS or now - last_flush >= FLUSH_INTERVAL_SEC:
+                yield {"type": "content", "text": "".join(buf), "done": False}
+                buf.clear()
+                buf_len = 0
+                last_flush = now
+
+        yield {"type": "content", "text": "".join(buf), "done": True}
 
     except Exception as e:
         # Fallback to simple error response
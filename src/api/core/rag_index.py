@@ -1,9 +1,11 @@
 import asyncio
 import logging
 from threading import RLock
-from typing import List, Optional, Sequence
+from typing import Dict, List, Optional, Sequence
 
+from src.config import get_embedding_quantization, use_ann_index
 from src.data.cache_loader import cache_exists, load_precomputed_cache
+from src.models import Paper
 from src.retrieval.arxiv_searcher import search_arxiv_papers
 from src.retrieval.inmemory import InMemoryIndex
 
@@ -11,13 +13,15 @@ log = logging.getLogger(__name__)
 
 
 class RagIndexHolder:
+    # _index は丸ごと差し替えるだけで、その場で変更しない。
+    # 参照の読み書きはアトミックなので、読み取り側はロックを取らない。
+    # ロックは set() 同士（同時リビルド）の直列化にのみ使う。
     def __init__(self) -> None:
         self._index: Optional[InMemoryIndex] = None
         self._lock = RLock()
 
     def get(self) -> Optional[InMemoryIndex]:
-        with self._lock:
-            return self._index
+        return self._index
 
     def set(self, idx: InMemoryIndex) -> None:
         if idx is None:
@@ -26,15 +30,15 @@ class RagIndexHolder:
             self._index = idx
 
     def is_ready(self) -> bool:
-        with self._lock:
-            return self._index is not None
+        return self._index is not None
 
     def size(self) -> int:
-        with self._lock:
-            if self._index is None:
-                return 0
-            # InMemoryIndex 側の属性名に合わせる
-            return len(self._index.papers_with_embeddings)
+        # 差し替えと競合しないよう、ローカルにスナップショットを取る
+        idx = self._index
+        if idx is None:
+            return 0
+        # InMemoryIndex 側の属性名に合わせる
+        return len(idx.papers_with_embeddings)
 
 
 _DEFAULT_QUERIES = (
@@ -50,17 +54,79 @@ _DEFAULT_QUERIES = (
 _FALLBACK_QUERIES = ("transformer", "attention mechanism", "BERT", "GPT")
 
 
+# arXiv API のレート制限を超えないよう同時リクエスト数を制限する
+_MAX_CONCURRENT_QUERIES = 4
+
+# 動的ビルドでこの件数のユニーク論文が集まったら、残りのクエリは打ち切る
+_MAX_INDEX_PAPERS = 50
+
+
 def load_or_build_index(
     queries: Sequence[str] = _DEFAULT_QUERIES,
     per_query: int = 8,
     fallback_queries: Sequence[str] = _FALLBACK_QUERIES,
     fallback_per_query: int = 10,
+    quantization: Optional[str] = None,
+    max_papers: Optional[int] = _MAX_INDEX_PAPERS,
+) -> InMemoryIndex:
+    """同期版。イベントループ外（スクリプト等）から呼び出す用途。"""
+    return asyncio.run(
+        a_load_or_build_index(
+            queries,
+            per_query,
+            fallback_queries,
+            fallback_per_query,
+            quantization,
+            max_papers,
+        )
+    )
+
+
+async def a_load_or_build_index(
+    queries: Sequence[str] = _DEFAULT_QUERIES,
+    per_query: int = 8,
+    fallback_queries: Sequence[str] = _FALLBACK_QUERIES,
+    fallback_per_query: int = 10,
+    quantization: Optional[str] = None,
+    max_papers: Optional[int] = _MAX_INDEX_PAPERS,
+) -> InMemoryIndex:
+    """
+    quantization: 検索候補の絞り込みに使う埋め込みの量子化方式
+    （"none" / "int8" / "binary"）。None の場合は EMBEDDING_QUANTIZATION に従う。
+    max_papers: 動的ビルド時に集める論文数の上限。None なら全クエリを実行する。
+    """
+    idx = await _a_load_or_build_index(
+        queries, per_query, fallback_queries, fallback_per_query, max_papers
+    )
+
+    # キャッシュに同じ方式の量子化済みコピーが同梱されていれば再計算しない
+    mode = quantization or get_embedding_quantization()
+    if mode != "none" and not idx.is_quantized(mode):
+        await asyncio.to_thread(idx.quantize, mode)
+        log.info("🗜️ Quantized index embeddings (%s)", mode)
+
+    # キャッシュに HNSW グラフが同梱されていればそれを使い、なければここで構築
+    if use_ann_index() and idx.papers_with_embeddings and not idx.has_ann_index():
+        try:
+            await asyncio.to_thread(idx.build_ann_index)
+            log.info("🕸️ Built HNSW index (papers=%d)", len(idx.papers_with_embeddings))
+        except ImportError:
+            log.warning("⚠️ USE_ANN_INDEX is set but hnswlib is not installed.")
+    return idx
+
+
+async def _a_load_or_build_index(
+    queries: Sequence[str],
+    per_query: int,
+    fallback_queries: Sequence[str],
+    fallback_per_query: int,
+    max_papers: Optional[int],
 ) -> InMemoryIndex:
     # 1) キャッシュ
     try:
         if cache_exists():
             log.info("📖 Loading precomputed cache...")
-            idx = load_precomputed_cache()
+            idx = await asyncio.to_thread(load_precomputed_cache)
             if idx is not None:
                 log.info(
                     "✅ Loaded index from cache (papers=%d)",
@@ -74,13 +140,15 @@ def load_or_build_index(
         log.exception("⚠️ Cache load failed; fallback to dynamic build.")
 
     # 2) 動的ビルド（メインクエリ）
-    idx = _build_index_from_queries(queries, per_query)
+    idx = await _build_index_from_queries(queries, per_query, max_papers)
     if idx is not None:
         return idx
 
     # 3) フォールバッククエリ
     log.warning("⚠️ Main queries yielded no unique papers; trying fallback queries...")
-    idx = _build_index_from_queries(fallback_queries, fallback_per_query)
+    idx = await _build_index_from_queries(
+        fallback_queries, fallback_per_query, max_papers
+    )
     if idx is not None:
         return idx
 
@@ -91,57 +159,74 @@ def load_or_build_index(
     return empty
 
 
-async def a_load_or_build_index(
-    queries=_DEFAULT_QUERIES,
-    per_query: int = 8,
-    fallback_queries=_FALLBACK_QUERIES,
-    fallback_per_query: int = 10,
-) -> InMemoryIndex:
-    return await asyncio.to_thread(
-        load_or_build_index,
-        queries,
-        per_query,
-        fallback_queries,
-        fallback_per_query,
-    )
-
-
-def _build_index_from_queries(
+async def _build_index_from_queries(
     queries: Sequence[str],
     per_query: int,
+    max_papers: Optional[int] = None,
 ) -> Optional[InMemoryIndex]:
-    all_papers: List = []
-    for i, q in enumerate(queries, start=1):
-        try:
-            batch = search_arxiv_papers(q, max_results=per_query)
-            all_papers.extend(batch)
-            log.info(
-                "🔎 Query %d/%d '%s' -> %d papers",
-                i,
-                len(queries),
-                q,
-                len(batch),
+    # 同じクエリは1回だけ実行する（順序は維持）
+    queries = list(dict.fromkeys(queries))
+
+    # 各クエリの arXiv 検索を並列実行（待ち時間は最も遅い1件分に近づく）
+    sem = asyncio.Semaphore(_MAX_CONCURRENT_QUERIES)
+
+    async def _search(q: str) -> List[Paper]:
+        async with sem:
+            return await asyncio.to_thread(
+                search_arxiv_papers, q, max_results=per_query
+            )
+
+    tasks = {asyncio.create_task(_search(q)): q for q in queries}
+    pending = set(tasks)
+
+    # 完了したクエリから順に重複排除し、上限に達したら残りのクエリを打ち切る
+    unique: Dict[str, Paper] = {}
+    completed = 0
+    try:
+        while pending and (max_papers is None or len(unique) < max_papers):
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
             )
-        except Exception:
-            log.exception("  ❌ Query failed: %s", q)
-
-    # 重複排除（Paperオブジェクトが .id を持つ前提）
-    seen_ids = set()
-    unique = []
-    for p in all_papers:
-        pid = getattr(p, "id", None)
-        if pid and pid not in seen_ids:
-            seen_ids.add(pid)
-            unique.append(p)
+            for task in done:
+                completed += 1
+                q = tasks[task]
+                exc = task.exception()
+                if exc is not None:
+                    log.error("  ❌ Query failed: %s", q, exc_info=exc)
+                    continue
+                batch = task.result()
+                log.info(
+                    "🔎 Query %d/%d '%s' -> %d papers",
+                    completed,
+                    len(queries),
+                    q,
+                    len(batch),
+                )
+                for p in batch:
+                    pid = getattr(p, "id", None)
+                    if pid:
+                        unique.setdefault(pid, p)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if pending:
+        log.info(
+            "✂️ Reached %d papers; skipped %d remaining queries",
+            len(unique),
+            len(pending),
+        )
 
     if not unique:
         return None
 
+    papers = list(unique.values())[:max_papers]
     idx = InMemoryIndex()
-    idx.build(unique)  # 内部で埋め込みなどを構築する想定
+    # 埋め込み生成は同期I/Oのためスレッドで実行
+    await asyncio.to_thread(idx.build, papers)
     log.info(
         "✅ Built InMemoryIndex (papers=%d, embedded=%d)",
-        len(unique),
+        len(papers),
         len(idx.papers_with_embeddings),
     )
     return idx
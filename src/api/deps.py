@@ -1,4 +1,5 @@
 from __future__ import annotations
+from fastapi import Depends, HTTPException
 from src.api.core.rag_index import RagIndexHolder
 
 _holder = RagIndexHolder()
@@ -6,3 +7,12 @@ _holder = RagIndexHolder()
 
 def get_index_holder() -> RagIndexHolder:
     return _holder
+
+
+async def require_ready_holder(
+    holder: RagIndexHolder = Depends(get_index_holder),
+) -> RagIndexHolder:
+    # インデックスはバックグラウンドで構築されるため、完了前は 503 を返す
+    if not holder.is_ready():
+        raise HTTPException(status_code=503, detail="RAG index not ready")
+    return holder
@@ -1,32 +1,83 @@
 from __future__ import annotations
+import asyncio
+import atexit
 import logging
-from contextlib import asynccontextmanager
+import logging.handlers
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+
+import anyio.to_thread
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.api.deps import get_index_holder
 from src.api.core.rag_index import a_load_or_build_index
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s"
+# ログの stdout 書き込みはリスナースレッドに任せ、イベントループのスレッドでは
+# キューに積むだけにする（エラー多発時に write() でループを止めないため）
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s")
 )
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# 書式はリスナー側で適用する（キュー側はメッセージの展開のみ）
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler])
 log = logging.getLogger("papers-api")
 
+# arXiv/OpenAI への同期I/Oはワーカースレッドで実行されるため、
+# 同時ユーザー数がスレッド数で頭打ちにならないよう上限を引き上げる
+_THREADPOOL_SIZE = 64
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    holder = get_index_holder()
-    log.info("Initializing RAG index…")
+
+def _configure_threadpools() -> None:
+    # Starlette が同期エンドポイント/依存関係の実行に使う anyio のスレッドプール
+    anyio.to_thread.current_default_thread_limiter().total_tokens = _THREADPOOL_SIZE
+    # asyncio.to_thread と LangGraph の同期ノード実行が使う既定 executor
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=_THREADPOOL_SIZE)
+    )
+
+
+async def _background_init(holder) -> None:
     try:
         idx = await a_load_or_build_index()
         holder.set(idx)
         log.info("✅ index ready (size=%d)", holder.size())
     except Exception as e:
         log.exception("❌ index init failed: %s", e)
-    yield
 
 
-app = FastAPI(title="Papers API", version="0.1.0", lifespan=lifespan)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _configure_threadpools()
+    holder = get_index_holder()
+    # インデックス構築を待たずにリクエスト受付を開始する。
+    # 構築完了までは /health が rag_ready=false、/rag/* は 503 を返す
+    log.info("Initializing RAG index in background…")
+    init_task = asyncio.create_task(_background_init(holder))
+    try:
+        yield
+    finally:
+        init_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await init_task
+
+
+# レスポンスの JSON エンコードは orjson で行う（リスト系エンドポイントで効く）
+app = FastAPI(
+    title="Papers API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS
 app.add_middleware(
@@ -34,9 +85,10 @@ app.add_middleware(
     allow_origins=[
         "http://localhost:3000",
         "http://127.0.0.1:3000",
-        "https://*.run.app",  # Cloud Runのデフォルトドメイン
-        "https://*.googleusercontent.com",  # Cloud Runのカスタムドメイン
     ],
+    # allow_origins はワイルドカードを解釈しないため、サブドメインは正規表現で許可する
+    # （Cloud Runのデフォルトドメイン / カスタムドメイン）
+    allow_origin_regex=r"https://([a-z0-9-]+\.)+(run\.app|googleusercontent\.com)",
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -1,8 +1,9 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException
 from src.api.deps import get_index_holder
-from src.api.schema import InitIndexRequest, InitIndexResponse
+from src.api.schema import InitIndexRequest, InitIndexResponse, TranslationCacheStats
 from src.api.core.rag_index import a_load_or_build_index
+from src.api.utils.persona import get_translation_cache_stats
 
 log = logging.getLogger(__name__)
 router = APIRouter()
@@ -19,3 +20,8 @@ async def init_index(_: InitIndexRequest, holder=Depends(get_index_holder)):
     except Exception as e:
         log.exception("init-index failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/admin/translation-cache", response_model=TranslationCacheStats)
+async def translation_cache_stats():
+    return TranslationCacheStats(**get_translation_cache_stats())
@@ -1,20 +1,29 @@
 from __future__ import annotations
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 import asyncio
-from fastapi import APIRouter, Query, HTTPException
-from pydantic import BaseModel
+import logging
+import orjson
+from fastapi import APIRouter, Header, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
 
-from src.retrieval.arxiv_searcher import search_arxiv_papers
+from src.api.core.arxiv_service import fetch_paper, search_papers
 from src.api.utils.persona import (
     filter_papers,
     exclude_only,
-    make_short_summary,
-    translate_to_japanese,
+    keyword_blobs,
+    shorten_summary,
+    a_translate_batch,
+    a_translate_to_japanese,
     get_min_results_threshold,
 )
+from src.config import get_translate_max_inflight
 from src.models import Paper, CornellNote, QuizItem, Citation
 
+log = logging.getLogger(__name__)
+
 
 def _generate_paper_structure(title: str, summary: str, rag_results: list) -> dict:
     """
@@ -42,11 +51,11 @@ def _generate_paper_structure(title: str, summary: str, rag_results: list) -> di
                 sections = _extract_paper_sections(result.text)
                 structure["sections"].extend(sections)
         except Exception as e:
-            print(f"⚠️ Error processing RAG result: {e}")
+            log.warning("⚠️ Error processing RAG result: %s", e)
             continue
 
-    # 重複を除去
-    structure["sections"] = list(set(structure["sections"]))
+    # 重複を除去（出現順を保持）
+    structure["sections"] = list(dict.fromkeys(structure["sections"]))
 
     # サボっていないかをチェック
     if len(structure["sections"]) < 3:
@@ -56,6 +65,27 @@ def _generate_paper_structure(title: str, summary: str, rag_results: list) -> di
     return structure
 
 
+# 一般的な章立てパターン（小文字化したものを事前に用意しておく）
+_SECTION_PATTERNS = tuple(
+    (name, name.lower())
+    for name in (
+        "Abstract",
+        "Introduction",
+        "Related Work",
+        "Methodology",
+        "Method",
+        "Approach",
+        "Experiments",
+        "Results",
+        "Discussion",
+        "Conclusion",
+        "Future Work",
+        "Acknowledgments",
+        "References",
+    )
+)
+
+
 def _extract_paper_sections(text: str) -> List[str]:
     """
     テキストから論文の章立てを抽出する
@@ -67,37 +97,40 @@ def _extract_paper_sections(text: str) -> List[str]:
         章立てのリスト
     """
     try:
-        sections = []
-
-        # 一般的な章立てパターンを検索
-        section_patterns = [
-            "Abstract",
-            "Introduction",
-            "Related Work",
-            "Methodology",
-            "Method",
-            "Approach",
-            "Experiments",
-            "Results",
-            "Discussion",
-            "Conclusion",
-            "Future Work",
-            "Acknowledgments",
-            "References",
-        ]
-
-        for pattern in section_patterns:
-            if pattern.lower() in text.lower():
-                sections.append(pattern)
-
-        return sections
+        return list(_match_sections(text))
     except Exception as e:
-        print(f"⚠️ Section extraction failed: {e}")
+        log.warning("⚠️ Section extraction failed: %s", e)
         return []
 
 
+@lru_cache(maxsize=1024)
+def _match_sections(text: str) -> Tuple[str, ...]:
+    # 3つの RAG 質問は同じチャンクを返すことが多いため、テキスト単位で結果を再利用する
+    # 小文字化は1回だけ行い、各パターンは部分一致で判定する
+    lowered = text.lower()
+    return tuple(name for name, pattern in _SECTION_PATTERNS if pattern in lowered)
+
+
 router = APIRouter()
 
+# 翻訳（LLM呼び出し）の同時実行数の上限（TRANSLATE_MAX_INFLIGHT、既定8）。
+# リクエスト単位ではなくプロセス全体で共有し、同時アクセス時も上流への呼び出しを抑える。
+# 枠は LLM 呼び出し1回ごとに取得する（まとめ翻訳のフォールバック時も1件ずつ）
+_translation_sem = asyncio.Semaphore(get_translate_max_inflight())
+
+
+async def _translate_limited(text: str, max_chars: int) -> str:
+    async with _translation_sem:
+        return await a_translate_to_japanese(text, max_chars)
+
+
+# 1回の翻訳リクエストにまとめる英語テキストの合計文字数の目安。
+# 日本語訳が generate_answer の max_tokens に収まる程度に抑える
+_TRANSLATION_BATCH_CHARS = 1500
+
+# Accept にこれが含まれる場合、/digest は翻訳が終わった順に1行1件で返す
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 
 class DigestItem(BaseModel):
     id: str
@@ -125,12 +158,36 @@ class DigestDetails(BaseModel):
     paper_structure: Optional[dict] = None
 
 
+# /digest の一覧を1回のパスで検証するためのアダプタ（モジュール読み込み時に生成）
+_digest_items = TypeAdapter(List[DigestItem])
+
+
+def _group_for_translation(papers: List[Paper], budget: int) -> List[List[Paper]]:
+    """タイトル＋短縮要約の文字数が budget に収まるよう論文を順にまとめる"""
+    groups: List[List[Paper]] = []
+    cur: List[Paper] = []
+    size = 0
+    for p in papers:
+        n = len(p.title) + min(len(p.summary or ""), 300)
+        if cur and size + n > budget:
+            groups.append(cur)
+            cur, size = [], 0
+        cur.append(p)
+        size += n
+    if cur:
+        groups.append(cur)
+    return groups
+
+
+def _yyyymmdd(dt: datetime) -> str:
+    # strftime("%Y%m%d") より f-string の方が高速
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}"
+
+
 def _date_range_for_last_days(days: int) -> str:
     now = datetime.now(timezone.utc)
     start = now - timedelta(days=max(1, days))
-    fr = start.strftime("%Y%m%d") + "*"
-    to = now.strftime("%Y%m%d") + "*"
-    return f"{fr} TO {to}"
+    return f"{_yyyymmdd(start)}* TO {_yyyymmdd(now)}*"
 
 
 @router.get("/digest", response_model=List[DigestItem])
@@ -138,6 +195,7 @@ async def get_digest(
     cat: str = Query(default="cs.LG", description="arXiv category, e.g., cs.LG"),
     days: int = Query(default=2, ge=1, le=7),
     limit: int = Query(default=10, ge=1, le=50),
+    accept: Optional[str] = Header(default=None),
 ):
     cur_days = days
     filtered: List[Paper] = []
@@ -146,13 +204,15 @@ async def get_digest(
     while True:
         date_range = _date_range_for_last_days(cur_days)
         fetch_n = min(200, max(limit * 4, limit))
-        papers: List[Paper] = search_arxiv_papers(
+        papers: List[Paper] = await search_papers(
             query=f"cat:{cat}", max_results=fetch_n, date_range=date_range
         )
 
-        filtered = filter_papers(papers)
+        # 小文字化したテキストは両方のフィルタで共有する
+        blobs = keyword_blobs(papers)
+        filtered = filter_papers(papers, blobs)
         if len(filtered) == 0 or len(filtered) < min_n:
-            filtered = exclude_only(papers)
+            filtered = exclude_only(papers, blobs)
 
         if filtered or cur_days >= 7:
             break
@@ -160,32 +220,58 @@ async def get_digest(
 
     top = filtered[:limit]
 
-    # 並列で翻訳処理を実行
-    async def translate_paper(p):
-        title_task = asyncio.create_task(
-            asyncio.to_thread(translate_to_japanese, p.title, 200)
-        )
-        summary_task = asyncio.create_task(
-            asyncio.to_thread(make_short_summary, p.summary or "")
-        )
+    # 論文をまとめて1回の LLM 呼び出しで翻訳し、グループ同士は並列に処理する
+    # （共有セマフォで同時実行数を制限）
 
-        translated_title, translated_summary = await asyncio.gather(
-            title_task, summary_task
-        )
+    async def translate_group(group: List[Paper]) -> List[dict]:
+        texts = [p.title for p in group] + [
+            shorten_summary(p.summary or "") for p in group
+        ]
+        limits = [200] * len(group) + [300] * len(group)
+        # 非同期クライアントで待つのでスレッドプールを占有しない。
+        # 枠は a_translate_batch が LLM 呼び出しごとに取得する（ここで保持すると
+        # フォールバックの1件ずつの呼び出しが枠の外で走ってしまう）
+        translated = await a_translate_batch(texts, limits, _translation_sem)
+
+        n = len(group)
+        # DigestItem と同じキーを持つ dict（検証は最後にまとめて行う）
+        return [
+            {
+                "id": p.id,
+                "title": title,
+                "url": p.link,
+                "pdf": p.pdf,
+                "summary_short": summary,
+                "categories": p.categories,
+                "authors": p.authors,
+            }
+            for p, title, summary in zip(group, translated[:n], translated[n:])
+        ]
 
-        return DigestItem(
-            id=p.id,
-            title=translated_title,
-            url=p.link,
-            pdf=p.pdf,
-            summary_short=translated_summary,
-            categories=p.categories,
-            authors=p.authors,
-        )
+    groups = _group_for_translation(top, _TRANSLATION_BATCH_CHARS)
+
+    if accept and NDJSON_MEDIA_TYPE in accept:
+
+        async def _ndjson():
+            # 翻訳が終わったグループから順に送信（最初の1グループを待つだけで描画を開始できる）
+            tasks = [asyncio.create_task(translate_group(g)) for g in groups]
+            try:
+                for fut in asyncio.as_completed(tasks):
+                    # 値は検証済みの Paper 由来なので、そのまま書き出す
+                    for row in await fut:
+                        yield orjson.dumps(row) + b"\n"
+            finally:
+                # クライアント切断時に残りの翻訳を打ち切る
+                for t in tasks:
+                    t.cancel()
+
+        return StreamingResponse(_ndjson(), media_type=NDJSON_MEDIA_TYPE)
 
-    # 全ての論文を並列で翻訳
-    items = await asyncio.gather(*[translate_paper(p) for p in top])
-    return items
+    # 全てのグループを並列で翻訳し、一覧をまとめて1回で検証
+    # （TaskGroup により、1つが失敗・キャンセルされたら残りも打ち切られる）
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(translate_group(g)) for g in groups]
+    return _digest_items.validate_python([row for t in tasks for row in t.result()])
 
 
 @router.get("/digest/{paper_id}/details", response_model=DigestDetails)
@@ -201,67 +287,20 @@ async def get_digest_details(paper_id: str):
     """
     try:
         # 論文の基本情報を取得（arXiv IDを直接検索）
-        # 直接arXiv APIを呼び出して検索
-        import feedparser
-
-        url = f"https://export.arxiv.org/api/query?search_query=id:{paper_id}&max_results=1"
-        feed = feedparser.parse(url)
-        papers = []
-
-        for e in getattr(feed, "entries", []):
-            # Extract PDF link
-            pdf = ""
-            for link in getattr(e, "links", []):
-                if getattr(link, "type", "") == "application/pdf":
-                    pdf = getattr(link, "href", "")
-                    break
-
-            # Extract arXiv ID
-            arxiv_id_core = (
-                e.id.split("/")[-1].split("v")[0] if getattr(e, "id", "") else ""
-            )
-
-            # Extract authors
-            authors = []
-            if hasattr(e, "authors"):
-                authors = [getattr(author, "name", "") for author in e.authors]
-
-            # Extract categories
-            categories = []
-            if hasattr(e, "tags"):
-                categories = [getattr(tag, "term", "") for tag in e.tags]
-
-            # Create Paper object
-            paper = Paper(
-                id=arxiv_id_core,
-                title=getattr(e, "title", "").strip(),
-                link=getattr(e, "link", ""),
-                pdf=pdf if pdf else None,
-                summary=getattr(e, "summary", "").strip(),
-                authors=authors if authors else None,
-                updated=getattr(e, "updated", None),
-                categories=categories if categories else None,
-            )
-            papers.append(paper)
+        # 取得はスレッドで実行し、同じIDの再表示ではキャッシュを利用する
+        paper = await fetch_paper(paper_id)
 
-        if not papers:
+        if paper is None:
             raise HTTPException(
                 status_code=404, detail=f"Paper with ID {paper_id} not found"
             )
 
-        paper = papers[0]
-
         # 翻訳処理を並列実行
-        title_task = asyncio.create_task(
-            asyncio.to_thread(translate_to_japanese, paper.title, 200)
-        )
-        summary_task = asyncio.create_task(
-            asyncio.to_thread(translate_to_japanese, paper.summary or "", 1000)
-        )
-
-        translated_title, translated_summary = await asyncio.gather(
-            title_task, summary_task
-        )
+        async with asyncio.TaskGroup() as tg:
+            title_task = tg.create_task(_translate_limited(paper.title, 200))
+            summary_task = tg.create_task(_translate_limited(paper.summary or "", 1000))
+        translated_title = title_task.result()
+        translated_summary = summary_task.result()
 
         # RAG結果からCornell Note、Quiz、Citationsを取得
         cornell_note = None
@@ -285,22 +324,30 @@ async def get_digest_details(paper_id: str):
             if index:
                 # RAG処理を実行
                 from src.graphs.corrective_rag import answer_with_correction_graph
-                from src.graphs.content_enhancement import enhance_answer_content
+                from src.graphs.content_enhancement import a_enhance_answer_content
 
-                # 複数の質問でRAG処理を実行
+                async def _run_rag(question: str):
+                    basic_result = await asyncio.to_thread(
+                        answer_with_correction_graph, question, index=index
+                    )
+                    # Cornell Note/Quizの生成はイベントループ上で並列に待機する
+                    return await a_enhance_answer_content(basic_result, question)
+
+                # 各質問は独立しているため並列に実行する（結果の順序は質問順のまま）
+                outcomes = await asyncio.gather(
+                    *(_run_rag(q) for q in questions),
+                    return_exceptions=True,
+                )
                 rag_results = []
-                for question in questions:
-                    try:
-                        basic_result = answer_with_correction_graph(
-                            question, index=index
-                        )
-                        enhanced_result = enhance_answer_content(basic_result, question)
-                        rag_results.append(enhanced_result)
-                    except Exception as e:
-                        print(
-                            f"⚠️ RAG processing failed for question: {question[:50]}... - {e}"
+                for question, outcome in zip(questions, outcomes):
+                    if isinstance(outcome, Exception):
+                        log.warning(
+                            "⚠️ RAG processing failed for question: %s... - %s",
+                            question[:50],
+                            outcome,
                         )
                         continue
+                    rag_results.append(outcome)
 
                 # 結果を統合
                 if rag_results:
@@ -325,7 +372,7 @@ async def get_digest_details(paper_id: str):
                                 )
                                 citations.append(citation)
                             except Exception as e:
-                                print(f"⚠️ Citation conversion failed: {e}")
+                                log.warning("⚠️ Citation conversion failed: %s", e)
                                 continue
 
                     # 論文構造を生成
@@ -334,7 +381,7 @@ async def get_digest_details(paper_id: str):
                     )
 
         except Exception as e:
-            print(f"⚠️ RAG enhancement failed for paper {paper_id}: {e}")
+            log.warning("⚠️ RAG enhancement failed for paper %s: %s", paper_id, e)
             # RAG処理が失敗した場合は基本的な情報のみ提供
 
         # 詳細情報を構築
@@ -355,13 +402,13 @@ async def get_digest_details(paper_id: str):
 
             return details
         except Exception as e:
-            print(f"❌ Failed to create DigestDetails: {e}")
+            log.error("❌ Failed to create DigestDetails: %s", e)
             raise HTTPException(
                 status_code=500, detail=f"Failed to create paper details: {str(e)}"
             )
 
     except Exception as e:
-        print(f"❌ Failed to get paper details: {e}")
+        log.error("❌ Failed to get paper details: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to get paper details: {str(e)}"
         )
@@ -1,8 +1,8 @@
 import asyncio
 import json
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
-from src.api.deps import get_index_holder
+from src.api.deps import require_ready_holder
 from src.api.schema import AskRequest, AskResponse
 from src.api.core.rag_service import answer_question
 from src.api.core.graph_service import stream_message
@@ -11,9 +11,7 @@ router = APIRouter()
 
 
 @router.post("/rag/ask", response_model=AskResponse)
-async def rag_ask(req: AskRequest, holder=Depends(get_index_holder)):
-    if not holder.is_ready():
-        raise HTTPException(status_code=503, detail="RAG index not ready")
+async def rag_ask(req: AskRequest, holder=Depends(require_ready_holder)):
     ans = await asyncio.to_thread(answer_question, req.query, holder.get())
     return AskResponse(
         ok=True, answer=ans.get("text", ""), citations=ans.get("citations")
@@ -21,10 +19,7 @@ async def rag_ask(req: AskRequest, holder=Depends(get_index_holder)):
 
 
 @router.post("/rag/stream")
-async def rag_stream(req: AskRequest, holder=Depends(get_index_holder)):
-    if not holder.is_ready():
-        raise HTTPException(status_code=503, detail="RAG index not ready")
-
+async def rag_stream(req: AskRequest, holder=Depends(require_ready_holder)):
     async def event_gen():
         async for chunk in stream_message(req.query, holder.get()):
             yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
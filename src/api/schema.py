@@ -18,6 +18,13 @@ class InitIndexResponse(BaseModel):
     size: int
 
 
+class TranslationCacheStats(BaseModel):
+    size: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
 class ArxivSearchRequest(BaseModel):
     query: str
     max_results: int = 10
@@ -1,12 +1,17 @@
+import asyncio
+import json
 import os
 import re
-from typing import List
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 from src.models import Paper
-from src.llm.generator import generate_answer
+from src.llm.generator import a_generate_answer, generate_answer
 
 
-def _csv_env(name: str) -> List[str]:
-    v = os.getenv(name, "")
+def _split_csv(v: str) -> List[str]:
     return [s.strip() for s in v.split(",") if s.strip()]
 
 
@@ -57,10 +62,102 @@ DEFAULT_EXCLUDE = [
 ]
 
 
-def get_keywords():
-    inc = _csv_env("PREFER_KEYWORDS_INCLUDE") or DEFAULT_INCLUDE
-    exc = _csv_env("PREFER_KEYWORDS_EXCLUDE") or DEFAULT_EXCLUDE
-    return [s.lower() for s in inc], [s.lower() for s in exc]
+@lru_cache(maxsize=4)
+def _parse_keywords(
+    inc_raw: str, exc_raw: str
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    # 環境変数の生の値をキーにするため、値が変われば自動的に再計算される
+    inc = _split_csv(inc_raw) or DEFAULT_INCLUDE
+    exc = _split_csv(exc_raw) or DEFAULT_EXCLUDE
+    return tuple(s.lower() for s in inc), tuple(s.lower() for s in exc)
+
+
+def get_keywords() -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    return _parse_keywords(
+        os.getenv("PREFER_KEYWORDS_INCLUDE", ""),
+        os.getenv("PREFER_KEYWORDS_EXCLUDE", ""),
+    )
+
+
+_TRANSLATION_CACHE_SIZE = 4096
+# (正規化済みテキスト, max_chars) -> 翻訳結果。失敗時のフォールバック文字列は保存しない
+_translation_cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+_translation_lock = threading.Lock()
+_cache_hits = 0
+_cache_misses = 0
+
+
+def _normalize(text: str) -> str:
+    # arXiv のタイトル・要約は改行や連続空白の揺れがあるため、空白を1つにまとめる
+    return " ".join(text.split())
+
+
+def _cache_get(key: Tuple[str, int]) -> Optional[str]:
+    global _cache_hits, _cache_misses
+    with _translation_lock:
+        value = _translation_cache.get(key)
+        if value is None:
+            _cache_misses += 1
+        else:
+            _cache_hits += 1
+            _translation_cache.move_to_end(key)
+        return value
+
+
+def _cache_put(key: Tuple[str, int], value: str) -> None:
+    with _translation_lock:
+        _translation_cache[key] = value
+        _translation_cache.move_to_end(key)
+        while len(_translation_cache) > _TRANSLATION_CACHE_SIZE:
+            _translation_cache.popitem(last=False)
+
+
+def get_translation_cache_stats() -> dict:
+    """翻訳キャッシュの件数とヒット率を返す"""
+    with _translation_lock:
+        lookups = _cache_hits + _cache_misses
+        return {
+            "size": len(_translation_cache),
+            "hits": _cache_hits,
+            "misses": _cache_misses,
+            "hit_ratio": _cache_hits / lookups if lookups else 0.0,
+        }
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    # 翻訳結果が長すぎる場合は切り詰め
+    if len(text) > max_chars:
+        return text[:max_chars] + "..."
+    return text
+
+
+def _fallback(text: str, max_chars: int) -> str:
+    # 翻訳に失敗した場合は元のテキストを返す
+    return text[:max_chars] + ("..." if len(text) > max_chars else "")
+
+
+def _is_japanese(text: str) -> bool:
+    # 先頭64文字に仮名・漢字があれば翻訳済み（日本語）とみなす
+    return any(
+        0x3040 <= ord(c) <= 0x30FF or 0x4E00 <= ord(c) <= 0x9FFF for c in text[:64]
+    )
+
+
+def _translation_prompt(text: str) -> str:
+    return f"""以下の英語のテキストを日本語に翻訳してください。技術的な内容は正確に保ち、自然な日本語で表現してください。
+
+{text}
+
+翻訳:"""
+
+
+def _batch_translation_prompt(texts: Sequence[str]) -> str:
+    return f"""以下のJSON配列に含まれる英語のテキストをそれぞれ日本語に翻訳してください。技術的な内容は正確に保ち、自然な日本語で表現してください。
+入力と同じ順序・同じ要素数のJSON文字列配列のみを出力してください。
+
+{json.dumps(list(texts), ensure_ascii=False)}
+
+翻訳:"""
 
 
 def translate_to_japanese(text: str, max_chars: int = 300) -> str:
@@ -68,45 +165,161 @@ def translate_to_japanese(text: str, max_chars: int = 300) -> str:
     if not text or not text.strip():
         return ""
 
+    # 同じ論文は連続する /digest 呼び出しで繰り返し現れるためキャッシュを利用
+    text = _normalize(text)
+    if _is_japanese(text):
+        # 既に日本語なら LLM を呼ばない
+        return _truncate(text, max_chars)
+    key = (text, max_chars)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
     try:
-        prompt = f"""以下の英語のテキストを日本語に翻訳してください。技術的な内容は正確に保ち、自然な日本語で表現してください。
+        translated = _truncate(generate_answer(_translation_prompt(text)), max_chars)
+    except Exception:
+        return _fallback(text, max_chars)
 
-{text}
+    _cache_put(key, translated)
+    return translated
 
-翻訳:"""
 
-        translated = generate_answer(prompt)
+async def a_translate_to_japanese(text: str, max_chars: int = 300) -> str:
+    """translate_to_japanese の非同期版（スレッドを占有せずに LLM を待つ）"""
+    if not text or not text.strip():
+        return ""
 
-        # 翻訳結果が長すぎる場合は切り詰め
-        if len(translated) > max_chars:
-            translated = translated[:max_chars] + "..."
+    text = _normalize(text)
+    if _is_japanese(text):
+        return _truncate(text, max_chars)
+    key = (text, max_chars)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
 
-        return translated
+    try:
+        translated = _truncate(
+            await a_generate_answer(_translation_prompt(text)), max_chars
+        )
     except Exception:
-        # 翻訳に失敗した場合は元のテキストを返す
-        return text[:max_chars] + ("..." if len(text) > max_chars else "")
+        return _fallback(text, max_chars)
 
+    _cache_put(key, translated)
+    return translated
 
-def make_short_summary(text: str, max_chars: int = 300) -> str:
+
+def _parse_json_string_list(raw: str, expected: int) -> List[str]:
+    """LLM の出力から JSON 文字列配列を取り出す（件数が合わなければ ValueError）"""
+    start, end = raw.find("["), raw.rfind("]")
+    if start < 0 or end < start:
+        raise ValueError("no JSON array in response")
+    items = json.loads(raw[start : end + 1])
+    if (
+        not isinstance(items, list)
+        or len(items) != expected
+        or not all(isinstance(x, str) for x in items)
+    ):
+        raise ValueError("unexpected JSON array shape")
+    return items
+
+
+async def a_translate_batch(
+    texts: Sequence[str],
+    max_chars: Sequence[int],
+    limiter: Optional[asyncio.Semaphore] = None,
+) -> List[str]:
+    """
+    複数の英語テキストを1回の LLM 呼び出しでまとめて日本語に翻訳する
+
+    キャッシュ済みのテキストは送らない。応答を解釈できない場合は
+    1件ずつ a_translate_to_japanese にフォールバックする。
+    limiter を渡すと、まとめての呼び出しとフォールバックの各呼び出しが
+    それぞれ1つずつ枠を取得する（同時 LLM 呼び出し数の上限になる）。
+    """
+    results: List[str] = [""] * len(texts)
+    misses: "OrderedDict[Tuple[str, int], List[int]]" = OrderedDict()
+    for i, (text, limit) in enumerate(zip(texts, max_chars)):
+        if not text or not text.strip():
+            continue
+        text = _normalize(text)
+        if _is_japanese(text):
+            results[i] = _truncate(text, limit)
+            continue
+        cached = _cache_get((text, limit))
+        if cached is not None:
+            results[i] = cached
+        else:
+            misses.setdefault((text, limit), []).append(i)
+
+    if not misses:
+        return results
+
+    pending = list(misses)
+    slot = limiter if limiter is not None else nullcontext()
+
+    async def _translate_one(text: str, limit: int) -> str:
+        async with slot:
+            return await a_translate_to_japanese(text, limit)
+
+    try:
+        async with slot:
+            # 解釈できない応答は LLM 応答キャッシュに残さない（再試行で同じ応答を
+            # 再利用してフォールバックし続けないように）
+            raw = await a_generate_answer(
+                _batch_translation_prompt([text for text, _ in pending]),
+                validate=lambda r: _parse_json_string_list(r, len(pending)),
+            )
+        outputs = [
+            _truncate(t, limit)
+            for t, (_, limit) in zip(
+                _parse_json_string_list(raw, len(pending)), pending
+            )
+        ]
+        for key, out in zip(pending, outputs):
+            _cache_put(key, out)
+    except Exception:
+        outputs = await asyncio.gather(
+            *(_translate_one(text, limit) for text, limit in pending)
+        )
+
+    for key, out in zip(pending, outputs):
+        for i in misses[key]:
+            results[i] = out
+    return results
+
+
+def shorten_summary(text: str, max_chars: int = 300) -> str:
+    """要約を先頭2文・max_chars 文字までに短縮する（翻訳前の英語のまま）"""
     t = (text or "").strip()
     if not t:
         return ""
 
-    # まず元のテキストを短縮
     parts = re.split(r"(?<=[.!?])\s+", t)
     s = " ".join(parts[:2]) if parts else t
     if len(s) > max_chars:
         s = s[:max_chars] + "..."
+    return s
+
+
+def make_short_summary(text: str, max_chars: int = 300) -> str:
+    # まず元のテキストを短縮してから日本語に翻訳
+    return translate_to_japanese(shorten_summary(text, max_chars), max_chars)
+
 
-    # 日本語に翻訳
-    return translate_to_japanese(s, max_chars)
+def keyword_blobs(papers: List[Paper]) -> List[str]:
+    """キーワード判定用の小文字化した「タイトル＋要約」を論文ごとに作る"""
+    return [f"{p.title}\n{p.summary}".lower() for p in papers]
 
 
-def filter_papers(papers: List[Paper]) -> List[Paper]:
+def filter_papers(
+    papers: List[Paper], blobs: Optional[List[str]] = None
+) -> List[Paper]:
+    # blobs: keyword_blobs(papers) の結果。exclude_only と共有すると再計算を省ける
     inc, exc = get_keywords()
+    if blobs is None:
+        blobs = keyword_blobs(papers)
     out: List[Paper] = []
-    for p in papers:
-        blob = f"{p.title}\n{p.summary}".lower()
+    for p, blob in zip(papers, blobs):
         if any(x in blob for x in exc):
             continue
         if any(x in blob for x in inc):
@@ -114,11 +327,12 @@ def filter_papers(papers: List[Paper]) -> List[Paper]:
     return out
 
 
-def exclude_only(papers: List[Paper]) -> List[Paper]:
+def exclude_only(papers: List[Paper], blobs: Optional[List[str]] = None) -> List[Paper]:
     _, exc = get_keywords()
+    if blobs is None:
+        blobs = keyword_blobs(papers)
     out: List[Paper] = []
-    for p in papers:
-        blob = f"{p.title}\n{p.summary}".lower()
+    for p, blob in zip(papers, blobs):
         if any(x in blob for x in exc):
             continue
         out.append(p)
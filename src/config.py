@@ -1,6 +1,7 @@
 """Configuration management for Papers RAG Agent."""
 
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -9,9 +10,144 @@ env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path)
 
 
+@dataclass(frozen=True)
+class Settings:
+    """Settings resolved once from the environment at import time."""
+
+    openai_api_key: str | None
+    llm_provider: str
+    top_k: int
+    support_threshold: float
+    max_output_chars: int
+    graph_recursion_limit: int
+    embedding_quantization: str
+    use_ann_index: bool
+    speculative_hyde: bool
+    arxiv_cache_ttl: float
+    translate_max_inflight: int
+    llm_cache_ttl: float
+    langsmith_api_key: str | None
+    langsmith_project: str
+    langsmith_tracing: bool
+    langsmith_endpoint: str
+
+
+def _parse_graph_recursion_limit() -> int:
+    try:
+        limit = int(os.getenv("GRAPH_RECURSION_LIMIT", "10"))
+        # Ensure the limit is reasonable (between 1 and 100)
+        if limit <= 0:
+            print(f"⚠️ Invalid recursion limit {limit}, using default 10")
+            return 10
+        elif limit > 100:
+            print(f"⚠️ Recursion limit {limit} is very high, using 100")
+            return 100
+        return limit
+    except (ValueError, TypeError):
+        print("⚠️ Invalid GRAPH_RECURSION_LIMIT value, using default 10")
+        return 10
+
+
+def _parse_top_k() -> int:
+    try:
+        value = int(os.getenv("TOP_K", "5"))
+        if value <= 0:
+            print(f"⚠️ Invalid TOP_K {value}, using default 5")
+            return 5
+        return value
+    except (ValueError, TypeError):
+        print("⚠️ Invalid TOP_K value, using default 5")
+        return 5
+
+
+def _parse_support_threshold() -> float:
+    try:
+        return float(os.getenv("SUPPORT_THRESHOLD", "0.35"))
+    except (ValueError, TypeError):
+        print("⚠️ Invalid SUPPORT_THRESHOLD value, using default 0.35")
+        return 0.35
+
+
+def _parse_max_output_chars() -> int:
+    try:
+        value = int(os.getenv("MAX_OUTPUT_CHARS", "1400"))
+        if value <= 0:
+            print(f"⚠️ Invalid MAX_OUTPUT_CHARS {value}, using default 1400")
+            return 1400
+        return value
+    except (ValueError, TypeError):
+        print("⚠️ Invalid MAX_OUTPUT_CHARS value, using default 1400")
+        return 1400
+
+
+def _parse_embedding_quantization() -> str:
+    mode = os.getenv("EMBEDDING_QUANTIZATION", "none").lower()
+    if mode not in ("none", "int8", "binary"):
+        print(f"⚠️ Invalid EMBEDDING_QUANTIZATION {mode!r}, using 'none'")
+        return "none"
+    return mode
+
+
+def _parse_arxiv_cache_ttl() -> float:
+    try:
+        return max(0.0, float(os.getenv("ARXIV_CACHE_TTL", "3600")))
+    except (ValueError, TypeError):
+        print("⚠️ Invalid ARXIV_CACHE_TTL value, using default 3600")
+        return 3600.0
+
+
+def _parse_llm_cache_ttl() -> float:
+    try:
+        return max(0.0, float(os.getenv("LLM_CACHE_TTL", "3600")))
+    except (ValueError, TypeError):
+        print("⚠️ Invalid LLM_CACHE_TTL value, using default 3600")
+        return 3600.0
+
+
+def _parse_translate_max_inflight() -> int:
+    try:
+        value = int(os.getenv("TRANSLATE_MAX_INFLIGHT", "8"))
+        if value <= 0:
+            print(f"⚠️ Invalid TRANSLATE_MAX_INFLIGHT {value}, using default 8")
+            return 8
+        return value
+    except (ValueError, TypeError):
+        print("⚠️ Invalid TRANSLATE_MAX_INFLIGHT value, using default 8")
+        return 8
+
+
+def load_settings() -> Settings:
+    """Read all settings from the environment."""
+    return Settings(
+        openai_api_key=os.getenv("OPENAI_API_KEY") or None,
+        llm_provider=os.getenv("LLM_PROVIDER", "openai"),
+        top_k=_parse_top_k(),
+        support_threshold=_parse_support_threshold(),
+        max_output_chars=_parse_max_output_chars(),
+        graph_recursion_limit=_parse_graph_recursion_limit(),
+        embedding_quantization=_parse_embedding_quantization(),
+        use_ann_index=os.getenv("USE_ANN_INDEX", "false").lower() == "true",
+        speculative_hyde=os.getenv("SPECULATIVE_HYDE", "true").lower() == "true",
+        arxiv_cache_ttl=_parse_arxiv_cache_ttl(),
+        translate_max_inflight=_parse_translate_max_inflight(),
+        llm_cache_ttl=_parse_llm_cache_ttl(),
+        langsmith_api_key=os.getenv("LANGSMITH_API_KEY"),
+        langsmith_project=os.getenv("LANGSMITH_PROJECT", "papers-rag-agent"),
+        langsmith_tracing=os.getenv("LANGSMITH_TRACING", "false").lower() == "true",
+        langsmith_endpoint=os.getenv(
+            "LANGSMITH_ENDPOINT", "https://api.smith.langchain.com"
+        ),
+    )
+
+
+# Getters below are called inside request and RAG loops, so they read these
+# cached values instead of re-parsing os.environ on every call.
+settings = load_settings()
+
+
 def get_openai_api_key() -> str:
     """Get OpenAI API key from environment variables."""
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = settings.openai_api_key
     if not api_key:
         print("⚠️ OPENAI_API_KEY not found in environment variables")
         print("Please set OPENAI_API_KEY environment variable or create .env file")
@@ -21,7 +157,7 @@ def get_openai_api_key() -> str:
 
 def get_openai_api_key_safe() -> str | None:
     """Get OpenAI API key safely without raising exceptions."""
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = settings.openai_api_key
     if not api_key:
         print("⚠️ OPENAI_API_KEY not found, some features will be disabled")
         return None
@@ -30,22 +166,22 @@ def get_openai_api_key_safe() -> str | None:
 
 def get_llm_provider() -> str:
     """Get LLM provider name."""
-    return os.getenv("LLM_PROVIDER", "openai")
+    return settings.llm_provider
 
 
 def get_top_k() -> int:
     """Get TOP_K parameter for retrieval."""
-    return int(os.getenv("TOP_K", "5"))
+    return settings.top_k
 
 
 def get_support_threshold() -> float:
     """Get support threshold for corrective RAG."""
-    return float(os.getenv("SUPPORT_THRESHOLD", "0.35"))
+    return settings.support_threshold
 
 
 def get_max_output_chars() -> int:
     """Get maximum output characters for chunked sending."""
-    return int(os.getenv("MAX_OUTPUT_CHARS", "1400"))
+    return settings.max_output_chars
 
 
 def use_langgraph() -> bool:
@@ -55,36 +191,54 @@ def use_langgraph() -> bool:
 
 def get_graph_recursion_limit() -> int:
     """Get recursion limit for LangGraph workflows."""
-    try:
-        limit = int(os.getenv("GRAPH_RECURSION_LIMIT", "10"))
-        # Ensure the limit is reasonable (between 1 and 100)
-        if limit <= 0:
-            print(f"⚠️ Invalid recursion limit {limit}, using default 10")
-            return 10
-        elif limit > 100:
-            print(f"⚠️ Recursion limit {limit} is very high, using 100")
-            return 100
-        return limit
-    except (ValueError, TypeError):
-        print("⚠️ Invalid GRAPH_RECURSION_LIMIT value, using default 10")
-        return 10
+    return settings.graph_recursion_limit
+
+
+def get_embedding_quantization() -> str:
+    """Get in-memory embedding quantization mode: none, int8 or binary."""
+    return settings.embedding_quantization
+
+
+def use_ann_index() -> bool:
+    """Check if the RAG index should search through an HNSW graph (needs hnswlib)."""
+    return settings.use_ann_index
+
+
+def use_speculative_hyde() -> bool:
+    """Check if corrective RAG should generate the HyDE query alongside baseline."""
+    return settings.speculative_hyde
+
+
+def get_arxiv_cache_ttl() -> float:
+    """Get TTL in seconds for cached arXiv search results (0 disables)."""
+    return settings.arxiv_cache_ttl
+
+
+def get_translate_max_inflight() -> int:
+    """Get the process-wide cap on concurrent translation LLM calls."""
+    return settings.translate_max_inflight
+
+
+def get_llm_cache_ttl() -> float:
+    """Get TTL in seconds for reusing identical LLM responses (0 disables)."""
+    return settings.llm_cache_ttl
 
 
 def get_langsmith_api_key() -> str | None:
     """Get LangSmith API key safely."""
-    return os.getenv("LANGSMITH_API_KEY")
+    return settings.langsmith_api_key
 
 
 def get_langsmith_project() -> str:
     """Get LangSmith project name."""
-    return os.getenv("LANGSMITH_PROJECT", "papers-rag-agent")
+    return settings.langsmith_project
 
 
 def enable_langsmith_tracing() -> bool:
     """Check if LangSmith tracing should be enabled."""
-    return os.getenv("LANGSMITH_TRACING", "false").lower() == "true"
+    return settings.langsmith_tracing
 
 
 def get_langsmith_endpoint() -> str:
     """Get LangSmith endpoint URL."""
-    return os.getenv("LANGSMITH_ENDPOINT", "https://api.smith.langchain.com")
+    return settings.langsmith_endpoint
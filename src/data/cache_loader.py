@@ -2,104 +2,296 @@
 Cache loading utilities for precomputed RAG data.
 """
 
-import json
+import gzip
+import logging
+import os
 import pickle
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
+import numpy as np
+from pydantic import TypeAdapter
+
+from src.config import get_embedding_quantization, use_ann_index
 from src.models import Paper
 from src.retrieval.inmemory import InMemoryIndex
 
+PAPERS_FILENAME = "precomputed_papers.json"
+# Optional gzipped variant written by `build_cache.py --compress`
+COMPRESSED_PAPERS_FILENAME = "precomputed_papers.json.gz"
+EMBEDDINGS_FILENAME = "precomputed_embeddings.npy"
+# Optional Blosc2-compressed variant written by `build_cache.py --compress`
+COMPRESSED_EMBEDDINGS_FILENAME = "precomputed_embeddings.b2nd"
+# Legacy format: pickled list of (Paper, np.ndarray) tuples
+LEGACY_EMBEDDINGS_FILENAME = "precomputed_embeddings.pkl"
+# Optional HNSW graph written by `build_cache.py --ann` (needs hnswlib)
+ANN_INDEX_FILENAME = "precomputed_hnsw.bin"
+# Optional int8/binary search copy written by `build_cache.py --quantize`
+QUANTIZED_FILENAME = "precomputed_quantized.npz"
+
+# Directory holding the precomputed cache files
+DATA_DIR = Path(__file__).parent
+
+# Parses and validates the whole papers list in one pydantic-core call
+_papers_adapter = TypeAdapter(List[Paper])
+
+log = logging.getLogger(__name__)
+
+# Last loaded index, keyed by the resolved files and their mtimes
+_loaded: Optional[Tuple[tuple, InMemoryIndex]] = None
+_loaded_lock = threading.Lock()
+
+
+def _resolve_papers_file(data_dir: Path) -> Path:
+    """Return the papers file to load, preferring the plain JSON format."""
+    papers_file = data_dir / PAPERS_FILENAME
+    if not papers_file.exists():
+        compressed = data_dir / COMPRESSED_PAPERS_FILENAME
+        if compressed.exists():
+            return compressed
+    return papers_file
+
+
+def _read_papers_bytes(papers_file: Path) -> bytes:
+    """Read the raw papers JSON, decompressing .gz files."""
+    data = papers_file.read_bytes()
+    if papers_file.suffix == ".gz":
+        return gzip.decompress(data)
+    return data
+
+
+def _resolve_embeddings_file(data_dir: Path) -> Path:
+    """Return the embeddings file to load, preferring the .npy format."""
+    embeddings_file = data_dir / EMBEDDINGS_FILENAME
+    for name in (
+        EMBEDDINGS_FILENAME,
+        COMPRESSED_EMBEDDINGS_FILENAME,
+        LEGACY_EMBEDDINGS_FILENAME,
+    ):
+        candidate = data_dir / name
+        if candidate.exists():
+            return candidate
+    return embeddings_file
+
+
+def _load_embeddings_matrix(embeddings_file: Path) -> np.ndarray:
+    """Load the (N, dim) embeddings matrix from a .npy or .b2nd file."""
+    if embeddings_file.suffix == ".b2nd":
+        import blosc2
+
+        return blosc2.open(str(embeddings_file))[:]
+    # Zero-copy: pages are faulted in on first access
+    return np.load(embeddings_file, mmap_mode="r")
+
+
+def _pickle_protocol(f) -> int:
+    """Peek the protocol of a pickle stream, leaving the file position as is.
+
+    Protocol 2+ streams start with the PROTO opcode (0x80) and the version
+    byte; older protocols have no header and are reported as 0.
+    """
+    pos = f.tell()
+    head = f.read(2)
+    f.seek(pos)
+    if len(head) == 2 and head[0] == 0x80:
+        return head[1]
+    return 0
+
+
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    """stat() the path, or None if it does not exist."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _cache_key(data_dir: Path) -> Optional[tuple]:
+    """(path, mtime_ns) of the resolved cache files, or None if any is missing."""
+    key = []
+    for path in (_resolve_papers_file(data_dir), _resolve_embeddings_file(data_dir)):
+        st = _stat_or_none(path)
+        if st is None:
+            return None
+        key.append((str(path), st.st_mtime_ns))
+    return tuple(key)
+
 
 def load_precomputed_cache() -> Optional[InMemoryIndex]:
     """
     Load precomputed papers and embeddings cache.
 
+    The loaded index is memoized; later calls return the same object until
+    the papers or embeddings file changes on disk. Failed loads are not
+    memoized.
+
+    Returns:
+        InMemoryIndex with precomputed data, or None if loading fails
+    """
+    global _loaded
+
+    key = _cache_key(DATA_DIR)
+    with _loaded_lock:
+        if key is not None and _loaded is not None and _loaded[0] == key:
+            return _loaded[1]
+
+        index = _load_precomputed_cache()
+        if key is not None and index is not None:
+            _loaded = (key, index)
+        return index
+
+
+def _load_precomputed_cache() -> Optional[InMemoryIndex]:
+    """
+    Read precomputed papers and embeddings cache from disk.
+
+    Embeddings are stored as a single (N, dim) float32 or float16 matrix whose
+    rows are aligned with the papers JSON, and are memory-mapped on load. A
+    Blosc2-compressed matrix and the legacy pickle format are also accepted,
+    as is a gzipped papers JSON.
+
     Returns:
         InMemoryIndex with precomputed data, or None if loading fails
     """
     try:
-        data_dir = Path(__file__).parent
-        papers_file = data_dir / "precomputed_papers.json"
-        embeddings_file = data_dir / "precomputed_embeddings.pkl"
+        data_dir = DATA_DIR
+        papers_file = _resolve_papers_file(data_dir)
+        embeddings_file = _resolve_embeddings_file(data_dir)
 
-        # Check if cache files exist
-        if not papers_file.exists():
-            print(f"⚠️  Papers cache not found: {papers_file}")
+        # One stat per file both checks existence and gives the size
+        if _stat_or_none(papers_file) is None:
+            log.warning("⚠️  Papers cache not found: %s", papers_file)
             return None
 
-        if not embeddings_file.exists():
-            print(f"⚠️  Embeddings cache not found: {embeddings_file}")
+        embeddings_stat = _stat_or_none(embeddings_file)
+        if embeddings_stat is None:
+            log.warning("⚠️  Embeddings cache not found: %s", embeddings_file)
             return None
 
-        print("📖 Loading precomputed cache...")
-        print(f"  📂 Data directory: {data_dir}")
-        print(f"  📂 Papers file: {papers_file} (exists: {papers_file.exists()})")
-        print(
-            f"  📂 Embeddings file: {embeddings_file} (exists: {embeddings_file.exists()})"
+        log.debug(
+            "📖 Loading precomputed cache: papers=%s embeddings=%s (%d bytes)",
+            papers_file,
+            embeddings_file,
+            embeddings_stat.st_size,
         )
 
-        # List all files in data directory for debugging
-        try:
-            all_files = list(data_dir.iterdir())
-            print(f"  📋 Files in data directory: {[f.name for f in all_files]}")
-        except Exception as e:
-            print(f"  ❌ Could not list data directory: {e}")
-
         # Load papers
-        with open(papers_file, "r", encoding="utf-8") as f:
-            papers_data = json.load(f)
+        # Parse the raw bytes straight into Paper models, without building an
+        # intermediate list of dicts first
+        papers = _papers_adapter.validate_json(_read_papers_bytes(papers_file))
+        log.debug("  ✅ Loaded %d papers", len(papers))
 
-        papers = [Paper(**data) for data in papers_data]
-        print(f"  ✅ Loaded {len(papers)} papers")
-
-        # Load embeddings with detailed diagnostics
+        # Load embeddings
+        embeddings = None
         try:
-            print(f"  📁 Attempting to load embeddings from: {embeddings_file}")
-            print(f"  📂 File exists: {embeddings_file.exists()}")
-
-            if embeddings_file.exists():
-                file_size = embeddings_file.stat().st_size
-                print(f"  📊 File size: {file_size} bytes")
-
-                if file_size == 0:
-                    print("  ⚠️  Embeddings file is empty!")
-                    papers_with_embeddings = []
-                else:
-                    data_bytes = embeddings_file.read_bytes()
-                    papers_with_embeddings = pickle.loads(data_bytes)
-                    print(f"  ✅ Loaded {len(papers_with_embeddings)} embeddings")
-            else:
-                print("  ❌ Embeddings file does not exist!")
+            if embeddings_stat.st_size == 0:
+                log.warning("⚠️  Embeddings file is empty: %s", embeddings_file)
                 papers_with_embeddings = []
-
-        except Exception as e:
-            print(f"  ❌ Failed to load embeddings: {e}")
-            print(f"  🔍 Exception type: {type(e).__name__}")
-            import traceback
-
-            print(f"  📋 Traceback: {traceback.format_exc()}")
+            elif embeddings_file.suffix in (".npy", ".b2nd"):
+                embeddings = _load_embeddings_matrix(embeddings_file)
+                if embeddings.shape[0] != len(papers):
+                    raise ValueError(
+                        f"embeddings rows ({embeddings.shape[0]}) do not match "
+                        f"papers ({len(papers)})"
+                    )
+                log.debug(
+                    "  ✅ Loaded %d embeddings (shape=%s, dtype=%s)",
+                    embeddings.shape[0],
+                    embeddings.shape,
+                    embeddings.dtype,
+                )
+            else:
+                # Legacy pickle: unpickle straight from the file rather
+                # than reading the whole payload into a bytes copy first
+                with open(embeddings_file, "rb") as f:
+                    # Protocol 4+ is framed, so the C unpickler copies whole
+                    # frames instead of decoding the arrays opcode by opcode
+                    protocol = _pickle_protocol(f)
+                    if protocol < 4:
+                        log.warning(
+                            "⚠️  %s uses pickle protocol %d; rebuild the cache "
+                            "with scripts/build_cache.py for faster loading",
+                            embeddings_file,
+                            protocol,
+                        )
+                    papers_with_embeddings = pickle.load(f)
+                if papers_with_embeddings:
+                    # Stack the per-paper vectors into one contiguous matrix
+                    # so search takes the same vectorized path as .npy caches
+                    papers = [p for p, _ in papers_with_embeddings]
+                    embeddings = np.stack(
+                        [
+                            np.asarray(e, dtype=np.float32)
+                            for _, e in papers_with_embeddings
+                        ]
+                    )
+                log.debug("  ✅ Loaded %d embeddings", len(papers_with_embeddings))
+
+        except Exception:
+            log.exception("❌ Failed to load embeddings from %s", embeddings_file)
+            embeddings = None
             papers_with_embeddings = []
 
         # Create index and populate with precomputed data
         index = InMemoryIndex()
-        index.papers_with_embeddings = papers_with_embeddings
+        if embeddings is not None:
+            # Search runs directly on the (memory-mapped) matrix
+            index.set_embeddings(papers, embeddings)
+            papers_with_embeddings = index.papers_with_embeddings
+        else:
+            index.papers_with_embeddings = papers_with_embeddings
+
+        # A shipped quantized copy is only used when EMBEDDING_QUANTIZATION
+        # selects the same mode; "none" keeps the exact full scan
+        quantization = get_embedding_quantization()
+        quantized_file = data_dir / QUANTIZED_FILENAME
+        if (
+            quantization != "none"
+            and papers_with_embeddings
+            and _stat_or_none(quantized_file) is not None
+        ):
+            try:
+                index.load_quantized(quantized_file, mode=quantization)
+                log.debug(
+                    "  ✅ Loaded %s embeddings from %s",
+                    index.quantization,
+                    quantized_file,
+                )
+            except Exception as e:
+                log.warning("⚠️  Skipping quantized embeddings: %s", e)
+
+        # A shipped graph is only used when USE_ANN_INDEX asks for ANN search
+        ann_file = data_dir / ANN_INDEX_FILENAME
+        if (
+            use_ann_index()
+            and papers_with_embeddings
+            and _stat_or_none(ann_file) is not None
+        ):
+            try:
+                index.load_ann_index(ann_file)
+                log.debug("  ✅ Loaded HNSW index from %s", ann_file)
+            except Exception as e:
+                log.warning("⚠️  Skipping HNSW index: %s", e)
 
         # Validate that we have both papers and embeddings
         if len(papers) == 0 or len(papers_with_embeddings) == 0:
-            print(
-                f"⚠️  Warning: {len(papers)} papers, {len(papers_with_embeddings)} embeddings"
+            log.warning(
+                "⚠️  %d papers, %d embeddings; RAG functionality will be limited. "
+                "Only arXiv search will work.",
+                len(papers),
+                len(papers_with_embeddings),
             )
-            print("⚠️  RAG functionality will be limited. Only arXiv search will work.")
 
-        print("✅ Precomputed cache loaded successfully!")
+        log.info(
+            "✅ Precomputed cache loaded (papers=%d, embeddings=%d)",
+            len(papers),
+            len(papers_with_embeddings),
+        )
         return index
 
-    except Exception as e:
-        print(f"❌ Error loading precomputed cache: {e}")
-        import traceback
-
-        traceback.print_exc()
+    except Exception:
+        log.exception("❌ Error loading precomputed cache")
         return None
 
 
@@ -110,9 +302,9 @@ def cache_exists() -> bool:
     Returns:
         True if both cache files exist, False otherwise
     """
-    data_dir = Path(__file__).parent
-    papers_file = data_dir / "precomputed_papers.json"
-    embeddings_file = data_dir / "precomputed_embeddings.pkl"
+    data_dir = DATA_DIR
+    papers_file = _resolve_papers_file(data_dir)
+    embeddings_file = _resolve_embeddings_file(data_dir)
 
     return papers_file.exists() and embeddings_file.exists()
 
@@ -124,9 +316,9 @@ def get_cache_info() -> dict:
     Returns:
         Dictionary with cache file information
     """
-    data_dir = Path(__file__).parent
-    papers_file = data_dir / "precomputed_papers.json"
-    embeddings_file = data_dir / "precomputed_embeddings.pkl"
+    data_dir = DATA_DIR
+    papers_file = _resolve_papers_file(data_dir)
+    embeddings_file = _resolve_embeddings_file(data_dir)
 
     info = {
         "papers_file": str(papers_file),
@@ -1,9 +1,10 @@
 """Content enhancement workflow using LangGraph for Cornell Note and Quiz generation."""
 
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, TypedDict
 from langgraph.graph import StateGraph, START, END
-from langchain_core.runnables import RunnableConfig
-from pydantic import BaseModel, ConfigDict
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from pydantic import BaseModel
 
 from src.models import (
     CornellNote,
@@ -12,72 +13,49 @@ from src.models import (
     AnswerResult,
     EnhancedAnswerResult,
 )
-from src.llm.generator import generate_answer
+from src.llm.generator import a_generate_structured, generate_structured
 from src.config import get_graph_recursion_limit, get_openai_api_key_safe
 
 
-class ContentEnhancementState(BaseModel):
-    """State for content enhancement workflow."""
+class ContentEnhancementState(TypedDict, total=False):
+    """State for content enhancement workflow.
 
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    A plain TypedDict: LangGraph passes it between nodes as a dict without
+    re-validating the citations/attempts payload on every step.
+    """
 
     question: str
     answer_text: str
     citations: List[dict]
     support: float
     attempts: List[dict]
-    cornell_note: Optional[CornellNote] = None
-    quiz_items: Optional[List[QuizItem]] = None
-    enhanced_result: Optional[EnhancedAnswerResult] = None
-    error: Optional[str] = None  # Remove Annotated to avoid concurrent updates
-
-    def __getitem__(self, key):
-        """Allow dictionary-style access for LangGraph compatibility."""
-        return getattr(self, key)
+    cornell_note: Optional[CornellNote]
+    quiz_items: Optional[List[QuizItem]]
+    enhanced_result: Optional[EnhancedAnswerResult]
+    error: Optional[str]
 
-    def __setitem__(self, key, value):
-        """Allow dictionary-style assignment for LangGraph compatibility."""
-        setattr(self, key, value)
 
-    def get(self, key, default=None):
-        """Allow .get() method for LangGraph compatibility."""
-        return getattr(self, key, default)
+class _Enhancement(BaseModel):
+    """Structured output schema for the combined Cornell Note and quiz."""
 
+    cornell_note: CornellNote
+    quiz_items: List[QuizItem]
 
-def cornell_note_generation_node(
-    state: ContentEnhancementState,
-) -> ContentEnhancementState:
-    """Generate Cornell Note from answer content."""
-    try:
-        # Check if OpenAI API key is available
-        if not get_openai_api_key_safe():
-            print("⚠️ Skipping Cornell Note generation - OPENAI_API_KEY not set")
-            state["error"] = "Cornell Note generation skipped - API key not available"
-            return state
-
-        citations = state.get("citations") or []
-        citation_list = "\n".join(
-            f"- {c['title']} -> {c['link'].replace('http://', 'https://')}"
-            for c in citations
-        )
 
-        prompt = f"""You will create a Cornell Note. Use only the papers listed below when describing content.
+# Static instructions come first and the per-call citations, question and
+# answer last, so the prompt prefix is byte-identical across calls and can be
+# served from OpenAI's prompt cache.
+_ENHANCEMENT_PROMPT = """You will create a Cornell Note and a short quiz from the question and answer at the end.
+In the Cornell Note, use only the papers listed in CITATIONS when describing content.
 Each paper title already has its correct URL — copy it exactly and make the title itself
 a Markdown link like [Title](URL). Do NOT make the title bold.
 
-CITATIONS (use exactly these titles and URLs, no others):
-{citation_list}
-
 Rules for links/titles in NOTES:
 - Only use URLs that appear in CITATIONS. Never output any other URL or arXiv ID.
 - When you refer to a paper, use the exact title from CITATIONS and put its URL on the last line of that paper’s bullet group.
 - If a paper is not in CITATIONS, do not include any URL for it (omit the link).
 
-Based on the following question and answer, create a Cornell Note:
-
-Question: {state["question"]}
-
-Answer: {state["answer_text"]}
+## cornell_note
 
 Generate a Cornell Note with:
 1. cue: Key concepts and terms (1–2 short phrases)
@@ -93,11 +71,10 @@ Rules for links/titles in NOTES:
 - If a paper is not in CITATIONS, omit it completely.
 - Do NOT include any explanation, prose, or commentary outside of YAML.
 
-Example:
-
-CUE: [your cue here]
+Return the cue, notes and summary fields. The notes field is a string
+holding the list in this form:
 
-NOTES: [
+[
   {{
             "title": "[Title 1](URL)",
     "points": [
@@ -124,141 +101,113 @@ NOTES: [
   }}
 ]
 
-SUMMARY: [your summary here]
-"""
+## quiz_items
 
-        response = generate_answer(prompt, question=state["question"])
-
-        # Parse the response
-        lines = response.strip().split("\n")
-        cue = ""
-        notes = ""
-        summary = ""
-
-        current_section = None
-        for line in lines:
-            line = line.strip()
-            if line.startswith("CUE:"):
-                current_section = "cue"
-                cue = line[4:].strip()
-            elif line.startswith("NOTES:"):
-                current_section = "notes"
-                notes = line[6:].strip()
-            elif line.startswith("SUMMARY:"):
-                current_section = "summary"
-                summary = line[8:].strip()
-            elif line and current_section:
-                if current_section == "cue":
-                    cue += f" {line}"
-                elif current_section == "notes":
-                    notes += f"\n{line}"
-                elif current_section == "summary":
-                    summary += f" {line}"
-
-        cornell_note = CornellNote(
-            cue=cue.strip(), notes=notes.strip(), summary=summary.strip()
-        )
+Generate 2 multiple-choice quiz questions with 4 options each to test understanding.
+For each question:
+- question: the question text
+- options: exactly 4 options with ids "a", "b", "c" and "d"
+- correct_answer: the id of the correct option
 
-        state["cornell_note"] = cornell_note
-        print(f"✅ Cornell Note generated: {cue}")
+Make sure the questions test key concepts from the answer and have clear correct answers.
 
-    except Exception as e:
-        print(f"❌ Cornell Note generation failed: {e}")
-        state["error"] = f"Cornell Note generation failed: {str(e)}"
+CITATIONS (use exactly these titles and URLs, no others):
+{citation_list}
 
-    return state
+Question: {question}
 
+Answer: {answer}
+"""
 
-def quiz_generation_node(state: ContentEnhancementState) -> ContentEnhancementState:
-    """Generate quiz questions from answer content."""
-    try:
-        # Check if OpenAI API key is available
-        if not get_openai_api_key_safe():
-            print("⚠️ Skipping Quiz generation - OPENAI_API_KEY not set")
-            state["error"] = "Quiz generation skipped - API key not available"
-            return state
-        prompt = f"""Based on the following question and answer, create 2 multiple-choice quiz questions to test understanding.
 
-Question: {state["question"]}
+def _enhancement_prompt(state: ContentEnhancementState) -> str:
+    """Build one prompt asking for both the Cornell Note and the quiz."""
+    citations = state.get("citations") or []
+    citation_list = "\n".join(
+        f"- {c['title']} -> {c['link'].replace('http://', 'https://')}"
+        for c in citations
+    )
+    return _ENHANCEMENT_PROMPT.format(
+        citation_list=citation_list,
+        question=state["question"],
+        answer=state["answer_text"],
+    )
+
+
+def _valid_quiz_items(quiz_items: List[QuizItem]) -> List[QuizItem]:
+    """Keep only well-formed questions, as the text parser used to."""
+    valid = []
+    for item in quiz_items:
+        options = [
+            QuizOption(id=o.id.strip().lower(), text=o.text) for o in item.options
+        ]
+        correct = item.correct_answer.strip().lower()
+        if len(options) == 4 and correct in {o.id for o in options}:
+            valid.append(
+                QuizItem(
+                    question=item.question, options=options, correct_answer=correct
+                )
+            )
+    return valid
+
 
-Answer: {state["answer_text"]}
+def _has_grounded_answer(answer_text: Optional[str], citations: Optional[list]) -> bool:
+    """Whether the answer is worth a Cornell Note and quiz.
 
-Generate 2 quiz questions with 4 options each. Format your response exactly as:
+    Every failure path of the RAG pipeline (workflow or retrieval errors,
+    nothing found, the no-answer template) returns no citations, so this is an
+    O(1) check instead of matching error messages.
+    """
+    return bool(citations) and bool(answer_text and answer_text.strip())
 
-QUESTION 1: [your question here]
-A) [option A]
-B) [option B]
-C) [option C]
-D) [option D]
-CORRECT: [A/B/C/D]
 
-QUESTION 2: [your question here]
-A) [option A]
-B) [option B]
-C) [option C]
-D) [option D]
-CORRECT: [A/B/C/D]
+def _enhancement_update(enhancement: _Enhancement) -> dict:
+    """State update for a generated Cornell Note and quiz."""
+    quiz_items = _valid_quiz_items(enhancement.quiz_items)
+    print(f"✅ Cornell Note generated: {enhancement.cornell_note.cue}")
+    print(f"✅ Quiz generated: {len(quiz_items)} questions")
+    return {"cornell_note": enhancement.cornell_note, "quiz_items": quiz_items}
 
-Make sure the questions test key concepts from the answer and have clear correct answers.
-"""
 
-        response = generate_answer(prompt, question=state["question"])
-
-        # Parse the response
-        quiz_items = []
-        lines = response.strip().split("\n")
-
-        current_question = None
-        current_options: list[QuizOption] = []
-        current_correct = None
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("QUESTION"):
-                # Save previous question if exists
-                if current_question and len(current_options) == 4 and current_correct:
-                    quiz_items.append(
-                        QuizItem(
-                            question=current_question,
-                            options=current_options,
-                            correct_answer=current_correct.lower(),
-                        )
-                    )
-
-                # Start new question
-                current_question = line.split(":", 1)[1].strip()
-                current_options = []
-                current_correct = None
-            elif line.startswith(("A)", "B)", "C)", "D)")):
-                option_id = line[0].lower()
-                option_text = line[3:].strip()
-                current_options.append(QuizOption(id=option_id, text=option_text))
-            elif line.startswith("CORRECT:"):
-                current_correct = line[8:].strip().lower()
-
-        # Save the last question
-        if current_question and len(current_options) == 4 and current_correct:
-            quiz_items.append(
-                QuizItem(
-                    question=current_question,
-                    options=current_options,
-                    correct_answer=current_correct,
-                )
-            )
+def combined_enhancement_node(state: ContentEnhancementState) -> dict:
+    """Generate the Cornell Note and quiz questions in one LLM request.
 
-        state["quiz_items"] = quiz_items
-        print(f"✅ Quiz generated: {len(quiz_items)} questions")
+    Both share the same question/answer context, so a single structured
+    output call replaces two requests carrying the same prompt.
+    """
+    if not _has_grounded_answer(state.get("answer_text"), state.get("citations")):
+        print("⚠️ Skipping Cornell Note/Quiz generation - no grounded answer")
+        return {}
+
+    try:
+        enhancement = generate_structured(
+            _enhancement_prompt(state), _Enhancement, question=state["question"]
+        )
+        return _enhancement_update(enhancement)
 
     except Exception as e:
-        print(f"❌ Quiz generation failed: {e}")
-        state["error"] = f"Quiz generation failed: {str(e)}"
+        print(f"❌ Cornell Note/Quiz generation failed: {e}")
+        return {"error": f"Cornell Note/Quiz generation failed: {str(e)}"}
 
-    return state
 
+async def a_combined_enhancement_node(state: ContentEnhancementState) -> dict:
+    """Async variant of combined_enhancement_node, used by ainvoke."""
+    if not _has_grounded_answer(state.get("answer_text"), state.get("citations")):
+        print("⚠️ Skipping Cornell Note/Quiz generation - no grounded answer")
+        return {}
 
-def format_enhanced_result_node(
-    state: ContentEnhancementState,
-) -> ContentEnhancementState:
+    try:
+        enhancement = await a_generate_structured(
+            _enhancement_prompt(state), _Enhancement, question=state["question"]
+        )
+        return _enhancement_update(enhancement)
+
+    except Exception as e:
+        print(f"❌ Cornell Note/Quiz generation failed: {e}")
+        return {"error": f"Cornell Note/Quiz generation failed: {str(e)}"}
+
+
+def format_enhanced_result_node(state: ContentEnhancementState) -> dict:
     """Format the final enhanced result."""
     try:
         # Create enhanced result
@@ -271,14 +220,12 @@ def format_enhanced_result_node(
             quiz_items=state.get("quiz_items"),
         )
 
-        state["enhanced_result"] = enhanced_result
         print("✅ Enhanced result formatted successfully")
+        return {"enhanced_result": enhanced_result}
 
     except Exception as e:
         print(f"❌ Result formatting failed: {e}")
-        state["error"] = f"Result formatting failed: {str(e)}"
-
-    return state
+        return {"error": f"Result formatting failed: {str(e)}"}
 
 
 def create_content_enhancement_graph() -> StateGraph:
@@ -288,21 +235,64 @@ def create_content_enhancement_graph() -> StateGraph:
     graph = StateGraph(ContentEnhancementState)
 
     # Add nodes
-    graph.add_node("cornell_generation", cornell_note_generation_node)
-    graph.add_node("quiz_generation", quiz_generation_node)
+    # The LLM node has a sync and an async implementation: invoke() runs the
+    # former, ainvoke() awaits the latter on the event loop
+    graph.add_node(
+        "combined_enhancement",
+        RunnableLambda(combined_enhancement_node, a_combined_enhancement_node),
+    )
     graph.add_node("format_result", format_enhanced_result_node)
 
-    # Define the flow (sequential to avoid concurrent updates)
-    graph.add_edge(
-        START, "cornell_generation"
-    )  # TODO: cornell_generation and quiz_generation should be parallel
-    graph.add_edge("cornell_generation", "quiz_generation")
-    graph.add_edge("quiz_generation", "format_result")
+    # Cornell Note and Quiz come back from a single request
+    graph.add_edge(START, "combined_enhancement")
+    graph.add_edge("combined_enhancement", "format_result")
     graph.add_edge("format_result", END)
 
     return graph.compile()
 
 
+@lru_cache(maxsize=1)
+def _enhancement_graph():
+    """Compiled enhancement graph, built on first use and shared afterwards.
+
+    The recursion limit is passed per invocation, so nothing in the compiled
+    graph depends on runtime configuration.
+    """
+    return create_content_enhancement_graph()
+
+
+def _initial_state(
+    answer_result: AnswerResult, question: str
+) -> ContentEnhancementState:
+    """Build the graph input from a basic answer result."""
+    return ContentEnhancementState(
+        question=question,
+        answer_text=answer_result.text,
+        citations=answer_result.citations,
+        support=answer_result.support,
+        attempts=answer_result.attempts,
+        cornell_note=None,
+        quiz_items=None,
+        error=None,
+    )
+
+
+def _enhanced_result(
+    answer_result: AnswerResult, final_state: Optional[dict] = None
+) -> EnhancedAnswerResult:
+    """Wrap the basic answer with whatever the graph produced, if anything."""
+    final_state = final_state or {}
+    return EnhancedAnswerResult(
+        text=answer_result.text,
+        citations=answer_result.citations,
+        support=answer_result.support,
+        attempts=answer_result.attempts,
+        cornell_note=final_state.get("cornell_note"),
+        quiz_items=final_state.get("quiz_items") or [],
+        metadata=answer_result.metadata,  # Preserve support details
+    )
+
+
 def enhance_answer_content(
     answer_result: AnswerResult, question: str
 ) -> EnhancedAnswerResult:
@@ -316,21 +306,19 @@ def enhance_answer_content(
     Returns:
         Enhanced answer result with Cornell Note and Quiz
     """
+    # Error and no-answer results have nothing to summarise or quiz on
+    if not _has_grounded_answer(answer_result.text, answer_result.citations):
+        print("⚠️ Skipping content enhancement - no grounded answer")
+        return _enhanced_result(answer_result)
+
+    # The enhancement node needs the LLM; without a key skip the graph
+    # entirely instead of letting the node find out on its own
+    if not get_openai_api_key_safe():
+        print("⚠️ Skipping content enhancement - OPENAI_API_KEY not set")
+        return _enhanced_result(answer_result)
+
     try:
-        # Create the enhancement graph
-        enhancement_graph = create_content_enhancement_graph()
-
-        # Prepare initial state
-        initial_state = ContentEnhancementState(
-            question=question,
-            answer_text=answer_result.text,
-            citations=answer_result.citations,
-            support=answer_result.support,
-            attempts=answer_result.attempts,
-            cornell_note=None,
-            quiz_items=None,
-            error=None,
-        )
+        enhancement_graph = _enhancement_graph()
 
         # Run the enhancement workflow
         print("🚀 Starting content enhancement workflow...")
@@ -338,32 +326,62 @@ def enhance_answer_content(
         # Create RunnableConfig with recursion limit
         config = RunnableConfig(recursion_limit=get_graph_recursion_limit())
 
-        final_state = enhancement_graph.invoke(initial_state, config=config)
+        final_state = enhancement_graph.invoke(
+            _initial_state(answer_result, question), config=config
+        )
 
         # Check for errors
         if final_state.get("error"):
             print(f"⚠️ Enhancement completed with errors: {final_state['error']}")
 
-        # Return enhanced result
-        return EnhancedAnswerResult(
-            text=answer_result.text,
-            citations=answer_result.citations,
-            support=answer_result.support,
-            attempts=answer_result.attempts,
-            cornell_note=final_state.get("cornell_note"),
-            quiz_items=final_state.get("quiz_items") or [],
-            metadata=answer_result.metadata,  # Preserve support details
-        )
+        return _enhanced_result(answer_result, final_state)
 
     except Exception as e:
         print(f"❌ Content enhancement workflow failed: {e}")
         # Return basic result without enhancements
-        return EnhancedAnswerResult(
-            text=answer_result.text,
-            citations=answer_result.citations,
-            support=answer_result.support,
-            attempts=answer_result.attempts,
-            cornell_note=None,
-            quiz_items=[],
-            metadata=answer_result.metadata,  # Preserve support details
+        return _enhanced_result(answer_result)
+
+
+async def a_enhance_answer_content(
+    answer_result: AnswerResult, question: str
+) -> EnhancedAnswerResult:
+    """
+    Async variant of enhance_answer_content.
+
+    Runs the graph with ainvoke, so the single combined Cornell Note/Quiz
+    request is awaited on the event loop rather than in a worker thread.
+
+    Args:
+        answer_result: Basic answer result from RAG pipeline
+        question: Original user question
+
+    Returns:
+        Enhanced answer result with Cornell Note and Quiz
+    """
+    if not _has_grounded_answer(answer_result.text, answer_result.citations):
+        print("⚠️ Skipping content enhancement - no grounded answer")
+        return _enhanced_result(answer_result)
+
+    if not get_openai_api_key_safe():
+        print("⚠️ Skipping content enhancement - OPENAI_API_KEY not set")
+        return _enhanced_result(answer_result)
+
+    try:
+        enhancement_graph = _enhancement_graph()
+
+        print("🚀 Starting content enhancement workflow...")
+
+        config = RunnableConfig(recursion_limit=get_graph_recursion_limit())
+
+        final_state = await enhancement_graph.ainvoke(
+            _initial_state(answer_result, question), config=config
         )
+
+        if final_state.get("error"):
+            print(f"⚠️ Enhancement completed with errors: {final_state['error']}")
+
+        return _enhanced_result(answer_result, final_state)
+
+    except Exception as e:
+        print(f"❌ Content enhancement workflow failed: {e}")
+        return _enhanced_result(answer_result)
@@ -1,14 +1,26 @@
 """Corrective RAG workflow using LangGraph."""
 
-from typing import Optional, Literal
+import asyncio
+import operator
+from functools import lru_cache
+from typing import Annotated, Callable, List, Optional, Literal, Sequence
 from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, ConfigDict
 
-from src.models import AnswerResult
-from src.pipelines.baseline import baseline_answer
+from src.models import AnswerResult, RetrievalResult
+from src.pipelines.baseline import (
+    baseline_attempt,
+    baseline_generate,
+    baseline_retrieve,
+)
+from src.pipelines.corrective import no_answer
 from src.llm.hyde import hyde_rewrite
-from src.config import get_support_threshold, get_graph_recursion_limit
+from src.config import (
+    get_support_threshold,
+    get_graph_recursion_limit,
+    use_speculative_hyde,
+)
 
 
 class CorrectionState(BaseModel):
@@ -19,9 +31,12 @@ class CorrectionState(BaseModel):
     question: str
     index: Optional[object] = None
     theta: float
+    # Latest retrieval; the answer text is only generated once it is accepted
+    retrieval: Optional[RetrievalResult] = None
     answer: Optional[AnswerResult] = None
     hyde_query: Optional[str] = None
-    attempts: list
+    # Nodes return only their new attempts; LangGraph appends them
+    attempts: Annotated[list, operator.add]
     final_result: Optional[AnswerResult] = None
     hyde_attempted: bool = False
     baseline_support: Optional[float] = None
@@ -40,144 +55,167 @@ class CorrectionState(BaseModel):
         return getattr(self, key, default)
 
 
-def baseline_retrieval_node(state: CorrectionState) -> CorrectionState:
-    """Perform baseline RAG retrieval and generation."""
+def baseline_retrieval_node(state: CorrectionState) -> dict:
+    """Retrieve contexts for the question and score their support.
+
+    No text is generated here: evaluate decides on the support score first,
+    so an answer is only written for a retrieval that will be used. Returns
+    only the fields it updates, so it can run alongside the speculative HyDE
+    rewrite.
+    """
     try:
         print(f"🔍 Starting baseline retrieval for: {state['question'][:50]}...")
 
-        # Perform baseline RAG
-        answer = baseline_answer(state["question"], state["index"])
+        # Perform baseline retrieval
+        retrieval = baseline_retrieve(state["question"], state["index"])
 
-        state["answer"] = answer
-        state["attempts"] = answer.attempts.copy()
-        state["baseline_support"] = answer.support  # Store for later display
-
-        print(f"✅ Baseline retrieval completed. Support: {answer.support:.3f}")
+        print(f"✅ Baseline retrieval completed. Support: {retrieval.support:.3f}")
+        return {
+            "retrieval": retrieval,
+            "attempts": [baseline_attempt(retrieval)],
+            "baseline_support": retrieval.support,  # Store for later display
+        }
 
     except Exception as e:
         print(f"❌ Baseline retrieval failed: {e}")
-        # Create empty result for error case
-        state["answer"] = AnswerResult(
-            text=f"ベースライン検索中にエラーが発生しました: {str(e)}",
-            citations=[],
-            support=0.0,
-            attempts=[{"type": "baseline", "error": str(e), "support": 0.0}],
-        )
+        # Record an empty retrieval so the HyDE branch can still run
+        return {
+            "retrieval": RetrievalResult(
+                query=state["question"], contexts=[], support=0.0
+            ),
+            "attempts": [{"type": "baseline", "error": str(e), "support": 0.0}],
+        }
+
+
+def speculative_hyde_node(state: CorrectionState) -> dict:
+    """Generate the HyDE query while baseline retrieval is still running.
+
+    HyDE only depends on the question, so if baseline support turns out to be
+    insufficient the rewrite is already available. The query is simply unused
+    when baseline support is sufficient.
+    """
+    try:
+        print(f"🔮 Speculative HyDE rewrite for: {state['question'][:50]}...")
+        return {"hyde_query": hyde_rewrite(state["question"])}
 
-    return state
+    except Exception as e:
+        # hyde_rewrite_node retries if the branch is actually needed
+        print(f"⚠️ Speculative HyDE rewrite failed: {e}")
+        return {"hyde_query": None}
 
 
-def evaluate_support_node(state: CorrectionState) -> CorrectionState:
+def evaluate_support_node(state: CorrectionState) -> dict:
     """Evaluate if the support score is sufficient."""
     try:
-        answer = state["answer"]
+        support = state["retrieval"].support
         theta = state["theta"]
 
-        print(f"📊 Evaluating support: {answer.support:.3f} vs threshold: {theta:.3f}")
+        print(f"📊 Evaluating support: {support:.3f} vs threshold: {theta:.3f}")
 
         # The routing decision will be made by should_continue_correction function
         # This node just logs the evaluation
-        if answer.support >= theta:
-            print(f"✅ Support sufficient ({answer.support:.3f} >= {theta:.3f})")
+        if support >= theta:
+            print(f"✅ Support sufficient ({support:.3f} >= {theta:.3f})")
         else:
             print(
-                f"⚠️ Support insufficient ({answer.support:.3f} < {theta:.3f}), will try HyDE"
+                f"⚠️ Support insufficient ({support:.3f} < {theta:.3f}), will try HyDE"
             )
 
     except Exception as e:
         print(f"❌ Support evaluation failed: {e}")
 
-    return state
+    return {}
 
 
-def hyde_rewrite_node(state: CorrectionState) -> CorrectionState:
+def hyde_rewrite_node(state: CorrectionState) -> dict:
     """Rewrite query using HyDE approach."""
+    if state["hyde_query"]:
+        # Already generated by speculative_hyde_node
+        print("✅ Using speculative HyDE query")
+        return {"hyde_attempted": True}
+
     try:
         print(f"🔄 Starting HyDE rewrite for: {state['question'][:50]}...")
 
         # Generate HyDE query
         hyde_query = hyde_rewrite(state["question"])
-        state["hyde_query"] = hyde_query
-        state["hyde_attempted"] = True  # Mark HyDE as attempted
 
         print(f"✅ HyDE rewrite completed: {hyde_query[:100]}...")
+        return {"hyde_query": hyde_query, "hyde_attempted": True}
 
     except Exception as e:
         print(f"❌ HyDE rewrite failed: {e}")
-        state["hyde_query"] = None
-        state["hyde_attempted"] = True  # Mark as attempted even if failed
-
-    return state
+        # Mark as attempted even if failed
+        return {"hyde_query": None, "hyde_attempted": True}
 
 
-def enhanced_retrieval_node(state: CorrectionState) -> CorrectionState:
+def enhanced_retrieval_node(state: CorrectionState) -> dict:
     """Perform enhanced retrieval using HyDE query."""
     try:
         if not state["hyde_query"]:
             print("⚠️ No HyDE query available, skipping enhanced retrieval")
-            return state
+            return {}
 
         print("🔍 Starting enhanced retrieval with HyDE query...")
 
         # Perform retrieval with HyDE query
-        hyde_answer = baseline_answer(state["hyde_query"], state["index"])
+        retrieval = baseline_retrieve(state["hyde_query"], state["index"])
 
         # Add HyDE attempt information
         hyde_attempt = {
             "type": "hyde",
             "query": state["hyde_query"],
-            "top_ids": hyde_answer.attempts[0]["top_ids"]
-            if hyde_answer.attempts
-            else [],
-            "support": hyde_answer.support,
+            "top_ids": [ctx.paper_id for ctx in retrieval.contexts],
+            "support": retrieval.support,
         }
 
-        # Update answer and attempts
-        state["answer"] = hyde_answer
-        state["attempts"].extend(hyde_answer.attempts)
-        state["attempts"].append(hyde_attempt)
-        state["enhanced_support"] = hyde_answer.support  # Store for later display
-
-        print(
-            f"✅ Enhanced retrieval completed. New support: {hyde_answer.support:.3f}"
-        )
+        print(f"✅ Enhanced retrieval completed. New support: {retrieval.support:.3f}")
+        return {
+            "retrieval": retrieval,
+            "attempts": [baseline_attempt(retrieval), hyde_attempt],
+            "enhanced_support": retrieval.support,  # Store for later display
+        }
 
     except Exception as e:
         print(f"❌ Enhanced retrieval failed: {e}")
-        # Keep the original answer if HyDE fails
+        # Keep the original retrieval if HyDE fails
         if state["attempts"]:
-            state["attempts"].append({"type": "hyde", "error": str(e), "support": 0.0})
+            return {"attempts": [{"type": "hyde", "error": str(e), "support": 0.0}]}
+        return {}
 
-    return state
 
+def generate_answer_node(state: CorrectionState) -> dict:
+    """Generate the answer text for the accepted retrieval."""
+    print("✍️ Generating answer from accepted retrieval...")
+    # Attempts were already recorded when the contexts were retrieved
+    return {"answer": baseline_generate(state["retrieval"])}
 
-def no_answer_node(state: CorrectionState) -> CorrectionState:
+
+def no_answer_node(state: CorrectionState) -> dict:
     """Generate no-answer response when all attempts fail."""
     try:
         print("🚫 Generating no-answer response...")
 
-        from src.pipelines.corrective import no_answer
-
         # Generate no-answer result
         no_answer_result = no_answer(state["question"], state["attempts"])
-        state["answer"] = no_answer_result
 
         print("✅ No-answer response generated")
+        return {"answer": no_answer_result}
 
     except Exception as e:
         print(f"❌ No-answer generation failed: {e}")
         # Fallback to basic no-answer
-        state["answer"] = AnswerResult(
-            text="申し訳ございませんが、この質問に対する適切な回答を見つけることができませんでした。",
-            citations=[],
-            support=0.0,
-            attempts=state["attempts"],
-        )
-
-    return state
+        return {
+            "answer": AnswerResult(
+                text="申し訳ございませんが、この質問に対する適切な回答を見つけることができませんでした。",
+                citations=[],
+                support=0.0,
+                attempts=state["attempts"],
+            )
+        }
 
 
-def finalize_result_node(state: CorrectionState) -> CorrectionState:
+def finalize_result_node(state: CorrectionState) -> dict:
     """Finalize the result with all attempts included."""
     try:
         answer = state["answer"]
@@ -198,29 +236,27 @@ def finalize_result_node(state: CorrectionState) -> CorrectionState:
             "threshold_met": answer.support >= state["theta"],
         }
 
-        state["final_result"] = final_result
         print(f"✅ Result finalized with {len(state['attempts'])} attempts")
+        return {"final_result": final_result}
 
     except Exception as e:
         print(f"❌ Result finalization failed: {e}")
-        state["final_result"] = state["answer"]
-
-    return state
+        return {"final_result": state["answer"]}
 
 
 def should_continue_correction(
     state: CorrectionState,
 ) -> Literal["sufficient", "try_hyde", "give_up"]:
     """Determine the next step based on current state."""
-    answer = state["answer"]
+    retrieval = state["retrieval"]
     theta = state["theta"]
 
-    # If no answer exists, give up
-    if not answer:
+    # If nothing was retrieved, give up
+    if not retrieval:
         return "give_up"
 
-    # If support is sufficient, we're done
-    if answer.support >= theta:
+    # If support is sufficient, generate the answer and finish
+    if retrieval.support >= theta:
         return "sufficient"
 
     # If we haven't tried HyDE yet, try it
@@ -231,39 +267,65 @@ def should_continue_correction(
     return "give_up"
 
 
-def create_corrective_rag_graph() -> StateGraph:
-    """Create the corrective RAG workflow graph."""
+def create_corrective_rag_graph(speculative: Optional[bool] = None) -> StateGraph:
+    """Create the corrective RAG workflow graph.
+
+    Args:
+        speculative: Run HyDE alongside baseline retrieval (SPECULATIVE_HYDE
+            if None)
+    """
 
     # Define the graph
     graph = StateGraph(CorrectionState)
 
     # Add nodes
     graph.add_node("baseline", baseline_retrieval_node)
+    if speculative is None:
+        speculative = use_speculative_hyde()
+    if speculative:
+        graph.add_node("speculative_hyde", speculative_hyde_node)
     graph.add_node("evaluate", evaluate_support_node)
     graph.add_node("hyde_rewrite", hyde_rewrite_node)
     graph.add_node("enhanced_retrieval", enhanced_retrieval_node)
+    graph.add_node("generate", generate_answer_node)
     graph.add_node("no_answer", no_answer_node)
     graph.add_node("finalize", finalize_result_node)
 
     # Define the flow
     graph.add_edge(START, "baseline")
-    graph.add_edge("baseline", "evaluate")
+    if speculative:
+        # HyDE runs in the same step as baseline; evaluate waits for both
+        graph.add_edge(START, "speculative_hyde")
+        graph.add_edge(["baseline", "speculative_hyde"], "evaluate")
+    else:
+        graph.add_edge("baseline", "evaluate")
 
     # Conditional routing based on support evaluation
     graph.add_conditional_edges(
         "evaluate",
         should_continue_correction,
-        {"sufficient": "finalize", "try_hyde": "hyde_rewrite", "give_up": "no_answer"},
+        {"sufficient": "generate", "try_hyde": "hyde_rewrite", "give_up": "no_answer"},
     )
 
     graph.add_edge("hyde_rewrite", "enhanced_retrieval")
     graph.add_edge("enhanced_retrieval", "evaluate")
+    graph.add_edge("generate", "finalize")
     graph.add_edge("no_answer", "finalize")
     graph.add_edge("finalize", END)
 
     return graph.compile()
 
 
+@lru_cache(maxsize=2)
+def _corrective_graph(speculative: bool):
+    """Compiled corrective RAG graph per topology, built once and shared.
+
+    The recursion limit is passed per invocation, so only the speculative
+    HyDE switch changes the compiled graph.
+    """
+    return create_corrective_rag_graph(speculative)
+
+
 def answer_with_correction_graph(
     question: str, theta: Optional[float] = None, index: Optional[object] = None
 ) -> AnswerResult:
@@ -282,14 +344,14 @@ def answer_with_correction_graph(
         if theta is None:
             theta = get_support_threshold()
 
-        # Create the corrective RAG graph
-        corrective_graph = create_corrective_rag_graph()
+        corrective_graph = _corrective_graph(use_speculative_hyde())
 
         # Prepare initial state
         initial_state = CorrectionState(
             question=question,
             index=index,
             theta=theta,
+            retrieval=None,
             answer=None,
             hyde_query=None,
             attempts=[],
@@ -348,3 +410,71 @@ def answer_with_correction_graph(
                 {"type": "workflow_error", "error": error_message, "support": 0.0}
             ],
         )
+
+
+class _RequestRateLimiter:
+    """Spaces out request starts so at most ``per_minute`` begin each minute."""
+
+    def __init__(self, per_minute: float) -> None:
+        self._interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self._interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def answer_many_with_correction(
+    questions: Sequence[str],
+    theta: Optional[float] = None,
+    index: Optional[object] = None,
+    max_concurrency: int = 20,
+    rpm: float = 500,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[AnswerResult]:
+    """
+    Answer many questions with corrective RAG concurrently.
+
+    Each question runs answer_with_correction_graph in a worker thread. At
+    most ``max_concurrency`` run at once, and new questions start at no more
+    than ``rpm`` per minute so a large sweep does not trip OpenAI rate limits.
+
+    Args:
+        questions: User questions
+        theta: Support threshold (uses environment default if None)
+        index: Index to use for retrieval
+        max_concurrency: Maximum number of questions in flight
+        rpm: Maximum question starts per minute (0 disables throttling)
+        on_progress: Called with (completed, total) after each question
+
+    Returns:
+        AnswerResults in the same order as ``questions``
+    """
+    total = len(questions)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    limiter = _RequestRateLimiter(rpm)
+    completed = 0
+
+    async def _answer(question: str) -> AnswerResult:
+        nonlocal completed
+        async with semaphore:
+            await limiter.wait()
+            result = await asyncio.to_thread(
+                answer_with_correction_graph, question, theta, index
+            )
+        completed += 1
+        if on_progress is not None:
+            on_progress(completed, total)
+        return result
+
+    # answer_with_correction_graph reports failures as AnswerResults, so one
+    # bad question never cancels the rest of the batch
+    return list(await asyncio.gather(*(_answer(q) for q in questions)))
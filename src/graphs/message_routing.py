@@ -1,8 +1,10 @@
 """Message routing workflow using LangGraph."""
 
-from typing import Optional, Literal, Any
+import asyncio
+from functools import lru_cache
+from typing import Optional, Literal, Any, AsyncIterator
 from langgraph.graph import StateGraph, START, END
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from pydantic import BaseModel, ConfigDict
 
 from src.models import EnhancedAnswerResult
@@ -116,6 +118,19 @@ def extract_research_topic(message: str) -> str:
         )
 
 
+def _basic_enhanced_result(basic_result) -> EnhancedAnswerResult:
+    """Wrap a basic answer without Cornell Note or Quiz."""
+    return EnhancedAnswerResult(
+        text=basic_result.text,
+        citations=basic_result.citations,
+        support=basic_result.support,
+        attempts=basic_result.attempts,
+        cornell_note=None,
+        quiz_items=[],
+        metadata=basic_result.metadata,  # Pass through support details
+    )
+
+
 def rag_pipeline_node(state: MessageState) -> MessageState:
     """Handle RAG questions with enhanced content generation."""
     try:
@@ -143,17 +158,48 @@ def rag_pipeline_node(state: MessageState) -> MessageState:
         except Exception as e:
             print(f"⚠️ Content enhancement failed, using basic result: {e}")
             # Fallback to simple enhanced result
-            from src.models import EnhancedAnswerResult
-
-            enhanced_result = EnhancedAnswerResult(
-                text=basic_result.text,
-                citations=basic_result.citations,
-                support=basic_result.support,
-                attempts=basic_result.attempts,
-                cornell_note=None,
-                quiz_items=[],
-                metadata=basic_result.metadata,  # Pass through support details
-            )
+            enhanced_result = _basic_enhanced_result(basic_result)
+
+        state["rag_result"] = enhanced_result
+
+        print(f"✅ RAG processing completed. Support: {enhanced_result.support:.3f}")
+
+    except Exception as e:
+        print(f"❌ RAG pipeline failed: {e}")
+        state["error"] = f"RAG pipeline error: {str(e)}"
+
+    return state
+
+
+async def a_rag_pipeline_node(state: MessageState) -> MessageState:
+    """Async variant of rag_pipeline_node, used by astream/ainvoke.
+
+    Corrective RAG still runs in a worker thread, but the Cornell Note/Quiz
+    request is awaited on the event loop.
+    """
+    try:
+        question = state["message_content"]
+        index = state["rag_index"]
+
+        print(f"🤖 Processing RAG question: {question[:50]}...")
+
+        if not index:
+            state["error"] = "RAG index not available"
+            return state
+
+        basic_result = await asyncio.to_thread(
+            answer_with_correction_graph, question, index=index
+        )
+
+        try:
+            from src.graphs.content_enhancement import a_enhance_answer_content
+
+            enhanced_result = await a_enhance_answer_content(basic_result, question)
+            if not enhanced_result.metadata and basic_result.metadata:
+                enhanced_result.metadata = basic_result.metadata
+        except Exception as e:
+            print(f"⚠️ Content enhancement failed, using basic result: {e}")
+            enhanced_result = _basic_enhanced_result(basic_result)
 
         state["rag_result"] = enhanced_result
 
@@ -315,7 +361,10 @@ def create_message_routing_graph() -> StateGraph:
     # Add nodes
     graph.add_node("classify", classify_message_node)
     graph.add_node("arxiv_search", arxiv_search_node)
-    graph.add_node("rag_pipeline", rag_pipeline_node)
+    # invoke() runs the sync RAG node, astream()/ainvoke() the async one
+    graph.add_node(
+        "rag_pipeline", RunnableLambda(rag_pipeline_node, a_rag_pipeline_node)
+    )
     graph.add_node("format_arxiv", format_arxiv_response_node)
     graph.add_node("format_rag", format_rag_response_node)
 
@@ -337,6 +386,75 @@ def create_message_routing_graph() -> StateGraph:
     return graph.compile()
 
 
+@lru_cache(maxsize=1)
+def _routing_graph():
+    """Compiled routing graph, built on first use and shared afterwards."""
+    return create_message_routing_graph()
+
+
+def _initial_message_state(message_content: str, rag_index: Any) -> MessageState:
+    return MessageState(
+        message_content=message_content,
+        message_type="",
+        rag_index=rag_index,
+        arxiv_results=None,
+        rag_result=None,
+        final_response=None,
+        error=None,
+    )
+
+
+async def astream_message_with_routing(
+    message_content: str, rag_index: Any = None
+) -> AsyncIterator[str]:
+    """
+    Stream the routed response as the LangGraph workflow produces it.
+
+    Runs the routing graph with ``astream`` and yields response text as soon as
+    a formatter node emits it, instead of waiting for ``invoke`` to return.
+
+    Args:
+        message_content: User message content
+        rag_index: RAG index for retrieval (required for RAG questions)
+
+    Yields:
+        Response text chunks
+    """
+    try:
+        routing_graph = _routing_graph()
+        initial_state = _initial_message_state(message_content, rag_index)
+        config = RunnableConfig(recursion_limit=get_graph_recursion_limit())
+
+        print("🚀 Starting message routing workflow (streaming)...")
+
+        produced = False
+        error = None
+        async for update in routing_graph.astream(
+            initial_state, config=config, stream_mode="updates"
+        ):
+            for node_output in update.values():
+                if not isinstance(node_output, dict):
+                    continue
+                error = node_output.get("error") or error
+                response = node_output.get("final_response")
+                if response:
+                    produced = True
+                    yield response
+
+        # Check for errors
+        if error:
+            print(f"⚠️ Workflow completed with errors: {error}")
+
+        if produced:
+            print("✅ Message routing completed successfully")
+        else:
+            yield "申し訳ございませんが、メッセージの処理中にエラーが発生しました。"
+
+    except Exception as e:
+        print(f"❌ Message routing workflow failed: {e}")
+        yield f"システムエラーが発生しました: {str(e)}"
+
+
 def process_message_with_routing(message_content: str, rag_index: Any = None) -> str:
     """
     Process incoming message using LangGraph routing workflow.
@@ -349,19 +467,10 @@ def process_message_with_routing(message_content: str, rag_index: Any = None) ->
         Formatted response string
     """
     try:
-        # Create the message routing graph
-        routing_graph = create_message_routing_graph()
+        routing_graph = _routing_graph()
 
         # Prepare initial state
-        initial_state = MessageState(
-            message_content=message_content,
-            message_type="",
-            rag_index=rag_index,
-            arxiv_results=None,
-            rag_result=None,
-            final_response=None,
-            error=None,
-        )
+        initial_state = _initial_message_state(message_content, rag_index)
 
         print("🚀 Starting message routing workflow...")
 
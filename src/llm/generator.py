@@ -1,26 +1,69 @@
 """Text generation using OpenAI GPT models with LangSmith tracing."""
 
+import hashlib
+import json
+import threading
+from functools import lru_cache
+
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from langsmith import traceable
-from typing import Optional
-from src.config import get_openai_api_key, get_llm_provider
+from pydantic import BaseModel
+from typing import Any, Callable, Optional, Type, TypeVar
+from src.config import get_openai_api_key, get_llm_provider, get_llm_cache_ttl
+from src.utils.ttl_cache import TTLCache
 
 
-@traceable
-def generate_answer(prompt: str, question: Optional[str] = None) -> str:
-    """
-    Generate answer using OpenAI GPT model with LangSmith tracing.
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
-    Args:
-        prompt: Complete prompt including instructions and context
-        question: Optional original question for language detection
+MODEL = "gpt-4o-mini"  # Cost-efficient model
+TEMPERATURE = 0.1  # Low temperature for factual responses
+MAX_TOKENS = 1500  # Reasonable limit for responses
 
-    Returns:
-        Generated text response
+# Identical prompts (re-runs, repeated questions, HyDE rewrites of the same
+# question) reuse the previous response for LLM_CACHE_TTL seconds. Calls
+# come from worker threads as well as the event loop, hence the lock.
+_response_cache = TTLCache(maxsize=256, ttl=get_llm_cache_ttl())
+_response_cache_lock = threading.Lock()
 
-    Raises:
-        Exception: If text generation fails
+
+def _cache_key(final_prompt: str, schema: Optional[type] = None) -> str:
+    """Hash everything that determines the response to a prompt."""
+    payload = json.dumps(
+        {
+            "prompt": final_prompt,
+            "model": MODEL,
+            "temperature": TEMPERATURE,
+            "max_tokens": MAX_TOKENS,
+            "schema": f"{schema.__module__}.{schema.__qualname__}" if schema else None,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[Any]:
+    with _response_cache_lock:
+        value = _response_cache.get(key)
+    # Hand out copies so callers cannot mutate the cached model
+    if isinstance(value, BaseModel):
+        return value.model_copy(deep=True)
+    return value
+
+
+def _cache_set(key: str, value: Any) -> None:
+    with _response_cache_lock:
+        _response_cache.set(key, value)
+
+
+@lru_cache(maxsize=1)
+def _build_llm() -> ChatOpenAI:
+    """Shared ChatOpenAI client.
+
+    Built once and reused by every call, so requests go through the same
+    OpenAI client and its keep-alive connection pool instead of paying for
+    a new client (and TLS handshake) each time. A missing API key raises and
+    is not cached.
     """
     provider = get_llm_provider()
     if provider != "openai":
@@ -29,28 +72,186 @@ def generate_answer(prompt: str, question: Optional[str] = None) -> str:
     api_key = get_openai_api_key()
 
     # Initialize ChatOpenAI with LangSmith tracing support
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",  # Cost-efficient model
-        temperature=0.1,  # Low temperature for factual responses
-        max_tokens=1500,  # Reasonable limit for responses
+    return ChatOpenAI(
+        model=MODEL,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
         openai_api_key=api_key,
     )
 
+
+def _build_prompt(prompt: str, question: Optional[str]) -> str:
     # Add language instruction if question is provided
-    final_prompt = prompt
-    if question:
-        from src.utils.language_utils import get_response_language_instruction
+    if not question:
+        return prompt
+
+    from src.utils.language_utils import get_response_language_instruction
+
+    return prompt + get_response_language_instruction(question)
 
-        language_instruction = get_response_language_instruction(question)
-        final_prompt = final_prompt + language_instruction
+
+@traceable
+def generate_answer(
+    prompt: str,
+    question: Optional[str] = None,
+    validate: Optional[Callable[[str], Any]] = None,
+) -> str:
+    """
+    Generate answer using OpenAI GPT model with LangSmith tracing.
+
+    The response to an identical prompt is reused for LLM_CACHE_TTL seconds.
+
+    Args:
+        prompt: Complete prompt including instructions and context
+        question: Optional original question for language detection
+        validate: Optional check that raises if the caller cannot use the
+            response; rejected responses are not cached
+
+    Returns:
+        Generated text response
+
+    Raises:
+        Exception: If text generation fails
+    """
+    final_prompt = _build_prompt(prompt, question)
+    key = _cache_key(final_prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    llm = _build_llm()
 
     try:
         # Use LangChain's ChatOpenAI for automatic LangSmith tracing
         message = HumanMessage(content=final_prompt)
         response = llm.invoke([message])
 
-        return response.content.strip()
+        answer = response.content.strip()
+        if validate is not None:
+            validate(answer)
+        _cache_set(key, answer)
+        return answer
 
     except Exception as e:
         # Don't suppress exceptions - let them bubble up
         raise Exception(f"Failed to generate answer: {str(e)}") from e
+
+
+@traceable
+async def a_generate_answer(
+    prompt: str,
+    question: Optional[str] = None,
+    validate: Optional[Callable[[str], Any]] = None,
+) -> str:
+    """
+    Async variant of generate_answer.
+
+    Awaits the OpenAI request on the event loop instead of occupying a
+    worker thread for the whole round-trip.
+
+    Args:
+        prompt: Complete prompt including instructions and context
+        question: Optional original question for language detection
+        validate: Optional check that raises if the caller cannot use the
+            response; rejected responses are not cached
+
+    Returns:
+        Generated text response
+
+    Raises:
+        Exception: If text generation fails
+    """
+    final_prompt = _build_prompt(prompt, question)
+    key = _cache_key(final_prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    llm = _build_llm()
+
+    try:
+        message = HumanMessage(content=final_prompt)
+        response = await llm.ainvoke([message])
+
+        answer = response.content.strip()
+        if validate is not None:
+            validate(answer)
+        _cache_set(key, answer)
+        return answer
+
+    except Exception as e:
+        raise Exception(f"Failed to generate answer: {str(e)}") from e
+
+
+@traceable
+def generate_structured(
+    prompt: str, schema: Type[ModelT], question: Optional[str] = None
+) -> ModelT:
+    """
+    Generate a response constrained to a Pydantic schema.
+
+    Uses OpenAI structured outputs (``response_format`` with a JSON schema),
+    so the reply is parsed and validated into ``schema`` without any
+    client-side text parsing.
+
+    Args:
+        prompt: Complete prompt including instructions and context
+        schema: Pydantic model describing the expected response
+        question: Optional original question for language detection
+
+    Returns:
+        Instance of ``schema``
+
+    Raises:
+        Exception: If generation or validation fails
+    """
+    final_prompt = _build_prompt(prompt, question)
+    key = _cache_key(final_prompt, schema)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    llm = _build_llm().with_structured_output(schema, method="json_schema")
+
+    try:
+        result = llm.invoke([HumanMessage(content=final_prompt)])
+        _cache_set(key, result.model_copy(deep=True))
+        return result
+
+    except Exception as e:
+        raise Exception(f"Failed to generate structured answer: {str(e)}") from e
+
+
+@traceable
+async def a_generate_structured(
+    prompt: str, schema: Type[ModelT], question: Optional[str] = None
+) -> ModelT:
+    """
+    Async variant of generate_structured.
+
+    Args:
+        prompt: Complete prompt including instructions and context
+        schema: Pydantic model describing the expected response
+        question: Optional original question for language detection
+
+    Returns:
+        Instance of ``schema``
+
+    Raises:
+        Exception: If generation or validation fails
+    """
+    final_prompt = _build_prompt(prompt, question)
+    key = _cache_key(final_prompt, schema)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    llm = _build_llm().with_structured_output(schema, method="json_schema")
+
+    try:
+        result = await llm.ainvoke([HumanMessage(content=final_prompt)])
+        _cache_set(key, result.model_copy(deep=True))
+        return result
+
+    except Exception as e:
+        raise Exception(f"Failed to generate structured answer: {str(e)}") from e
@@ -84,6 +84,14 @@ class RetrievedContext(BaseModel):
     embedding: Any  # numpy array
 
 
+class RetrievalResult(BaseModel):
+    """Retrieved contexts and their support score, before any generation."""
+
+    query: str
+    contexts: List[RetrievedContext]
+    support: float
+
+
 class AnswerResult(BaseModel):
     """Complete answer result from RAG pipeline."""
 
@@ -2,7 +2,7 @@
 
 import numpy as np
 from typing import List, Optional
-from src.models import AnswerResult, RetrievedContext
+from src.models import AnswerResult, RetrievalResult, RetrievedContext
 from src.llm.generator import generate_answer
 from src.llm.embeddings import get_embed
 from src.retrieval.inmemory import InMemoryIndex
@@ -19,21 +19,22 @@ def set_global_index(index: InMemoryIndex) -> None:
     _global_index = index
 
 
-def baseline_answer(
+def baseline_retrieve(
     question: str, index: Optional[InMemoryIndex] = None
-) -> AnswerResult:
+) -> RetrievalResult:
     """
-    Generate answer using baseline RAG pipeline.
+    Retrieve contexts for a question and score their support.
+
+    Support only depends on the question and the retrieved contexts, so it is
+    known before any text is generated.
 
     Args:
-        question: User question
+        question: User question (or HyDE query)
         index: Optional index to use (uses global if not provided)
 
     Returns:
-        AnswerResult with answer, citations, support score, and attempts
+        RetrievalResult with contexts and support score
     """
-    global _global_index
-
     # Use provided index or fall back to global
     search_index = index if index is not None else _global_index
 
@@ -46,6 +47,34 @@ def baseline_answer(
     top_k = get_top_k()
     contexts = search_index.search(question, top_k)
 
+    # 2. Calculate support score
+    support_score = calculate_support(question, contexts)
+
+    return RetrievalResult(query=question, contexts=contexts, support=support_score)
+
+
+def baseline_attempt(retrieval: RetrievalResult) -> dict:
+    """Attempt summary recorded for a retrieval."""
+    return {
+        "type": "baseline",
+        "top_ids": [ctx.paper_id for ctx in retrieval.contexts],
+        "support": retrieval.support,
+    }
+
+
+def baseline_generate(retrieval: RetrievalResult) -> AnswerResult:
+    """
+    Generate the answer text for already retrieved contexts.
+
+    Args:
+        retrieval: Result of baseline_retrieve
+
+    Returns:
+        AnswerResult with answer, citations, support score, and attempts
+    """
+    question = retrieval.query
+    contexts = retrieval.contexts
+
     if not contexts:
         return AnswerResult(
             text="申し訳ございませんが、関連する論文が見つかりませんでした。",
@@ -54,10 +83,10 @@ def baseline_answer(
             attempts=[{"type": "baseline", "top_ids": [], "support": 0.0}],
         )
 
-    # 2. Build prompt with contexts
+    # Build prompt with contexts
     prompt = _build_baseline_prompt(question, contexts)
 
-    # 3. Generate answer using retrieved contexts
+    # Generate answer using retrieved contexts
     try:
         answer_text = generate_answer(prompt, question)
     except Exception as e:
@@ -74,24 +103,33 @@ def baseline_answer(
             ],
         )
 
-    # 4. Calculate support score
-    support_score = calculate_support(question, contexts)
-
-    # 5. Generate citations
+    # Generate citations
     citations = generate_citations(contexts)
 
-    # 6. Record attempt
-    attempt = {
-        "type": "baseline",
-        "top_ids": [ctx.paper_id for ctx in contexts],
-        "support": support_score,
-    }
-
     return AnswerResult(
-        text=answer_text, citations=citations, support=support_score, attempts=[attempt]
+        text=answer_text,
+        citations=citations,
+        support=retrieval.support,
+        attempts=[baseline_attempt(retrieval)],
     )
 
 
+def baseline_answer(
+    question: str, index: Optional[InMemoryIndex] = None
+) -> AnswerResult:
+    """
+    Generate answer using baseline RAG pipeline.
+
+    Args:
+        question: User question
+        index: Optional index to use (uses global if not provided)
+
+    Returns:
+        AnswerResult with answer, citations, support score, and attempts
+    """
+    return baseline_generate(baseline_retrieve(question, index))
+
+
 def calculate_support(question: str, contexts: List[RetrievedContext]) -> float:
     """
     Calculate support score using cosine similarity between query and contexts.
@@ -179,8 +217,8 @@ Citations:
 """
 
     # Format contexts
-    context_text = ""
-    for i, ctx in enumerate(contexts, 1):
-        context_text += f"{i}) {ctx.title}\n{ctx.summary}\n\n"
+    context_text = "".join(
+        f"{i}) {ctx.title}\n{ctx.summary}\n\n" for i, ctx in enumerate(contexts, 1)
+    )
 
     return prompt.format(question=question, contexts=context_text.strip())
@@ -1,7 +1,11 @@
 """Corrective RAG pipeline with HyDE."""
 
 from src.models import AnswerResult
-from src.pipelines.baseline import baseline_answer
+from src.pipelines.baseline import (
+    baseline_attempt,
+    baseline_generate,
+    baseline_retrieve,
+)
 from src.llm.hyde import hyde_rewrite
 from src.config import get_support_threshold
 from typing import Optional, Any, List
@@ -24,30 +28,31 @@ def answer_with_correction(
     if theta is None:
         theta = get_support_threshold()
 
-    # 1. Try baseline RAG first
-    answer = baseline_answer(question, index)
+    # 1. Try baseline retrieval first; text is only generated once accepted
+    retrieval = baseline_retrieve(question, index)
+    attempts = [baseline_attempt(retrieval)]
 
     # 2. Check if support is sufficient
-    if answer.support >= theta:
-        return answer
+    if retrieval.support >= theta:
+        return baseline_generate(retrieval)
 
-    # 3. Try HyDE rewrite + baseline RAG
+    # 3. Try HyDE rewrite + baseline retrieval
     try:
         hyde_query = hyde_rewrite(question)
         print(f"HyDE rewrite: {hyde_query[:100]}...")
 
-        hyde_answer = baseline_answer(hyde_query, index)
+        hyde_retrieval = baseline_retrieve(hyde_query, index)
+        attempts.append(baseline_attempt(hyde_retrieval))
 
         # 4. Check HyDE result support
-        if hyde_answer.support >= theta:
+        if hyde_retrieval.support >= theta:
+            hyde_answer = baseline_generate(hyde_retrieval)
             # Add HyDE attempt to the result
             hyde_attempt = {
                 "type": "hyde",
                 "query": hyde_query,
-                "top_ids": hyde_answer.attempts[0]["top_ids"]
-                if hyde_answer.attempts
-                else [],
-                "support": hyde_answer.support,
+                "top_ids": [ctx.paper_id for ctx in hyde_retrieval.contexts],
+                "support": hyde_retrieval.support,
             }
             hyde_answer.attempts.append(hyde_attempt)
             return hyde_answer
@@ -56,11 +61,7 @@ def answer_with_correction(
         print(f"Warning: HyDE failed: {e}")
 
     # 5. Return no-answer response
-    all_attempts = answer.attempts.copy()
-    if "hyde_answer" in locals():
-        all_attempts.extend(hyde_answer.attempts)
-
-    return no_answer(question, attempts=all_attempts)
+    return no_answer(question, attempts=attempts)
 
 
 def no_answer(question: str, attempts: Optional[List[Any]] = None) -> AnswerResult:
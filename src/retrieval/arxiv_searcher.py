@@ -100,43 +100,71 @@ def search_arxiv_papers(
     )
 
     feed = feedparser.parse(url)
-    papers: List[Paper] = []
+    return [_entry_to_paper(e) for e in getattr(feed, "entries", [])]
 
-    for e in getattr(feed, "entries", []):
-        # Extract PDF link
-        pdf = ""
-        for link in getattr(e, "links", []):
-            if getattr(link, "type", "") == "application/pdf":
-                pdf = getattr(link, "href", "")
-                break
 
-        # Extract arXiv ID
-        arxiv_id_core = (
-            e.id.split("/")[-1].split("v")[0] if getattr(e, "id", "") else ""
-        )
+def fetch_arxiv_paper(paper_id: str) -> Optional[Paper]:
+    """
+    Look up a single arXiv paper by its ID.
 
-        # Extract authors
-        authors = []
-        if hasattr(e, "authors"):
-            authors = [getattr(author, "name", "") for author in e.authors]
-
-        # Extract categories
-        categories = []
-        if hasattr(e, "tags"):
-            categories = [getattr(tag, "term", "") for tag in e.tags]
-
-        # Create Paper object
-        paper = Paper(
-            id=arxiv_id_core,
-            title=getattr(e, "title", "").strip(),
-            link=getattr(e, "link", ""),
-            pdf=pdf if pdf else None,
-            summary=getattr(e, "summary", "").strip(),
-            authors=authors if authors else None,
-            updated=getattr(e, "updated", None),
-            categories=categories if categories else None,
-        )
+    Args:
+        paper_id: arXiv ID (e.g. "1706.03762")
 
-        papers.append(paper)
+    Returns:
+        Paper with full metadata, or None if no entry was found
 
-    return papers
+    Raises:
+        RuntimeError: If the request failed (feedparser reports transport
+            errors as a bozo feed and HTTP errors through its status), so
+            callers can tell a failure apart from an unknown ID
+    """
+    url = (
+        f"{ARXIV_API}?search_query={urllib.parse.quote(f'id:{paper_id}')}"
+        "&max_results=1"
+    )
+    feed = feedparser.parse(url)
+    entries = getattr(feed, "entries", [])
+    if entries:
+        return _entry_to_paper(entries[0])
+    status = getattr(feed, "status", 200)
+    if getattr(feed, "bozo", False) or status != 200:
+        raise RuntimeError(
+            f"arXiv lookup for {paper_id} failed (status={status}): "
+            f"{getattr(feed, 'bozo_exception', '')}"
+        )
+    return None
+
+
+def _entry_to_paper(e) -> Paper:
+    """Convert a feedparser Atom entry into a Paper."""
+    # Extract PDF link
+    pdf = ""
+    for link in getattr(e, "links", []):
+        if getattr(link, "type", "") == "application/pdf":
+            pdf = getattr(link, "href", "")
+            break
+
+    # Extract arXiv ID
+    arxiv_id_core = e.id.split("/")[-1].split("v")[0] if getattr(e, "id", "") else ""
+
+    # Extract authors
+    authors = []
+    if hasattr(e, "authors"):
+        authors = [getattr(author, "name", "") for author in e.authors]
+
+    # Extract categories
+    categories = []
+    if hasattr(e, "tags"):
+        categories = [getattr(tag, "term", "") for tag in e.tags]
+
+    # Create Paper object
+    return Paper(
+        id=arxiv_id_core,
+        title=getattr(e, "title", "").strip(),
+        link=getattr(e, "link", ""),
+        pdf=pdf if pdf else None,
+        summary=getattr(e, "summary", "").strip(),
+        authors=authors if authors else None,
+        updated=getattr(e, "updated", None),
+        categories=categories if categories else None,
+    )
@@ -1,17 +1,70 @@
 """In-memory vector index for RAG retrieval."""
 
 import numpy as np
-from typing import List, Tuple
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
 from src.models import Paper, RetrievedContext
 from src.llm.embeddings import get_embed
 
+try:
+    import hnswlib
+except ImportError:  # optional: pip install 'papers-rag-agent[ann]'
+    hnswlib = None
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+# Quantized scores shortlist k * factor candidates, which are then re-ranked
+# with the original float32 vectors. Sign bits are much coarser than int8.
+_RESCORE_FACTOR = {"int8": 4, "binary": 10}
+
+# HNSW results are re-ranked exactly; fetch a few extra neighbours for that.
+_ANN_OVERSAMPLE = 2
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_rows(bits: np.ndarray) -> np.ndarray:
+    """Number of set bits per row of a packed uint8 matrix."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(bits).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_TABLE[bits].sum(axis=1, dtype=np.int32)
+
+
+def _inverse_norms(mat: np.ndarray) -> np.ndarray:
+    """1 / (L2 norm + eps) per row, as float32."""
+    norms = np.linalg.norm(np.asarray(mat, dtype=np.float32), axis=1)
+    return (1.0 / (norms + 1e-8)).astype(np.float32)
+
+
+def _quantize_int8(mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization. Returns (codes, scales)."""
+    scales = np.abs(mat).max(axis=-1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(mat / scales).astype(np.int8)
+    return codes, scales.astype(np.float32).reshape(mat.shape[:-1])
+
 
 class InMemoryIndex:
     """Simple in-memory vector index using cosine similarity."""
 
-    def __init__(self):
-        """Initialize empty index."""
-        self.papers_with_embeddings: List[Tuple[Paper, np.ndarray]] = []
+    def __init__(self, quantization: str = "none"):
+        """Initialize empty index.
+
+        Args:
+            quantization: One of ``QUANTIZATION_MODES``; see ``quantize``.
+        """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        # (N, dim) matrix aligned with papers_with_embeddings; may be a memmap
+        self.embeddings: Optional[np.ndarray] = None
+        self._inv_norms: Optional[np.ndarray] = None
+        self.papers_with_embeddings = []
+        self.quantization = quantization
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._quantized_source: Optional[list] = None
+        self._ann = None
+        self._ann_source: Optional[list] = None
 
     def build(self, papers: List[Paper]) -> None:
         """
@@ -20,7 +73,7 @@ class InMemoryIndex:
         Args:
             papers: List of Paper objects with title and summary
         """
-        self.papers_with_embeddings = []
+        papers_with_embeddings = []
 
         for paper in papers:
             # Combine title and summary for embedding
@@ -29,14 +82,261 @@ class InMemoryIndex:
             try:
                 # Get embedding for the combined text
                 embedding = get_embed(text)
-                self.papers_with_embeddings.append((paper, embedding))
+                papers_with_embeddings.append((paper, embedding))
 
             except Exception as e:
                 print(f"Warning: Failed to embed paper {paper.id}: {e}")
                 continue
 
+        # Assign once so the matrix is stacked from the complete list
+        self.papers_with_embeddings = papers_with_embeddings
         print(f"Built index with {len(self.papers_with_embeddings)} papers")
 
+        if self.quantization != "none":
+            self.quantize(self.quantization)
+
+    @property
+    def papers_with_embeddings(self) -> List[Tuple[Paper, np.ndarray]]:
+        """(Paper, embedding) pairs in index order."""
+        return self._papers_with_embeddings
+
+    @papers_with_embeddings.setter
+    def papers_with_embeddings(self, value: List[Tuple[Paper, np.ndarray]]) -> None:
+        # Stack and measure the vectors once here rather than on the first query
+        self._papers_with_embeddings = value
+        if value:
+            self.embeddings = np.stack(
+                [np.asarray(e, dtype=np.float32) for _, e in value]
+            )
+            self._inv_norms = _inverse_norms(self.embeddings)
+        else:
+            self.embeddings = None
+            self._inv_norms = None
+
+    def set_embeddings(self, papers: List[Paper], embeddings: np.ndarray) -> None:
+        """
+        Populate the index from papers and a row-aligned (N, dim) matrix.
+
+        The matrix is kept as-is (e.g. a read-only memmap) and searched
+        directly, so rows are only paged in when a query touches them.
+
+        Args:
+            papers: Papers in the same order as the matrix rows
+            embeddings: (N, dim) float32 or float16 matrix
+        """
+        self._papers_with_embeddings = list(zip(papers, embeddings))
+        self.embeddings = embeddings
+        # Computed on the first full scan, which reads every row anyway
+        self._inv_norms = None
+
+    def _full_inv_norms(self) -> np.ndarray:
+        """1 / L2 norm of every embeddings row."""
+        if self._inv_norms is None:
+            self._inv_norms = _inverse_norms(self.embeddings)
+        return self._inv_norms
+
+    def quantize(self, mode: str = "int8") -> None:
+        """
+        Build a compact copy of the embeddings used to shortlist search results.
+
+        ``"int8"`` stores each L2-normalized vector as int8 with a per-row
+        scale (4x smaller than float32); ``"binary"`` keeps only the sign bits
+        (32x smaller). Shortlisted candidates are re-scored with the original
+        vectors: int8 leaves the top-k effectively unchanged, binary is an
+        approximate search best suited to large, high-dimensional indexes.
+        ``"none"`` drops the quantized copy.
+
+        Call again after replacing ``papers_with_embeddings``; a stale copy is
+        ignored and search falls back to the exact scan.
+
+        Args:
+            mode: One of ``QUANTIZATION_MODES``
+        """
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization: {mode}")
+
+        self.quantization = mode
+        self._codes = None
+        self._scales = None
+        self._quantized_source = None
+        if mode == "none" or not self.papers_with_embeddings:
+            return
+
+        mat = self._normalized_matrix()
+        if mode == "int8":
+            self._codes, self._scales = _quantize_int8(mat)
+        else:
+            self._codes = np.packbits(mat > 0, axis=1)
+        self._quantized_source = self.papers_with_embeddings
+
+    def is_quantized(self, mode: str) -> bool:
+        """Whether a ``mode`` quantized copy matching the current embeddings exists."""
+        return (
+            self.quantization == mode
+            and self._codes is not None
+            and self._quantized_source is self.papers_with_embeddings
+        )
+
+    def save_quantized(self, path: Union[str, Path]) -> None:
+        """Write the quantized copy built by ``quantize`` to ``path`` (.npz)."""
+        if self.quantization == "none" or not self.is_quantized(self.quantization):
+            raise ValueError("Quantized embeddings have not been built")
+        arrays = {"mode": np.array(self.quantization), "codes": self._codes}
+        if self._scales is not None:
+            arrays["scales"] = self._scales
+        np.savez(path, **arrays)
+
+    def load_quantized(
+        self, path: Union[str, Path], mode: Optional[str] = None
+    ) -> None:
+        """
+        Load a quantized copy saved by ``save_quantized`` for the current embeddings.
+
+        Skips re-quantizing the float matrix at startup; shortlisted rows are
+        still re-scored with the original vectors.
+
+        Args:
+            path: File written by ``save_quantized``
+            mode: Expected quantization mode; None accepts whichever was saved
+
+        Raises:
+            ValueError: If the copy does not match the loaded embeddings or mode
+        """
+        if not self.papers_with_embeddings:
+            raise ValueError("Load embeddings before the quantized copy")
+
+        with np.load(path, allow_pickle=False) as data:
+            saved_mode = str(data["mode"])
+            codes = data["codes"]
+            scales = data["scales"] if "scales" in data.files else None
+        int8 = saved_mode == "int8"
+        if saved_mode not in _RESCORE_FACTOR or int8 != (scales is not None):
+            raise ValueError(f"Unsupported quantized copy: {saved_mode}")
+        if mode is not None and saved_mode != mode:
+            raise ValueError(f"Quantized copy is {saved_mode}, expected {mode}")
+        n = len(self.papers_with_embeddings)
+        if len(codes) != n:
+            raise ValueError(f"Quantized copy has {len(codes)} rows, expected {n}")
+
+        self.quantization = saved_mode
+        self._codes = codes
+        self._scales = scales
+        self._quantized_source = self.papers_with_embeddings
+
+    def build_ann_index(
+        self, M: int = 16, ef_construction: int = 200, ef_search: int = 64
+    ) -> None:
+        """
+        Build an HNSW graph (hnswlib, cosine space) over the embeddings.
+
+        Search then visits a small part of the graph instead of scanning every
+        vector, and re-ranks the neighbours it finds exactly. Requires the
+        optional ``hnswlib`` package. Like ``quantize``, call again after
+        replacing ``papers_with_embeddings``.
+
+        Args:
+            M: Graph degree
+            ef_construction: Candidate list size while building
+            ef_search: Candidate list size while searching (recall/speed knob)
+        """
+        if hnswlib is None:
+            raise ImportError("hnswlib is required for the ANN index")
+
+        self._ann = None
+        self._ann_source = None
+        if not self.papers_with_embeddings:
+            return
+
+        mat = self._normalized_matrix()
+        ann = hnswlib.Index(space="cosine", dim=mat.shape[1])
+        ann.init_index(max_elements=len(mat), ef_construction=ef_construction, M=M)
+        ann.add_items(mat, np.arange(len(mat)))
+        ann.set_ef(ef_search)
+        self._ann = ann
+        self._ann_source = self.papers_with_embeddings
+
+    def save_ann_index(self, path: Union[str, Path]) -> None:
+        """Write the HNSW graph built by ``build_ann_index`` to ``path``."""
+        if self._ann is None:
+            raise ValueError("ANN index has not been built")
+        self._ann.save_index(str(path))
+
+    def load_ann_index(self, path: Union[str, Path], ef_search: int = 64) -> None:
+        """
+        Load an HNSW graph saved by ``save_ann_index`` for the current embeddings.
+
+        Raises:
+            ValueError: If the graph does not match the loaded embeddings
+        """
+        if hnswlib is None:
+            raise ImportError("hnswlib is required for the ANN index")
+        if not self.papers_with_embeddings:
+            raise ValueError("Load embeddings before the ANN index")
+
+        n = len(self.papers_with_embeddings)
+        dim = len(self.papers_with_embeddings[0][1])
+        ann = hnswlib.Index(space="cosine", dim=dim)
+        ann.load_index(str(path), max_elements=n)
+        if ann.get_current_count() != n:
+            raise ValueError(
+                f"ANN index has {ann.get_current_count()} items, expected {n}"
+            )
+        ann.set_ef(ef_search)
+        self._ann = ann
+        self._ann_source = self.papers_with_embeddings
+
+    def has_ann_index(self) -> bool:
+        """Whether an HNSW graph matching the current embeddings is loaded."""
+        return self._ann is not None and self._ann_source is self.papers_with_embeddings
+
+    def _normalized_matrix(self) -> np.ndarray:
+        """Stack the embeddings into an L2-normalized (N, dim) float32 matrix."""
+        # astype copies, so a read-only memmap is never written to
+        mat = self.embeddings.astype(np.float32)
+        mat *= self._full_inv_norms()[:, None]
+        return mat
+
+    def _candidate_indices(
+        self, query_embedding: np.ndarray, k: int
+    ) -> Optional[List[int]]:
+        """Shortlist row indices via the ANN graph or quantized embeddings.
+
+        Returns None when neither is available, meaning a full scan.
+        """
+        q = np.asarray(query_embedding, dtype=np.float32)
+        q = q / (np.linalg.norm(q) + 1e-8)
+        n = len(self.papers_with_embeddings)
+
+        if self.has_ann_index():
+            n_candidates = min(n, max(k, 1) * _ANN_OVERSAMPLE)
+            # knn_query needs ef >= k
+            self._ann.set_ef(max(self._ann.ef, n_candidates))
+            labels, _ = self._ann.knn_query(q, k=n_candidates)
+            return labels[0].tolist()
+
+        if (
+            self._codes is None
+            or self._quantized_source is not self.papers_with_embeddings
+        ):
+            return None
+
+        if self.quantization == "int8":
+            q_codes, _ = _quantize_int8(q)
+            # int32 accumulation; einsum casts in buffered blocks, not all at once
+            scores = (
+                np.einsum("nd,d->n", self._codes, q_codes, dtype=np.int32)
+                * self._scales
+            )
+        else:
+            q_bits = np.packbits(q > 0)
+            # Fewer differing sign bits means a smaller angle
+            scores = -_popcount_rows(np.bitwise_xor(self._codes, q_bits))
+
+        n_candidates = min(n, max(k, 1) * _RESCORE_FACTOR[self.quantization])
+        if n_candidates >= n:
+            return list(range(n))
+        return np.argpartition(-scores, n_candidates - 1)[:n_candidates].tolist()
+
     def search(self, query: str, k: int) -> List[RetrievedContext]:
         """
         Search for top-k most similar papers.
@@ -59,20 +359,33 @@ class InMemoryIndex:
             print(f"Error: Failed to embed query: {e}")
             return []
 
-        # Calculate cosine similarities
-        similarities = []
-        for paper, paper_embedding in self.papers_with_embeddings:
-            # Cosine similarity = dot product of normalized vectors
-            similarity = self._cosine_similarity(query_embedding, paper_embedding)
-            similarities.append((similarity, paper, paper_embedding))
+        indices = self._candidate_indices(query_embedding, k)
+        if indices is not None:
+            # Only the shortlisted rows are read (and paged in, for a memmap)
+            rows = np.asarray(indices, dtype=np.intp)
+            matrix = np.asarray(self.embeddings[rows], dtype=np.float32)
+            inv_norms = _inverse_norms(matrix)
+        else:
+            rows = np.arange(len(self.papers_with_embeddings))
+            matrix, inv_norms = self.embeddings, self._full_inv_norms()
 
-        # Sort by similarity (descending) and take top-k
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        top_results = similarities[:k]
+        # Cosine similarity of every candidate in one matrix-vector product,
+        # clamped to [0, 1]
+        q = np.asarray(query_embedding, dtype=np.float32)
+        q = q / (np.linalg.norm(q) + 1e-8)
+        similarities = np.maximum((matrix @ q) * inv_norms, 0.0)
+
+        # Select the top-k without sorting every score, then order them by
+        # similarity (descending), breaking ties by index
+        top = np.arange(len(similarities))
+        if 0 < k < len(similarities):
+            top = np.argpartition(-similarities, k - 1)[:k]
+        order = top[np.lexsort((top, -similarities[top]))][:k]
 
         # Convert to RetrievedContext objects
         contexts = []
-        for similarity, paper, embedding in top_results:
+        for i in rows[order]:
+            paper, embedding = self.papers_with_embeddings[i]
             context = RetrievedContext(
                 paper_id=paper.id,
                 title=paper.title,
@@ -83,23 +396,3 @@ class InMemoryIndex:
             contexts.append(context)
 
         return contexts
-
-    def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
-        """
-        Calculate cosine similarity between two vectors.
-
-        Args:
-            a, b: Input vectors
-
-        Returns:
-            Cosine similarity score (0-1)
-        """
-        # Normalize vectors
-        a_norm = a / (np.linalg.norm(a) + 1e-8)
-        b_norm = b / (np.linalg.norm(b) + 1e-8)
-
-        # Dot product of normalized vectors
-        similarity = np.dot(a_norm, b_norm)
-
-        # Clamp to [0, 1] range
-        return max(0.0, float(similarity))
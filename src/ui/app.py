@@ -8,38 +8,50 @@ import chainlit as cl
 
 API_BASE = os.getenv("PAPERS_API_BASE", "http://localhost:9000")
 
+# API への接続（TCP/TLS）を使い回すため、クライアントはプロセスで1つだけ作る
+_api_client: httpx.AsyncClient | None = None
+
+
+def _get_api_client() -> httpx.AsyncClient:
+    global _api_client
+    if _api_client is None or _api_client.is_closed:
+        _api_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+    return _api_client
+
 
 # -------- helpers --------
 async def get_health() -> dict:
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        r = await client.get(f"{API_BASE}/health")
-        r.raise_for_status()
-        return r.json()
+    client = _get_api_client()
+    r = await client.get(f"{API_BASE}/health", timeout=15.0)
+    r.raise_for_status()
+    return r.json()
 
 
 async def call_arxiv_search(query: str, max_results: int = 10) -> list[dict]:
     payload = {"query": query, "max_results": max_results}
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        r = await client.post(f"{API_BASE}/arxiv/search", json=payload)
-        r.raise_for_status()
-        return r.json().get("items", [])
+    client = _get_api_client()
+    r = await client.post(f"{API_BASE}/arxiv/search", json=payload, timeout=30.0)
+    r.raise_for_status()
+    return r.json().get("items", [])
 
 
 async def call_digest(cat: str = "cs.LG", days: int = 1, limit: int = 10) -> list[dict]:
     params = {"cat": cat, "days": days, "limit": limit}
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        r = await client.get(f"{API_BASE}/digest", params=params)
-        r.raise_for_status()
-        return r.json()
+    client = _get_api_client()
+    r = await client.get(f"{API_BASE}/digest", params=params, timeout=30.0)
+    r.raise_for_status()
+    return r.json()
 
 
 async def call_digest_details(paper_id: str) -> dict:
     """論文の詳細情報を取得"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            r = await client.get(f"{API_BASE}/digest/{paper_id}/details")
-            r.raise_for_status()
-            return r.json()
+        client = _get_api_client()
+        r = await client.get(f"{API_BASE}/digest/{paper_id}/details", timeout=60.0)
+        r.raise_for_status()
+        return r.json()
     except httpx.HTTPStatusError as e:
         error_msg = f"HTTP {e.response.status_code}: {e.response.text}"
         print(f"❌ API Error: {error_msg}")
@@ -41,19 +41,19 @@ def render_quiz(items: List[QuizItem]) -> str:
     if not items:
         return ""
 
-    markdown = "## Quiz Questions\n\n"
+    parts = ["## Quiz Questions\n\n"]
 
     for i, item in enumerate(items, 1):
-        markdown += f"### Question {i}\n{item.question}\n\n"
+        parts.append(f"### Question {i}\n{item.question}\n\n")
 
         for option in item.options:
             # Mark correct answer with ✓
             marker = "✓ " if option.id == item.correct_answer else ""
-            markdown += f"- {marker}{option.id.upper()}: {option.text}\n"
+            parts.append(f"- {marker}{option.id.upper()}: {option.text}\n")
 
-        markdown += "\n"
+        parts.append("\n")
 
-    return markdown
+    return "".join(parts)
 
 
 def render_citations(cites: List[Citation]) -> str:
@@ -69,7 +69,7 @@ def render_citations(cites: List[Citation]) -> str:
     if not cites:
         return ""
 
-    markdown = "## References\n\n"
+    parts = ["## References\n\n"]
 
     for cite in cites:
         authors_str = ", ".join(cite.authors)
@@ -78,6 +78,6 @@ def render_citations(cites: List[Citation]) -> str:
         if cite.url:
             citation_text += f" [{cite.url}]({cite.url})"
 
-        markdown += f"{citation_text}\n\n"
+        parts.append(f"{citation_text}\n\n")
 
-    return markdown
+    return "".join(parts)
@@ -0,0 +1,139 @@
+"""/digest エンドポイントのテスト（arXiv 検索と翻訳はスタブ）"""
+
+import asyncio
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+
+from src.api.routers import digest
+from src.models import Paper
+
+
+def _papers(n: int):
+    return [
+        Paper(
+            id=f"2501.{i:05d}",
+            title=f"RAG paper {i}",
+            link=f"https://arxiv.org/abs/2501.{i:05d}",
+            summary=f"Summary {i}. Second sentence. Third sentence.",
+        )
+        for i in range(n)
+    ]
+
+
+async def _fake_translate_batch(texts, max_chars, limiter=None):
+    return [f"訳:{t}" for t in texts]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(digest.router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def small_groups(monkeypatch):
+    # 1グループあたり1件になるように翻訳のまとめ単位を小さくする
+    monkeypatch.setattr(digest, "_TRANSLATION_BATCH_CHARS", 1)
+
+
+class TestDigestJson:
+    """通常の JSON 配列レスポンスのテスト"""
+
+    def test_returns_translated_items_in_order(self, client, small_groups):
+        papers = _papers(3)
+        with (
+            patch.object(digest, "search_papers", AsyncMock(return_value=papers)),
+            patch.object(
+                digest, "a_translate_batch", side_effect=_fake_translate_batch
+            ) as translate,
+        ):
+            response = client.get("/digest", params={"limit": 3})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/json")
+        body = response.json()
+        assert [item["id"] for item in body] == [p.id for p in papers]
+        assert body[0]["title"] == "訳:RAG paper 0"
+        assert body[0]["summary_short"].startswith("訳:Summary 0.")
+        # 翻訳の同時実行数はプロセス全体で共有するセマフォで制限する
+        assert translate.call_count == 3
+        for call in translate.call_args_list:
+            assert call.args[2] is digest._translation_sem
+
+
+class TestDigestNdjson:
+    """Accept: application/x-ndjson のストリーミングレスポンスのテスト"""
+
+    def test_streams_one_row_per_line(self, client, small_groups):
+        papers = _papers(3)
+        with (
+            patch.object(digest, "search_papers", AsyncMock(return_value=papers)),
+            patch.object(
+                digest, "a_translate_batch", side_effect=_fake_translate_batch
+            ),
+        ):
+            response = client.get(
+                "/digest",
+                params={"limit": 3},
+                headers={"Accept": digest.NDJSON_MEDIA_TYPE},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith(digest.NDJSON_MEDIA_TYPE)
+        rows = [orjson.loads(line) for line in response.text.splitlines()]
+        assert sorted(row["id"] for row in rows) == sorted(p.id for p in papers)
+        assert all(row["title"].startswith("訳:") for row in rows)
+
+    def test_rows_are_sent_as_groups_finish(self, client, small_groups):
+        papers = _papers(2)
+
+        async def first_group_is_slow(texts, max_chars, limiter=None):
+            if texts[0] == papers[0].title:
+                await asyncio.sleep(0.05)
+            return await _fake_translate_batch(texts, max_chars)
+
+        with (
+            patch.object(digest, "search_papers", AsyncMock(return_value=papers)),
+            patch.object(digest, "a_translate_batch", side_effect=first_group_is_slow),
+        ):
+            response = client.get(
+                "/digest",
+                params={"limit": 2},
+                headers={"Accept": digest.NDJSON_MEDIA_TYPE},
+            )
+
+        ids = [orjson.loads(line)["id"] for line in response.text.splitlines()]
+        assert ids == [papers[1].id, papers[0].id]
+
+    async def test_disconnect_cancels_remaining_translations(self, small_groups):
+        papers = _papers(2)
+        cancelled = asyncio.Event()
+
+        async def second_group_hangs(texts, max_chars, limiter=None):
+            if texts[0] == papers[1].title:
+                try:
+                    await asyncio.sleep(60)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return await _fake_translate_batch(texts, max_chars)
+
+        with (
+            patch.object(digest, "search_papers", AsyncMock(return_value=papers)),
+            patch.object(digest, "a_translate_batch", side_effect=second_group_hangs),
+        ):
+            response = await digest.get_digest(
+                cat="cs.LG", days=2, limit=2, accept=digest.NDJSON_MEDIA_TYPE
+            )
+            body = response.body_iterator
+            first = await body.__anext__()
+            # クライアント切断時と同様にストリームを閉じる
+            await body.aclose()
+            await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+        assert orjson.loads(first)["id"] == papers[0].id
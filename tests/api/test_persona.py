@@ -0,0 +1,167 @@
+"""まとめ翻訳（a_translate_batch）のテスト"""
+
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.api.utils import persona
+from src.llm import generator
+from src.api.utils.persona import _parse_json_string_list, a_translate_batch
+
+
+@pytest.fixture(autouse=True)
+def clear_translation_cache():
+    persona._translation_cache.clear()
+    yield
+    persona._translation_cache.clear()
+
+
+def _is_batch(prompt: str) -> bool:
+    return "JSON配列" in prompt
+
+
+def _batch_inputs(prompt: str) -> list:
+    start = prompt.index("[")
+    end = prompt.index("]\n\n翻訳:")
+    return json.loads(prompt[start : end + 1])
+
+
+class FakeLLM:
+    """a_generate_answer の代わりに呼び出しを記録するスタブ"""
+
+    def __init__(self, batch_reply=None):
+        self.batch_reply = batch_reply
+        self.prompts = []
+
+    async def __call__(self, prompt: str, validate=None) -> str:
+        self.prompts.append(prompt)
+        if not _is_batch(prompt):
+            return f"訳:{prompt.split(chr(10) * 2)[1]}"
+        reply = self.batch_reply
+        if reply is None:
+            texts = _batch_inputs(prompt)
+            reply = "結果:\n" + json.dumps(
+                [f"訳:{t}" for t in texts], ensure_ascii=False
+            )
+        if validate is not None:
+            validate(reply)
+        return reply
+
+    @property
+    def batch_calls(self):
+        return [p for p in self.prompts if _is_batch(p)]
+
+    @property
+    def single_calls(self):
+        return [p for p in self.prompts if not _is_batch(p)]
+
+
+class TestParseJsonStringList:
+    """LLM 応答から JSON 配列を取り出す処理のテスト"""
+
+    def test_extracts_array_from_surrounding_text(self):
+        assert _parse_json_string_list('答え: ["a", "b"] 以上', 2) == ["a", "b"]
+
+    @pytest.mark.parametrize(
+        "raw",
+        ["no array here", '["a"]', '["a", 1]', '["a", "b", "c"]', "[not json]"],
+    )
+    def test_rejects_bad_replies(self, raw):
+        with pytest.raises(ValueError):
+            _parse_json_string_list(raw, 2)
+
+
+class TestTranslateBatch:
+    """まとめ翻訳とフォールバックのテスト"""
+
+    async def test_well_formed_array_uses_one_call(self):
+        llm = FakeLLM()
+        with patch.object(persona, "a_generate_answer", llm):
+            out = await a_translate_batch(["alpha", "beta"], [100, 100])
+
+        assert out == ["訳:alpha", "訳:beta"]
+        assert len(llm.prompts) == 1
+        # 翻訳結果はキャッシュされ、次回は LLM を呼ばない
+        with patch.object(persona, "a_generate_answer", llm):
+            assert await a_translate_batch(["alpha"], [100]) == ["訳:alpha"]
+        assert len(llm.prompts) == 1
+
+    @pytest.mark.parametrize("reply", ['["only one"]', "Sorry, I cannot do that."])
+    async def test_bad_reply_falls_back_per_item(self, reply):
+        llm = FakeLLM(batch_reply=reply)
+        with patch.object(persona, "a_generate_answer", llm):
+            out = await a_translate_batch(["alpha", "beta"], [100, 100])
+
+        assert out == ["訳:alpha", "訳:beta"]
+        assert len(llm.batch_calls) == 1
+        assert len(llm.single_calls) == 2
+
+    async def test_bad_reply_is_not_replayed_from_llm_cache(self):
+        """不正な応答は LLM 応答キャッシュに残らず、再試行で再取得される"""
+        batch_replies = iter(["Sorry.", '["訳:alpha", "訳:beta"]'])
+
+        def reply(messages):
+            prompt = messages[0].content
+            content = next(batch_replies) if _is_batch(prompt) else "単体訳"
+            return MagicMock(content=content)
+
+        llm = MagicMock()
+        llm.ainvoke = AsyncMock(side_effect=reply)
+        generator._response_cache.clear()
+        with patch("src.llm.generator._build_llm", return_value=llm):
+            first = await a_translate_batch(["alpha", "beta"], [100, 100])
+            persona._translation_cache.clear()
+            second = await a_translate_batch(["alpha", "beta"], [100, 100])
+        generator._response_cache.clear()
+
+        assert first == ["単体訳", "単体訳"]
+        assert second == ["訳:alpha", "訳:beta"]
+
+    async def test_cached_japanese_and_empty_texts_are_not_sent(self):
+        persona._cache_put(("cached", 100), "キャッシュ済み")
+        llm = FakeLLM()
+        with patch.object(persona, "a_generate_answer", llm):
+            out = await a_translate_batch(
+                ["cached", "日本語のタイトル", "", "  ", "fresh"], [100] * 5
+            )
+
+        assert out == ["キャッシュ済み", "日本語のタイトル", "", "", "訳:fresh"]
+        assert _batch_inputs(llm.batch_calls[0]) == ["fresh"]
+
+    async def test_duplicate_texts_fill_every_index(self):
+        llm = FakeLLM()
+        with patch.object(persona, "a_generate_answer", llm):
+            out = await a_translate_batch(
+                ["alpha", "beta", "alpha", "alpha  "], [100] * 4
+            )
+
+        assert out == ["訳:alpha", "訳:beta", "訳:alpha", "訳:alpha"]
+        # 同じテキストは1回だけ送る
+        assert _batch_inputs(llm.batch_calls[0]) == ["alpha", "beta"]
+
+    async def test_limiter_bounds_every_llm_call(self):
+        live = peak = 0
+
+        async def slow_bad_reply(prompt: str, validate=None) -> str:
+            nonlocal live, peak
+            live += 1
+            peak = max(peak, live)
+            await asyncio.sleep(0.01)
+            live -= 1
+            return "not json"
+
+        limiter = asyncio.Semaphore(2)
+        with patch.object(persona, "a_generate_answer", slow_bad_reply):
+            results = await asyncio.gather(
+                *(
+                    a_translate_batch(
+                        [f"text {i} {j}" for j in range(3)], [100] * 3, limiter
+                    )
+                    for i in range(4)
+                )
+            )
+
+        assert len(results) == 4
+        assert peak == 2
@@ -0,0 +1,139 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from api.core import arxiv_service
+from api.core.arxiv_service import TTLCache, fetch_paper, search, search_papers
+from src.models import Paper
+
+
+@pytest.fixture(autouse=True)
+def clear_search_cache():
+    arxiv_service._search_cache.clear()
+    arxiv_service._paper_cache.clear()
+    arxiv_service._missing_paper_cache.clear()
+    yield
+    arxiv_service._search_cache.clear()
+    arxiv_service._paper_cache.clear()
+    arxiv_service._missing_paper_cache.clear()
+
+
+class TestTTLCache:
+    """TTLCacheの基本動作テスト"""
+
+    def test_get_set(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+
+    def test_expired_entry_is_dropped(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        with patch("src.utils.ttl_cache.time.monotonic", return_value=0.0):
+            cache.set("a", 1)
+        with patch("src.utils.ttl_cache.time.monotonic", return_value=61.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" が最も古くなる
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_zero_ttl_disables_cache(self):
+        cache = TTLCache(maxsize=2, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+
+class TestCachedSearch:
+    """検索結果キャッシュのテスト"""
+
+    async def test_search_reuses_results(self):
+        raw = [{"id": "1", "title": "t", "link": "l", "pdf": "p"}]
+        with patch(
+            "api.core.arxiv_service.run_arxiv_search", return_value=raw
+        ) as mock_search:
+            first = await search("transformer", 5)
+            second = await search("transformer", 5)
+            await search("transformer", 6)
+
+        assert first == second
+        assert first[0].url == "l"
+        assert first[0].summary == ""
+        assert mock_search.call_count == 2
+
+    async def test_search_errors_are_not_cached(self):
+        with patch(
+            "api.core.arxiv_service.run_arxiv_search",
+            side_effect=Exception("network"),
+        ) as mock_search:
+            assert await search("transformer", 5) == []
+            assert await search("transformer", 5) == []
+
+        assert mock_search.call_count == 2
+
+    async def test_search_papers_keyed_by_date_range(self):
+        paper = Paper(id="1", title="t", link="l", summary="s")
+        with patch(
+            "api.core.arxiv_service.search_arxiv_papers", return_value=[paper]
+        ) as mock_search:
+            await search_papers("cat:cs.LG", 10, date_range="a")
+            await search_papers("cat:cs.LG", 10, date_range="a")
+            await search_papers("cat:cs.LG", 10, date_range="b")
+
+        assert mock_search.call_count == 2
+
+    async def test_failed_feed_is_not_cached(self):
+        # arXiv に接続できない場合、feedparser は例外ではなく bozo な空フィードを返す
+        feed = Mock(bozo=True, entries=[])
+        with patch(
+            "src.retrieval.arxiv_searcher.feedparser.parse", return_value=feed
+        ) as mock_parse:
+            assert await search_papers("cat:cs.LG", 5) == []
+            assert await search_papers("cat:cs.LG", 5) == []
+            assert await search("transformer", 5) == []
+            assert await search("transformer", 5) == []
+
+        assert mock_parse.call_count == 4
+
+    async def test_fetch_paper_caches_hits_and_misses(self):
+        paper = Paper(id="1706.03762", title="t", link="l", summary="s")
+
+        def fake_fetch(pid):
+            if pid == "2301.00001":
+                raise RuntimeError("arXiv lookup failed (status=503)")
+            return paper if pid == "1706.03762" else None
+
+        with patch(
+            "api.core.arxiv_service.fetch_arxiv_paper", side_effect=fake_fetch
+        ) as mock_fetch:
+            assert await fetch_paper("1706.03762") is paper
+            assert await fetch_paper("1706.03762") is paper
+            assert await fetch_paper("0000.00000") is None
+            assert await fetch_paper("0000.00000") is None
+            # 取得失敗は「存在しない」として記録せず、次回は再取得する
+            for _ in range(2):
+                with pytest.raises(RuntimeError):
+                    await fetch_paper("2301.00001")
+
+        assert mock_fetch.call_count == 4
+
+    async def test_fetch_paper_miss_expires(self):
+        with patch(
+            "api.core.arxiv_service.fetch_arxiv_paper", return_value=None
+        ) as mock_fetch:
+            with patch("src.utils.ttl_cache.time.monotonic", return_value=0.0):
+                await fetch_paper("0000.00000")
+            # 見つからなかったIDは短いTTLの後に再取得する
+            with patch(
+                "src.utils.ttl_cache.time.monotonic",
+                return_value=arxiv_service.MISSING_PAPER_TTL + 1.0,
+            ):
+                await fetch_paper("0000.00000")
+
+        assert mock_fetch.call_count == 2
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from api.core import graph_service
+
+
+async def _collect(question="q"):
+    return [c async for c in graph_service.stream_message(question, None)]
+
+
+class TestStreamMessage:
+    """stream_messageのテスト"""
+
+    async def test_small_chunks_are_coalesced(self):
+        """小さなチャンクがまとめて送信されることのテスト"""
+
+        async def fake_stream(question, rag_index=None):
+            for _ in range(100):
+                yield "x" * 50
+
+        with patch(
+            "api.core.graph_service.astream_message_with_routing", fake_stream
+        ):
+            out = await _collect()
+
+        content = [c for c in out if c["type"] == "content"]
+        assert "".join(c["text"] for c in content) == "x" * 5000
+        # 最初のチャンクは即時送信
+        assert content[0]["text"] == "x" * 50
+        assert content[-1]["done"] is True
+        assert all(not c["done"] for c in content[:-1])
+        assert len(content) < 10
+
+    async def test_error_is_reported(self):
+        """ワークフロー例外時にerrorチャンクが返ることのテスト"""
+
+        async def failing_stream(question, rag_index=None):
+            raise RuntimeError("boom")
+            yield  # pragma: no cover
+
+        with patch(
+            "api.core.graph_service.astream_message_with_routing", failing_stream
+        ):
+            out = await _collect()
+
+        assert out[-1]["type"] == "error"
+        assert out[-1]["done"] is True
@@ -216,7 +216,8 @@ class TestAsyncLoadOrBuildIndex:
 class TestBuildIndexFromQueries:
     """_build_index_from_queriesのテスト"""
 
-    def test_build_with_unique_papers(self):
+    @pytest.mark.asyncio
+    async def test_build_with_unique_papers(self):
         """ユニークなペーパーでのビルドテスト"""
         mock_paper1 = Mock()
         mock_paper1.id = "paper1"
@@ -231,14 +232,15 @@ class TestBuildIndexFromQueries:
                 mock_index.papers_with_embeddings = [1, 2]
                 mock_index_class.return_value = mock_index
 
-                result = _build_index_from_queries(["query1", "query2"], 5)
+                result = await _build_index_from_queries(["query1", "query2"], 5)
 
                 assert result is mock_index
                 mock_index.build.assert_called_once()
                 called_papers = mock_index.build.call_args[0][0]
                 assert len(called_papers) == 2
 
-    def test_build_with_duplicate_papers(self):
+    @pytest.mark.asyncio
+    async def test_build_with_duplicate_papers(self):
         """重複ペーパーでのビルドテスト"""
         mock_paper1 = Mock()
         mock_paper1.id = "paper1"
@@ -255,31 +257,34 @@ class TestBuildIndexFromQueries:
                 mock_index.papers_with_embeddings = [1, 2]
                 mock_index_class.return_value = mock_index
 
-                result = _build_index_from_queries(["query1"], 5)
+                result = await _build_index_from_queries(["query1"], 5)
 
                 assert result is mock_index
                 called_papers = mock_index.build.call_args[0][0]
                 assert len(called_papers) == 2  # 重複が排除されている
 
-    def test_build_with_no_papers(self):
+    @pytest.mark.asyncio
+    async def test_build_with_no_papers(self):
         """ペーパーが取得できない場合のテスト"""
         with patch("api.core.rag_index.search_arxiv_papers") as mock_search:
             mock_search.return_value = []
 
-            result = _build_index_from_queries(["query1"], 5)
+            result = await _build_index_from_queries(["query1"], 5)
 
             assert result is None
 
-    def test_build_with_search_failure(self):
+    @pytest.mark.asyncio
+    async def test_build_with_search_failure(self):
         """検索が失敗する場合のテスト"""
         with patch("api.core.rag_index.search_arxiv_papers") as mock_search:
             mock_search.side_effect = Exception("Search failed")
 
-            result = _build_index_from_queries(["query1"], 5)
+            result = await _build_index_from_queries(["query1"], 5)
 
             assert result is None
 
-    def test_build_with_mixed_results(self):
+    @pytest.mark.asyncio
+    async def test_build_with_mixed_results(self):
         """一部のクエリが成功、一部が失敗する場合のテスト"""
         mock_paper1 = Mock()
         mock_paper1.id = "paper1"
@@ -298,8 +303,66 @@ class TestBuildIndexFromQueries:
                 mock_index.papers_with_embeddings = [1]
                 mock_index_class.return_value = mock_index
 
-                result = _build_index_from_queries(["success_query", "fail_query"], 5)
+                result = await _build_index_from_queries(["success_query", "fail_query"], 5)
 
                 assert result is mock_index
                 called_papers = mock_index.build.call_args[0][0]
                 assert len(called_papers) == 1
+
+    @pytest.mark.asyncio
+    async def test_build_runs_queries_concurrently(self):
+        """複数クエリが並列に検索されることのテスト"""
+        import threading
+
+        # 2件の検索が同時に走らないと Barrier を通過できない
+        barrier = threading.Barrier(2, timeout=5)
+        mock_paper1 = Mock()
+        mock_paper1.id = "paper1"
+
+        def mock_search_side_effect(query, max_results):
+            barrier.wait()
+            return [mock_paper1]
+
+        with patch("api.core.rag_index.search_arxiv_papers") as mock_search:
+            mock_search.side_effect = mock_search_side_effect
+
+            with patch("api.core.rag_index.InMemoryIndex") as mock_index_class:
+                mock_index = Mock(spec=InMemoryIndex)
+                mock_index.papers_with_embeddings = [1]
+                mock_index_class.return_value = mock_index
+
+                result = await _build_index_from_queries(["query1", "query2"], 5)
+
+                assert result is mock_index
+                assert mock_search.call_count == 2
+                called_papers = mock_index.build.call_args[0][0]
+                assert len(called_papers) == 1
+
+    @pytest.mark.asyncio
+    async def test_build_stops_at_max_papers(self):
+        """上限件数に達したら残りのクエリを実行しないことのテスト"""
+
+        def mock_search_side_effect(query, max_results):
+            papers = []
+            for i in range(3):
+                paper = Mock()
+                paper.id = f"{query}-{i}"
+                papers.append(paper)
+            return papers
+
+        queries = [f"query{i}" for i in range(8)]
+        with patch("api.core.rag_index.search_arxiv_papers") as mock_search:
+            mock_search.side_effect = mock_search_side_effect
+
+            with patch("api.core.rag_index.InMemoryIndex") as mock_index_class:
+                mock_index = Mock(spec=InMemoryIndex)
+                mock_index.papers_with_embeddings = [1, 2]
+                mock_index_class.return_value = mock_index
+
+                result = await _build_index_from_queries(queries, 5, max_papers=2)
+
+                assert result is mock_index
+                # 同時実行数を超える後続のクエリは開始前に打ち切られる
+                assert mock_search.call_count < len(queries)
+                called_papers = mock_index.build.call_args[0][0]
+                assert len(called_papers) == 2
@@ -0,0 +1,90 @@
+"""設定（load_settings）のテスト"""
+
+from importlib import reload
+
+import pytest
+
+import src.config
+from src.config import load_settings
+
+NUMERIC_VARS = (
+    "TOP_K",
+    "SUPPORT_THRESHOLD",
+    "MAX_OUTPUT_CHARS",
+    "GRAPH_RECURSION_LIMIT",
+    "ARXIV_CACHE_TTL",
+    "LLM_CACHE_TTL",
+    "TRANSLATE_MAX_INFLIGHT",
+)
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    for name in NUMERIC_VARS + ("EMBEDDING_QUANTIZATION",):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+class TestLoadSettings:
+    """環境変数から設定を読み込む処理のテスト"""
+
+    def test_defaults(self, clean_env):
+        settings = load_settings()
+
+        assert settings.top_k == 5
+        assert settings.support_threshold == 0.35
+        assert settings.max_output_chars == 1400
+        assert settings.graph_recursion_limit == 10
+        assert settings.embedding_quantization == "none"
+        assert settings.arxiv_cache_ttl == 3600.0
+        assert settings.llm_cache_ttl == 3600.0
+        assert settings.translate_max_inflight == 8
+
+    def test_valid_values(self, clean_env):
+        clean_env.setenv("TOP_K", "8")
+        clean_env.setenv("SUPPORT_THRESHOLD", "0.5")
+        clean_env.setenv("MAX_OUTPUT_CHARS", "2000")
+
+        settings = load_settings()
+
+        assert settings.top_k == 8
+        assert settings.support_threshold == 0.5
+        assert settings.max_output_chars == 2000
+
+    @pytest.mark.parametrize("value", ["abc", "", "1.5.2"])
+    def test_invalid_values_fall_back_to_defaults(self, clean_env, value):
+        for name in NUMERIC_VARS:
+            clean_env.setenv(name, value)
+
+        settings = load_settings()
+
+        assert settings.top_k == 5
+        assert settings.support_threshold == 0.35
+        assert settings.max_output_chars == 1400
+        assert settings.graph_recursion_limit == 10
+        assert settings.arxiv_cache_ttl == 3600.0
+        assert settings.llm_cache_ttl == 3600.0
+        assert settings.translate_max_inflight == 8
+
+    def test_non_positive_counts_fall_back_to_defaults(self, clean_env):
+        clean_env.setenv("TOP_K", "0")
+        clean_env.setenv("MAX_OUTPUT_CHARS", "-1")
+
+        settings = load_settings()
+
+        assert settings.top_k == 5
+        assert settings.max_output_chars == 1400
+
+    def test_reload_with_invalid_value_does_not_raise(self, clean_env):
+        """不正な値があってもモジュールの読み込み自体は失敗しない"""
+        clean_env.setenv("TOP_K", "five")
+        try:
+            reload(src.config)
+            assert src.config.get_top_k() == 5
+
+            clean_env.setenv("TOP_K", "7")
+            reload(src.config)
+            assert src.config.get_top_k() == 7
+        finally:
+            clean_env.delenv("TOP_K")
+            reload(src.config)
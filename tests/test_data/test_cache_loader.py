@@ -0,0 +1,193 @@
+"""事前計算キャッシュ読み込み（cache_loader）のテスト"""
+
+import gzip
+import logging
+import os
+import pickle
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from src.data import cache_loader
+from src.models import Paper
+from src.retrieval.inmemory import InMemoryIndex
+
+N_PAPERS = 20
+DIM = 8
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """空のキャッシュディレクトリ（メモ化された結果もリセットする）"""
+    monkeypatch.setattr(cache_loader, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(cache_loader, "_loaded", None)
+    return tmp_path
+
+
+@pytest.fixture
+def papers():
+    return [
+        Paper(id=str(i), title=f"t{i}", link=f"l{i}", summary=f"s{i}")
+        for i in range(N_PAPERS)
+    ]
+
+
+@pytest.fixture
+def embeddings():
+    return np.random.default_rng(0).standard_normal((N_PAPERS, DIM)).astype(np.float32)
+
+
+def _papers_json(papers) -> bytes:
+    return ("[" + ",".join(p.model_dump_json() for p in papers) + "]").encode()
+
+
+def _write_npy_cache(data_dir, papers, embeddings):
+    (data_dir / cache_loader.PAPERS_FILENAME).write_bytes(_papers_json(papers))
+    np.save(data_dir / cache_loader.EMBEDDINGS_FILENAME, embeddings)
+
+
+def _bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestCacheFormats:
+    """各形式のキャッシュを読み込めることのテスト"""
+
+    def test_npy_cache(self, cache_dir, papers, embeddings):
+        _write_npy_cache(cache_dir, papers, embeddings)
+
+        index = cache_loader.load_precomputed_cache()
+
+        assert [p.id for p, _ in index.papers_with_embeddings] == [p.id for p in papers]
+        np.testing.assert_array_equal(index.embeddings, embeddings)
+
+    def test_gzipped_papers(self, cache_dir, papers, embeddings):
+        (cache_dir / cache_loader.COMPRESSED_PAPERS_FILENAME).write_bytes(
+            gzip.compress(_papers_json(papers))
+        )
+        np.save(cache_dir / cache_loader.EMBEDDINGS_FILENAME, embeddings)
+
+        index = cache_loader.load_precomputed_cache()
+
+        assert len(index.papers_with_embeddings) == N_PAPERS
+
+    def test_blosc2_embeddings(self, cache_dir, papers, embeddings):
+        blosc2 = pytest.importorskip("blosc2")
+        (cache_dir / cache_loader.PAPERS_FILENAME).write_bytes(_papers_json(papers))
+        blosc2.asarray(
+            embeddings,
+            urlpath=str(cache_dir / cache_loader.COMPRESSED_EMBEDDINGS_FILENAME),
+            mode="w",
+        )
+
+        index = cache_loader.load_precomputed_cache()
+
+        np.testing.assert_array_equal(index.embeddings, embeddings)
+
+    @pytest.mark.parametrize("protocol", [2, pickle.HIGHEST_PROTOCOL])
+    def test_legacy_pickle_is_stacked(
+        self, cache_dir, papers, embeddings, caplog, protocol
+    ):
+        (cache_dir / cache_loader.PAPERS_FILENAME).write_bytes(_papers_json(papers))
+        with open(cache_dir / cache_loader.LEGACY_EMBEDDINGS_FILENAME, "wb") as f:
+            pickle.dump(list(zip(papers, embeddings)), f, protocol=protocol)
+
+        with caplog.at_level(logging.WARNING, logger=cache_loader.__name__):
+            index = cache_loader.load_precomputed_cache()
+
+        # 1つの連続した行列にまとめられる
+        assert index.embeddings.shape == (N_PAPERS, DIM)
+        np.testing.assert_allclose(index.embeddings, embeddings)
+        # プロトコル4未満のときだけ再作成を促す警告を出す
+        warned = any("pickle protocol" in r.getMessage() for r in caplog.records)
+        assert warned == (protocol < 4)
+
+
+class TestLoadMemo:
+    """読み込み結果のメモ化のテスト"""
+
+    def test_same_index_until_mtime_changes(self, cache_dir, papers, embeddings):
+        _write_npy_cache(cache_dir, papers, embeddings)
+
+        first = cache_loader.load_precomputed_cache()
+        assert cache_loader.load_precomputed_cache() is first
+
+        _bump_mtime(cache_dir / cache_loader.EMBEDDINGS_FILENAME)
+        reloaded = cache_loader.load_precomputed_cache()
+        assert reloaded is not first
+        assert cache_loader.load_precomputed_cache() is reloaded
+
+    def test_failures_are_not_memoized(self, cache_dir, papers, embeddings):
+        (cache_dir / cache_loader.PAPERS_FILENAME).write_bytes(b"not json")
+        np.save(cache_dir / cache_loader.EMBEDDINGS_FILENAME, embeddings)
+
+        assert cache_loader.load_precomputed_cache() is None
+        assert cache_loader._loaded is None
+
+        (cache_dir / cache_loader.PAPERS_FILENAME).write_bytes(_papers_json(papers))
+        assert cache_loader.load_precomputed_cache() is not None
+
+    def test_missing_files_return_none(self, cache_dir):
+        assert cache_loader.load_precomputed_cache() is None
+        assert not cache_loader.cache_exists()
+
+
+class TestOptionalArtifacts:
+    """同梱の量子化コピー・HNSW グラフの扱いのテスト"""
+
+    def _save_quantized(self, cache_dir, papers, embeddings, mode):
+        index = InMemoryIndex()
+        index.set_embeddings(papers, embeddings)
+        index.quantize(mode)
+        index.save_quantized(cache_dir / cache_loader.QUANTIZED_FILENAME)
+
+    @pytest.mark.parametrize(
+        "configured, expected", [("int8", "int8"), ("binary", "none"), ("none", "none")]
+    )
+    def test_quantized_copy_only_for_configured_mode(
+        self, cache_dir, papers, embeddings, configured, expected
+    ):
+        _write_npy_cache(cache_dir, papers, embeddings)
+        self._save_quantized(cache_dir, papers, embeddings, "int8")
+
+        with patch.object(
+            cache_loader, "get_embedding_quantization", return_value=configured
+        ):
+            index = cache_loader.load_precomputed_cache()
+
+        assert index.quantization == expected
+        assert index.is_quantized("int8") == (expected == "int8")
+
+    def test_mismatched_quantized_copy_is_skipped(self, cache_dir, papers, embeddings):
+        _write_npy_cache(cache_dir, papers, embeddings)
+        self._save_quantized(cache_dir, papers[:5], embeddings[:5], "int8")
+
+        with patch.object(
+            cache_loader, "get_embedding_quantization", return_value="int8"
+        ):
+            index = cache_loader.load_precomputed_cache()
+
+        assert len(index.papers_with_embeddings) == N_PAPERS
+        assert not index.is_quantized("int8")
+
+    @pytest.mark.parametrize(
+        "enabled, rows, expected",
+        [(True, N_PAPERS, True), (True, 5, False), (False, N_PAPERS, False)],
+    )
+    def test_hnsw_graph_only_when_enabled_and_matching(
+        self, cache_dir, papers, embeddings, enabled, rows, expected
+    ):
+        pytest.importorskip("hnswlib")
+        _write_npy_cache(cache_dir, papers, embeddings)
+        index = InMemoryIndex()
+        index.set_embeddings(papers[:rows], embeddings[:rows])
+        index.build_ann_index()
+        index.save_ann_index(cache_dir / cache_loader.ANN_INDEX_FILENAME)
+
+        with patch.object(cache_loader, "use_ann_index", return_value=enabled):
+            loaded = cache_loader.load_precomputed_cache()
+
+        assert len(loaded.papers_with_embeddings) == N_PAPERS
+        assert loaded.has_ann_index() == expected
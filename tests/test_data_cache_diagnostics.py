@@ -3,8 +3,8 @@ Diagnostics tests for cache loading issues in CloudRun.
 """
 
 import pytest
-import pickle
 import json
+import numpy as np
 from pathlib import Path
 
 from src.data.cache_loader import load_precomputed_cache, cache_exists
@@ -18,7 +18,7 @@ class TestCacheDiagnostics:
         """Test that cache files exist and are accessible."""
         data_dir = Path(__file__).parent.parent / "src" / "data"
         papers_file = data_dir / "precomputed_papers.json"
-        embeddings_file = data_dir / "precomputed_embeddings.pkl"
+        embeddings_file = data_dir / "precomputed_embeddings.npy"
 
         print(f"📂 Data directory: {data_dir}")
         print(f"📂 Papers file: {papers_file}")
@@ -61,34 +61,26 @@ class TestCacheDiagnostics:
 
         print(f"✅ Successfully loaded {len(papers_data)} papers from JSON")
 
-    def test_embeddings_pickle_loading(self):
-        """Test embeddings pickle file can be loaded correctly."""
+    def test_embeddings_npy_loading(self):
+        """Test embeddings matrix can be loaded and matches the papers JSON."""
         data_dir = Path(__file__).parent.parent / "src" / "data"
-        embeddings_file = data_dir / "precomputed_embeddings.pkl"
-
-        with open(embeddings_file, "rb") as f:
-            embeddings_data = pickle.load(f)
-
-        assert isinstance(embeddings_data, list), "Embeddings data should be a list"
-        assert len(embeddings_data) > 0, "Embeddings data should not be empty"
-
-        # Test first embedding structure (it's a tuple of (Paper, numpy.ndarray))
-        first_embedding = embeddings_data[0]
-        assert isinstance(first_embedding, tuple), "Embedding should be a tuple"
-        assert len(first_embedding) == 2, "Embedding tuple should have 2 elements"
+        papers_file = data_dir / "precomputed_papers.json"
+        embeddings_file = data_dir / "precomputed_embeddings.npy"
 
-        paper, embedding_vector = first_embedding
-        assert hasattr(paper, "id"), "Paper should have id attribute"
+        embeddings = np.load(embeddings_file, mmap_mode="r")
 
-        # Test embedding vector
-        import numpy as np
+        assert embeddings.ndim == 2, "Embeddings should be an (N, dim) matrix"
+        assert embeddings.dtype == np.float32, "Embeddings should be float32"
+        assert embeddings.shape[0] > 0, "Embeddings should not be empty"
 
-        assert isinstance(
-            embedding_vector, np.ndarray
-        ), "Embedding should be numpy array"
-        assert embedding_vector.size > 0, "Embedding vector should not be empty"
+        # Rows are aligned with the papers JSON by position
+        with open(papers_file, "r", encoding="utf-8") as f:
+            papers_data = json.load(f)
+        assert embeddings.shape[0] == len(
+            papers_data
+        ), "Embedding rows should match the number of papers"
 
-        print(f"✅ Successfully loaded {len(embeddings_data)} embeddings from pickle")
+        print(f"✅ Successfully loaded {embeddings.shape[0]} embeddings from npy")
 
     def test_cache_loader_function(self):
         """Test the complete cache loading function."""
@@ -119,41 +111,23 @@ class TestCacheDiagnostics:
     def test_embedding_data_integrity(self):
         """Test that embedding data is not corrupted."""
         data_dir = Path(__file__).parent.parent / "src" / "data"
-        embeddings_file = data_dir / "precomputed_embeddings.pkl"
+        embeddings_file = data_dir / "precomputed_embeddings.npy"
 
         try:
-            with open(embeddings_file, "rb") as f:
-                # Try to load and verify structure
-                embeddings_data = pickle.load(f)
-
-                if len(embeddings_data) > 0:
-                    first_item = embeddings_data[0]
-
-                    # Check tuple structure (Paper, numpy.ndarray)
-                    assert isinstance(
-                        first_item, tuple
-                    ), "Embedding item should be a tuple"
-                    assert (
-                        len(first_item) == 2
-                    ), "Embedding tuple should have 2 elements"
-
-                    paper, embedding = first_item
-                    assert hasattr(paper, "id"), "Paper should have id attribute"
-
-                    # Check embedding vector
-                    import numpy as np
-
-                    assert isinstance(
-                        embedding, np.ndarray
-                    ), "Embedding should be numpy array"
-                    assert embedding.shape[0] > 0, "Embedding should have dimensions"
-                    assert not np.isnan(
-                        embedding
-                    ).any(), "Embedding should not contain NaN values"
-
-                    print("✅ Embedding data integrity check passed")
-                    print(f"📊 Embedding vector shape: {embedding.shape}")
-                    print(f"📊 Sample embedding values: {embedding[:5]}")
+            embeddings = np.load(embeddings_file, mmap_mode="r")
+
+            if embeddings.shape[0] > 0:
+                embedding = embeddings[0]
+
+                # Check embedding vector
+                assert embedding.shape[0] > 0, "Embedding should have dimensions"
+                assert not np.isnan(
+                    embeddings
+                ).any(), "Embedding should not contain NaN values"
+
+                print("✅ Embedding data integrity check passed")
+                print(f"📊 Embedding matrix shape: {embeddings.shape}")
+                print(f"📊 Sample embedding values: {embedding[:5]}")
 
         except Exception as e:
             pytest.fail(f"Embedding data integrity check failed: {e}")
@@ -1,9 +1,17 @@
 """Tests for content enhancement workflow."""
 
 import pytest
+from unittest.mock import patch
 
 from src.models import AnswerResult, CornellNote, QuizItem, QuizOption
-from src.graphs.content_enhancement import enhance_answer_content
+from src.graphs.content_enhancement import (
+    ContentEnhancementState,
+    _Enhancement,
+    _enhancement_prompt,
+    create_content_enhancement_graph,
+    a_enhance_answer_content,
+    enhance_answer_content,
+)
 
 
 class TestContentEnhancement:
@@ -96,6 +104,153 @@ class TestContentEnhancementNodes:
         assert quiz.options[0].text == "Option A"
 
 
+class TestCombinedEnhancement:
+    """Cornell Note and Quiz come from a single structured LLM request."""
+
+    @staticmethod
+    def _fake_generate(prompt, schema, question=None):
+        options = [QuizOption(id=i, text=i) for i in "ABCD"]
+        return _Enhancement(
+            cornell_note=CornellNote(cue="cue", notes="notes", summary="summary"),
+            quiz_items=[
+                QuizItem(question="q?", options=options, correct_answer="A"),
+                # Malformed: only two options, dropped
+                QuizItem(question="bad", options=options[:2], correct_answer="a"),
+            ],
+        )
+
+    CITATIONS = [{"title": "Paper", "link": "https://arxiv.org/abs/1"}]
+
+    def _run(self, citations=CITATIONS):
+        state = ContentEnhancementState(
+            question="q",
+            answer_text="a",
+            citations=citations,
+            support=0.5,
+            attempts=[],
+        )
+        return create_content_enhancement_graph().invoke(state)
+
+    def test_one_request_fills_both_fields(self):
+        """Test that a single LLM call produces both the note and the quiz."""
+        with patch(
+            "src.graphs.content_enhancement.generate_structured",
+            side_effect=self._fake_generate,
+        ) as generate:
+            final_state = self._run()
+
+        assert generate.call_count == 1
+        assert final_state["cornell_note"].cue == "cue"
+        assert len(final_state["quiz_items"]) == 1
+        assert final_state["quiz_items"][0].correct_answer == "a"
+        assert [o.id for o in final_state["quiz_items"][0].options] == list("abcd")
+        assert final_state["enhanced_result"] is not None
+        assert final_state.get("error") is None
+
+    def test_failure_is_reported(self):
+        """Test that a failed request is recorded as an error."""
+        with patch(
+            "src.graphs.content_enhancement.generate_structured",
+            side_effect=RuntimeError("boom"),
+        ):
+            final_state = self._run()
+
+        assert "Cornell Note/Quiz generation failed" in final_state["error"]
+        assert final_state.get("cornell_note") is None
+
+    def test_prompt_prefix_is_shared(self):
+        """Per-call content goes after the static instructions."""
+        first = _enhancement_prompt(
+            {"question": "q1", "answer_text": "a1", "citations": []}
+        )
+        second = _enhancement_prompt(
+            {
+                "question": "q2",
+                "answer_text": "a2",
+                "citations": [{"title": "T", "link": "http://x"}],
+            }
+        )
+
+        prefix = first[: first.index("CITATIONS (use exactly")]
+        assert second.startswith(prefix)
+        assert "q1" not in prefix and "a1" not in prefix
+
+    async def test_async_enhancement_uses_async_node(self):
+        """Test that a_enhance_answer_content awaits the async node."""
+        result = AnswerResult(
+            text="a", citations=self.CITATIONS, support=0.5, attempts=[]
+        )
+        with (
+            patch(
+                "src.graphs.content_enhancement.get_openai_api_key_safe",
+                return_value="key",
+            ),
+            patch(
+                "src.graphs.content_enhancement.a_generate_structured",
+                side_effect=self._fake_generate,
+            ),
+            patch(
+                "src.graphs.content_enhancement.generate_structured",
+                side_effect=AssertionError("sync path used"),
+            ),
+        ):
+            enhanced = await a_enhance_answer_content(result, "q")
+
+        assert enhanced.cornell_note.cue == "cue"
+        assert len(enhanced.quiz_items) == 1
+
+    def test_ungrounded_answer_skips_llm(self):
+        """Answers without citations never reach the LLM."""
+        with patch(
+            "src.graphs.content_enhancement.generate_structured",
+            side_effect=AssertionError("LLM called"),
+        ):
+            final_state = self._run(citations=[])
+
+        assert final_state.get("cornell_note") is None
+        assert final_state.get("error") is None
+
+    def test_error_result_skips_graph(self):
+        """Error results from the RAG pipeline are returned unenhanced."""
+        result = AnswerResult(
+            text="ベースライン検索中にエラーが発生しました: boom",
+            citations=[],
+            support=0.0,
+            attempts=[],
+        )
+        with patch(
+            "src.graphs.content_enhancement._enhancement_graph"
+        ) as get_graph:
+            enhanced = enhance_answer_content(result, "q")
+
+        get_graph.assert_not_called()
+        assert enhanced.text == result.text
+        assert enhanced.quiz_items == []
+
+    def test_missing_api_key_skips_graph(self):
+        """Test that the key is checked once, before any node runs."""
+        result = AnswerResult(
+            text="a",
+            citations=self.CITATIONS,
+            support=0.5,
+            attempts=[],
+            metadata={"k": 1},
+        )
+        with (
+            patch(
+                "src.graphs.content_enhancement.get_openai_api_key_safe",
+                return_value=None,
+            ),
+            patch("src.graphs.content_enhancement._enhancement_graph") as get_graph,
+        ):
+            enhanced = enhance_answer_content(result, "q")
+
+        get_graph.assert_not_called()
+        assert enhanced.cornell_note is None
+        assert enhanced.quiz_items == []
+        assert enhanced.metadata == {"k": 1}
+
+
 # Integration test (requires OpenAI API key)
 @pytest.mark.integration
 class TestContentEnhancementIntegration:
@@ -1,8 +1,16 @@
 """Tests for corrective RAG workflow."""
 
+import threading
+import time
+
 import pytest
+from unittest.mock import patch
 
-from src.models import AnswerResult
+from src.graphs.corrective_rag import (
+    answer_many_with_correction,
+    answer_with_correction_graph,
+)
+from src.models import AnswerResult, RetrievalResult
 from src.retrieval.inmemory import InMemoryIndex
 from src.models import Paper
 
@@ -99,6 +107,146 @@ class TestCorrectiveRAGWorkflow:
             pytest.skip("LangGraph not available")
 
 
+class TestSpeculativeHyde:
+    """HyDE is generated alongside baseline retrieval."""
+
+    @staticmethod
+    def _fake_retrieve(question, index):
+        support = 0.9 if question == "good" or question.startswith("hyde") else 0.1
+        return RetrievalResult(query=question, contexts=[], support=support)
+
+    @staticmethod
+    def _fake_generate(retrieval):
+        return AnswerResult(
+            text=f"answer to {retrieval.query}",
+            citations=[],
+            support=retrieval.support,
+            attempts=[],
+        )
+
+    def _run(self, question, hyde):
+        with (
+            patch(
+                "src.graphs.corrective_rag.use_speculative_hyde", return_value=True
+            ),
+            patch(
+                "src.graphs.corrective_rag.baseline_retrieve",
+                side_effect=self._fake_retrieve,
+            ),
+            patch(
+                "src.graphs.corrective_rag.baseline_generate",
+                side_effect=self._fake_generate,
+            ) as generate,
+            patch("src.graphs.corrective_rag.hyde_rewrite", side_effect=hyde) as rw,
+        ):
+            result = answer_with_correction_graph(question, theta=0.5, index=object())
+        self.generated = [c.args[0].query for c in generate.call_args_list]
+        return result, rw
+
+    def test_low_support_uses_speculative_query(self):
+        """The speculative query feeds enhanced retrieval without a second call."""
+        result, rewrite = self._run("bad", lambda q: f"hyde {q}")
+
+        assert rewrite.call_count == 1
+        assert result.text == "answer to hyde bad"
+        # The rejected baseline retrieval never reaches generation
+        assert self.generated == ["hyde bad"]
+        assert result.metadata["enhanced_support"] == 0.9
+        # Each node's attempts are appended exactly once
+        assert [a["type"] for a in result.attempts] == ["baseline", "baseline", "hyde"]
+        assert result.attempts[-1]["query"] == "hyde bad"
+
+    def test_high_support_ignores_speculative_query(self):
+        """A sufficient baseline answer is returned as is."""
+        result, _ = self._run("good", lambda q: f"hyde {q}")
+
+        assert result.text == "answer to good"
+        assert result.metadata["enhanced_support"] is None
+
+    def test_failed_speculation_is_retried(self):
+        """HyDE is retried when the speculative rewrite failed."""
+        calls = []
+
+        def flaky(question):
+            calls.append(question)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return f"hyde {question}"
+
+        result, _ = self._run("bad", flaky)
+
+        assert len(calls) == 2
+        assert result.text == "answer to hyde bad"
+
+
+class TestAnswerManyWithCorrection:
+    """Test the throttled batch entry point."""
+
+    async def test_results_keep_question_order(self):
+        """Results line up with the input questions."""
+
+        def fake_answer(question, theta=None, index=None):
+            # Later questions finish first
+            time.sleep(0.01 * (3 - int(question)))
+            return AnswerResult(text=question, citations=[], support=1.0, attempts=[])
+
+        with patch(
+            "src.graphs.corrective_rag.answer_with_correction_graph",
+            side_effect=fake_answer,
+        ):
+            results = await answer_many_with_correction(["0", "1", "2"], rpm=0)
+
+        assert [r.text for r in results] == ["0", "1", "2"]
+
+    async def test_concurrency_is_capped(self):
+        """No more than max_concurrency questions run at once."""
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def fake_answer(question, theta=None, index=None):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return AnswerResult(text=question, citations=[], support=1.0, attempts=[])
+
+        progress = []
+        with patch(
+            "src.graphs.corrective_rag.answer_with_correction_graph",
+            side_effect=fake_answer,
+        ):
+            await answer_many_with_correction(
+                [str(i) for i in range(6)],
+                max_concurrency=2,
+                rpm=0,
+                on_progress=lambda done, total: progress.append((done, total)),
+            )
+
+        assert peak == 2
+        assert progress == [(i, 6) for i in range(1, 7)]
+
+    async def test_starts_are_throttled(self):
+        """Question starts are spaced out to respect rpm."""
+        starts = []
+
+        def fake_answer(question, theta=None, index=None):
+            starts.append(time.monotonic())
+            return AnswerResult(text=question, citations=[], support=1.0, attempts=[])
+
+        with patch(
+            "src.graphs.corrective_rag.answer_with_correction_graph",
+            side_effect=fake_answer,
+        ):
+            # 1200 rpm -> one start every 50ms
+            await answer_many_with_correction(["a", "b", "c"], rpm=1200)
+
+        starts.sort()
+        assert starts[-1] - starts[0] >= 0.09
+
 # Integration test (requires OpenAI API key)
 @pytest.mark.integration
 class TestCorrectiveRAGIntegration:
@@ -0,0 +1,63 @@
+"""Tests for the streaming message routing workflow."""
+
+from unittest.mock import patch
+
+from src.models import AnswerResult, EnhancedAnswerResult
+from src.graphs.message_routing import (
+    astream_message_with_routing,
+    process_message_with_routing,
+)
+
+
+class TestStreamMessageRouting:
+    """Test astream_message_with_routing."""
+
+    async def test_arxiv_stream_matches_invoke(self):
+        """Streaming yields the same response as the blocking workflow."""
+        results = [{"title": "Paper", "link": "https://arxiv.org/abs/1", "pdf": ""}]
+        with patch(
+            "src.graphs.message_routing.run_arxiv_search", return_value=results
+        ):
+            chunks = [c async for c in astream_message_with_routing("arxiv: llm")]
+            expected = process_message_with_routing("arxiv: llm")
+
+        assert "".join(chunks) == expected
+        assert "[Paper](https://arxiv.org/abs/1)" in expected
+
+    async def test_rag_without_index(self):
+        """RAG questions without an index still produce a response."""
+        chunks = [c async for c in astream_message_with_routing("What is BERT?")]
+        assert chunks == ["回答の生成に失敗しました。"]
+
+    async def test_rag_stream_awaits_async_enhancement(self):
+        """Streaming RAG questions use the async enhancement path."""
+        basic = AnswerResult(
+            text="BERT is a model.", citations=[], support=0.9, attempts=[]
+        )
+
+        async def fake_enhance(result, question):
+            return EnhancedAnswerResult(**result.model_dump(), quiz_items=[])
+
+        with (
+            patch(
+                "src.graphs.message_routing.answer_with_correction_graph",
+                return_value=basic,
+            ),
+            patch(
+                "src.graphs.content_enhancement.a_enhance_answer_content",
+                side_effect=fake_enhance,
+            ) as a_enhance,
+            patch(
+                "src.graphs.content_enhancement.enhance_answer_content",
+                side_effect=AssertionError("sync path used"),
+            ),
+        ):
+            chunks = [
+                c
+                async for c in astream_message_with_routing(
+                    "What is BERT?", rag_index=object()
+                )
+            ]
+
+        a_enhance.assert_called_once()
+        assert "BERT is a model." in "".join(chunks)
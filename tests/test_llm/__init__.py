@@ -0,0 +1 @@
+# Test llm package
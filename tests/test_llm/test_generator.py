@@ -0,0 +1,99 @@
+"""Tests for the LLM response cache in the generator."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.llm import generator
+from src.models import CornellNote
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    generator._response_cache.clear()
+    yield
+    generator._response_cache.clear()
+
+
+def _fake_llm(content="answer"):
+    llm = MagicMock()
+    llm.invoke.return_value = MagicMock(content=f"  {content}  ")
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content=content))
+    return llm
+
+
+class TestResponseCache:
+    """Identical prompts are answered from the cache."""
+
+    def test_identical_prompt_hits_cache(self):
+        """Test that the second identical call skips the LLM."""
+        llm = _fake_llm()
+        with patch("src.llm.generator._build_llm", return_value=llm):
+            assert generator.generate_answer("p") == "answer"
+            assert generator.generate_answer("p") == "answer"
+
+        assert llm.invoke.call_count == 1
+
+    def test_different_prompt_misses_cache(self):
+        """Test that a different prompt goes to the LLM."""
+        llm = _fake_llm()
+        with patch("src.llm.generator._build_llm", return_value=llm):
+            generator.generate_answer("p1")
+            generator.generate_answer("p2")
+
+        assert llm.invoke.call_count == 2
+
+    async def test_async_shares_cache_with_sync(self):
+        """Test that the async variant reuses a sync response."""
+        llm = _fake_llm()
+        with patch("src.llm.generator._build_llm", return_value=llm):
+            generator.generate_answer("p")
+            assert await generator.a_generate_answer("p") == "answer"
+
+        llm.ainvoke.assert_not_called()
+
+    async def test_rejected_response_is_not_cached(self):
+        """Test that a response failing the caller's check is fetched again."""
+        llm = _fake_llm("not json")
+
+        def reject(answer):
+            raise ValueError("unexpected reply")
+
+        with patch("src.llm.generator._build_llm", return_value=llm):
+            for _ in range(2):
+                with pytest.raises(Exception, match="unexpected reply"):
+                    generator.generate_answer("p", validate=reject)
+                with pytest.raises(Exception, match="unexpected reply"):
+                    await generator.a_generate_answer("p", validate=reject)
+            # A passing check caches the response as usual
+            assert generator.generate_answer("p", validate=len) == "not json"
+            assert generator.generate_answer("p") == "not json"
+
+        assert llm.invoke.call_count == 3
+        assert llm.ainvoke.call_count == 2
+
+    def test_structured_hits_return_copies(self):
+        """Test that cached models are copied, not shared."""
+        note = CornellNote(cue="cue", notes="notes", summary="summary")
+        structured = MagicMock()
+        structured.invoke.return_value = note
+        llm = MagicMock()
+        llm.with_structured_output.return_value = structured
+        with patch("src.llm.generator._build_llm", return_value=llm):
+            first = generator.generate_structured("p", CornellNote)
+            first.cue = "changed"
+            second = generator.generate_structured("p", CornellNote)
+
+        assert structured.invoke.call_count == 1
+        assert second.cue == "cue"
+
+    def test_zero_ttl_disables_cache(self):
+        """Test that LLM_CACHE_TTL=0 always calls the LLM."""
+        llm = _fake_llm()
+        with (
+            patch.object(generator._response_cache, "ttl", 0),
+            patch("src.llm.generator._build_llm", return_value=llm),
+        ):
+            generator.generate_answer("p")
+            generator.generate_answer("p")
+
+        assert llm.invoke.call_count == 2
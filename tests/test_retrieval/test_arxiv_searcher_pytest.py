@@ -2,7 +2,7 @@
 
 import pytest
 from unittest.mock import patch, Mock
-from src.retrieval.arxiv_searcher import run_arxiv_search
+from src.retrieval.arxiv_searcher import fetch_arxiv_paper, run_arxiv_search
 
 
 class TestArxivSearcherPytest:
@@ -208,3 +208,45 @@ class TestArxivSearcherPytest:
         # 全ての必要なキーが存在することを確認
         expected_keys = {"id", "title", "link", "pdf"}
         assert set(paper.keys()) == expected_keys
+
+    @patch("src.retrieval.arxiv_searcher.feedparser.parse")
+    def test_fetch_arxiv_paper(self, mock_parse):
+        """ID指定での単一論文取得のテスト"""
+        mock_entry = Mock(spec=["id", "title", "link", "links", "summary"])
+        mock_entry.id = "http://arxiv.org/abs/1706.03762v7"
+        mock_entry.title = " Attention Is All You Need "
+        mock_entry.link = "http://arxiv.org/abs/1706.03762v7"
+        mock_entry.summary = "The dominant sequence transduction models..."
+        mock_entry.links = [
+            Mock(type="application/pdf", href="http://arxiv.org/pdf/1706.03762v7"),
+        ]
+        mock_parse.return_value = Mock(entries=[mock_entry])
+
+        paper = fetch_arxiv_paper("1706.03762")
+
+        assert "id%3A1706.03762" in mock_parse.call_args[0][0]
+        assert paper.id == "1706.03762"
+        assert paper.title == "Attention Is All You Need"
+        assert paper.pdf == "http://arxiv.org/pdf/1706.03762v7"
+
+    @patch("src.retrieval.arxiv_searcher.feedparser.parse")
+    def test_fetch_arxiv_paper_not_found(self, mock_parse):
+        """該当する論文がない場合はNoneを返すことのテスト"""
+        mock_parse.return_value = Mock(entries=[], bozo=False, status=200)
+
+        assert fetch_arxiv_paper("0000.00000") is None
+
+    @pytest.mark.parametrize(
+        "feed",
+        [
+            Mock(entries=[], bozo=True, bozo_exception=OSError("refused")),
+            Mock(entries=[], bozo=False, status=503),
+        ],
+    )
+    @patch("src.retrieval.arxiv_searcher.feedparser.parse")
+    def test_fetch_arxiv_paper_request_failure(self, mock_parse, feed):
+        """通信エラーやHTTPエラーは「見つからない」ではなく例外にすることのテスト"""
+        mock_parse.return_value = feed
+
+        with pytest.raises(RuntimeError):
+            fetch_arxiv_paper("1706.03762")
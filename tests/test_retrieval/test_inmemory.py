@@ -0,0 +1,186 @@
+"""InMemoryIndexのテスト"""
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from src.models import Paper
+from src.retrieval.inmemory import InMemoryIndex
+
+
+@pytest.fixture
+def clustered_index_data():
+    """クラスタ構造を持つ埋め込みとクエリ"""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((10, 256))
+    labels = rng.integers(0, 10, 500)
+    embeddings = (centers[labels] + 0.5 * rng.standard_normal((500, 256))).astype(
+        np.float32
+    )
+    papers = [
+        Paper(id=str(i), title=f"t{i}", link=f"l{i}", summary=f"s{i}")
+        for i in range(500)
+    ]
+    query = (centers[3] + 0.5 * rng.standard_normal(256)).astype(np.float32)
+    return papers, embeddings, query
+
+
+def _search_ids(papers, embeddings, query, quantization, k=5):
+    index = InMemoryIndex()
+    index.papers_with_embeddings = list(zip(papers, embeddings))
+    index.quantize(quantization)
+    with patch("src.retrieval.inmemory.get_embed", return_value=query):
+        return [c.paper_id for c in index.search("q", k)]
+
+
+class TestInMemoryIndexQuantization:
+    """量子化検索のテスト"""
+
+    def test_int8_matches_exact_search(self, clustered_index_data):
+        """int8量子化でも上位k件が厳密検索と一致することのテスト"""
+        papers, embeddings, query = clustered_index_data
+        exact = _search_ids(papers, embeddings, query, "none")
+        assert _search_ids(papers, embeddings, query, "int8") == exact
+
+    def test_binary_returns_k_results(self, clustered_index_data):
+        """binary量子化でk件返り、大半が厳密検索と重なることのテスト"""
+        papers, embeddings, query = clustered_index_data
+        exact = _search_ids(papers, embeddings, query, "none")
+        approx = _search_ids(papers, embeddings, query, "binary")
+        assert len(approx) == 5
+        assert len(set(approx) & set(exact)) >= 3
+
+    def test_stale_quantization_falls_back_to_exact(self, clustered_index_data):
+        """量子化後にデータを差し替えた場合は厳密検索になることのテスト"""
+        papers, embeddings, query = clustered_index_data
+        index = InMemoryIndex()
+        index.papers_with_embeddings = list(zip(papers, embeddings))
+        index.quantize("binary")
+        index.papers_with_embeddings = list(zip(papers[:50], embeddings[:50]))
+        with patch("src.retrieval.inmemory.get_embed", return_value=query):
+            results = index.search("q", 5)
+        assert all(int(c.paper_id) < 50 for c in results)
+
+    @pytest.mark.parametrize("mode", ["int8", "binary"])
+    def test_saved_quantized_copy_matches(self, clustered_index_data, tmp_path, mode):
+        """保存した量子化コピーを読み込むと同じ検索結果になることのテスト"""
+        papers, embeddings, query = clustered_index_data
+        expected = _search_ids(papers, embeddings, query, mode)
+
+        index = InMemoryIndex()
+        index.set_embeddings(papers, embeddings)
+        index.quantize(mode)
+        index.save_quantized(tmp_path / "quantized.npz")
+
+        loaded = InMemoryIndex()
+        loaded.set_embeddings(papers, embeddings)
+        loaded.load_quantized(tmp_path / "quantized.npz")
+        assert loaded.is_quantized(mode)
+        with patch("src.retrieval.inmemory.get_embed", return_value=query):
+            assert [c.paper_id for c in loaded.search("q", 5)] == expected
+
+    def test_load_mismatched_quantized_copy_raises(
+        self, clustered_index_data, tmp_path
+    ):
+        """件数が一致しない量子化コピーは読み込まないことのテスト"""
+        papers, embeddings, _ = clustered_index_data
+        index = InMemoryIndex()
+        index.set_embeddings(papers[:100], embeddings[:100])
+        index.quantize("int8")
+        index.save_quantized(tmp_path / "quantized.npz")
+
+        other = InMemoryIndex()
+        other.set_embeddings(papers, embeddings)
+        with pytest.raises(ValueError):
+            other.load_quantized(tmp_path / "quantized.npz")
+        assert not other.is_quantized("int8")
+
+    def test_load_quantized_copy_of_other_mode_raises(
+        self, clustered_index_data, tmp_path
+    ):
+        """期待と異なる方式の量子化コピーは読み込まないことのテスト"""
+        papers, embeddings, _ = clustered_index_data
+        index = InMemoryIndex()
+        index.set_embeddings(papers, embeddings)
+        index.quantize("binary")
+        index.save_quantized(tmp_path / "quantized.npz")
+
+        other = InMemoryIndex()
+        other.set_embeddings(papers, embeddings)
+        with pytest.raises(ValueError):
+            other.load_quantized(tmp_path / "quantized.npz", mode="int8")
+        assert other.quantization == "none"
+
+    def test_invalid_mode_raises(self):
+        """未対応の量子化方式でエラーになることのテスト"""
+        with pytest.raises(ValueError):
+            InMemoryIndex(quantization="int4")
+        with pytest.raises(ValueError):
+            InMemoryIndex().quantize("int4")
+
+
+class TestInMemoryIndexMatrix:
+    """行列（memmap）を直接検索するテスト"""
+
+    def test_memmap_matches_list_search(self, clustered_index_data, tmp_path):
+        """memmapを渡した検索結果がリストから作った場合と一致することのテスト"""
+        papers, embeddings, query = clustered_index_data
+        exact = _search_ids(papers, embeddings, query, "none")
+
+        np.save(tmp_path / "emb.npy", embeddings)
+        mmap = np.load(tmp_path / "emb.npy", mmap_mode="r")
+        index = InMemoryIndex()
+        index.set_embeddings(papers, mmap)
+        with patch("src.retrieval.inmemory.get_embed", return_value=query):
+            results = index.search("q", 5)
+        assert [c.paper_id for c in results] == exact
+        # 行列はコピーされずにそのまま保持される
+        assert index.embeddings is mmap
+
+    def test_replaced_list_rebuilds_matrix(self, clustered_index_data):
+        """papers_with_embeddings を差し替えると行列も作り直されることのテスト"""
+        papers, embeddings, query = clustered_index_data
+        index = InMemoryIndex()
+        index.set_embeddings(papers, embeddings)
+        index.papers_with_embeddings = list(zip(papers[:50], embeddings[:50]))
+        with patch("src.retrieval.inmemory.get_embed", return_value=query):
+            results = index.search("q", 5)
+        assert all(int(c.paper_id) < 50 for c in results)
+
+
+class TestInMemoryIndexANN:
+    """HNSW近似検索のテスト"""
+
+    def test_hnsw_matches_exact_search(self, clustered_index_data, tmp_path):
+        """HNSW検索が厳密検索と一致し、保存・読込できることのテスト"""
+        pytest.importorskip("hnswlib")
+        papers, embeddings, query = clustered_index_data
+        exact = _search_ids(papers, embeddings, query, "none")
+
+        index = InMemoryIndex()
+        index.papers_with_embeddings = list(zip(papers, embeddings))
+        index.build_ann_index()
+        assert index.has_ann_index()
+        index.save_ann_index(tmp_path / "hnsw.bin")
+
+        loaded = InMemoryIndex()
+        loaded.papers_with_embeddings = list(zip(papers, embeddings))
+        loaded.load_ann_index(tmp_path / "hnsw.bin")
+        with patch("src.retrieval.inmemory.get_embed", return_value=query):
+            assert [c.paper_id for c in index.search("q", 5)] == exact
+            assert [c.paper_id for c in loaded.search("q", 5)] == exact
+
+    def test_load_mismatched_ann_index_raises(self, clustered_index_data, tmp_path):
+        """件数が一致しないHNSWグラフは読み込まないことのテスト"""
+        pytest.importorskip("hnswlib")
+        papers, embeddings, _ = clustered_index_data
+        index = InMemoryIndex()
+        index.papers_with_embeddings = list(zip(papers[:100], embeddings[:100]))
+        index.build_ann_index()
+        index.save_ann_index(tmp_path / "hnsw.bin")
+
+        other = InMemoryIndex()
+        other.papers_with_embeddings = list(zip(papers, embeddings))
+        with pytest.raises(Exception):
+            other.load_ann_index(tmp_path / "hnsw.bin")
+        assert not other.has_ann_index()